@@ -0,0 +1,31 @@
+"""
+Gunicorn config for config project.
+
+Usage: gunicorn -c config/gunicorn.py config.asgi:application
+"""
+
+import os
+
+bind = os.environ.get("WEB_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_WORKERS", 2))
+worker_class = os.environ.get("WEB_WORKER_CLASS", "uvicorn_worker.UvicornWorker")
+
+
+def on_starting(server):
+    """
+    Очищает каталог метрик Prometheus от файлов процессов предыдущего запуска до запуска воркеров.
+    """
+
+    from main.metrics import reset_multiprocess_dir
+
+    reset_multiprocess_dir()
+
+
+def child_exit(server, worker):
+    """
+    Учитывает завершение процесса воркера в метриках Prometheus.
+    """
+
+    from main.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
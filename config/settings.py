@@ -11,9 +11,12 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
 import os
+import sys
 from datetime import timedelta
 from pathlib import Path
 
+from celery.schedules import crontab
+from django.core.exceptions import ImproperlyConfigured
 from environ import environ
 
 env = environ.Env()
@@ -53,6 +56,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "main.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -88,7 +92,7 @@ WSGI_APPLICATION = "config.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql_psycopg2",
+        "ENGINE": "django.db.backends.postgresql",
         "NAME": env("POSTGRES_DB"),
         "USER": env("POSTGRES_USER"),
         "PASSWORD": env("POSTGRES_PASSWORD"),
@@ -96,6 +100,67 @@ DATABASES = {
     }
 }
 
+# Соединения с базой данных настраиваются по типу процесса (DB_PROCESS_TYPE): web - ASGI-сервер, где соединения
+# берутся из пула psycopg (постоянные соединения CONN_MAX_AGE несовместимы с асинхронными представлениями),
+# celery_worker и celery_beat - однопоточные процессы с постоянным соединением, celery_worker_gevent - воркер с
+# пулом gevent, где каждый гринлет получает собственное соединение, поэтому соединение закрывается после задачи
+# (CONN_MAX_AGE = 0) и не переопределяется DB_CONN_MAX_AGE, иначе открытые соединения накапливаются по числу
+# гринлетов. Воркер celery_worker, запущенный с пулом gevent (Celery применяет monkey patching gevent до загрузки
+# настроек), использует celery_worker_gevent автоматически. Работоспособность соединения проверяется перед
+# использованием (CONN_HEALTH_CHECKS, для пула - при выдаче соединения из пула).
+# Любое значение по умолчанию переопределяется переменными окружения DB_POOL, DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE,
+# DB_POOL_TIMEOUT, DB_CONN_MAX_AGE и DB_CONN_HEALTH_CHECKS.
+
+DB_PROCESS_TYPE = env("DB_PROCESS_TYPE", default="web")
+
+DB_CONNECTION_DEFAULTS = {
+    "web": {"pool": True, "min_size": 2, "max_size": 10, "conn_max_age": 0},
+    "celery_worker": {"pool": False, "min_size": 1, "max_size": 4, "conn_max_age": 600},
+    "celery_worker_gevent": {"pool": False, "min_size": 1, "max_size": 4, "conn_max_age": 0},
+    "celery_beat": {"pool": False, "min_size": 1, "max_size": 2, "conn_max_age": 600},
+}
+
+if DB_PROCESS_TYPE not in DB_CONNECTION_DEFAULTS:
+    raise ImproperlyConfigured(
+        f"Неизвестный DB_PROCESS_TYPE {DB_PROCESS_TYPE!r}, допустимые значения: {', '.join(DB_CONNECTION_DEFAULTS)}."
+    )
+
+_gevent_monkey = sys.modules.get("gevent.monkey")
+
+if DB_PROCESS_TYPE == "celery_worker" and _gevent_monkey is not None and _gevent_monkey.is_module_patched("socket"):
+    DB_PROCESS_TYPE = "celery_worker_gevent"
+
+_db_defaults = DB_CONNECTION_DEFAULTS[DB_PROCESS_TYPE]
+
+DB_POOL = env.bool("DB_POOL", default=_db_defaults["pool"])
+
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = env.bool("DB_CONN_HEALTH_CHECKS", default=True)
+
+if DB_POOL:
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": env.int("DB_POOL_MIN_SIZE", default=_db_defaults["min_size"]),
+            "max_size": env.int("DB_POOL_MAX_SIZE", default=_db_defaults["max_size"]),
+            "timeout": env.float("DB_POOL_TIMEOUT", default=10),
+        },
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = (
+        0 if DB_PROCESS_TYPE == "celery_worker_gevent"
+        else env.int("DB_CONN_MAX_AGE", default=_db_defaults["conn_max_age"])
+    )
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+}
+
+PUBLIC_FEED_CACHE_TIMEOUT = env.int("PUBLIC_FEED_CACHE_TIMEOUT", default=300)
+
+HABIT_BULK_MAX_ITEMS = env.int("HABIT_BULK_MAX_ITEMS", default=500)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -143,10 +208,17 @@ MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication",
     ),
 }
 
+# Рендерер JSON на основе orjson (необязательная зависимость, poetry install -E orjson).
+if env.bool("API_ORJSON_RENDERER", default=False):
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] = (
+        "main.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    )
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
@@ -161,17 +233,145 @@ SIMPLE_JWT = {
     "USER_ID_CLAIM": "user_id",
 }
 
+AUTH_USER_CACHE_TIMEOUT = env.int("AUTH_USER_CACHE_TIMEOUT", default=300)
+AUTH_USER_LOCAL_CACHE_TIMEOUT = env.float("AUTH_USER_LOCAL_CACHE_TIMEOUT", default=10)
+AUTH_USER_LOCAL_CACHE_SIZE = env.int("AUTH_USER_LOCAL_CACHE_SIZE", default=1024)
+
+REDIS_URL = env("REDIS_URL", default="redis://localhost:6379/0")
+REDIS_SOCKET_TIMEOUT = env.float("REDIS_SOCKET_TIMEOUT", default=1.0)
+
 CELERY_BROKER_URL = env("CELERY_BROKER_URL")
 CELERY_RESULT_BACKEND = env("CELERY_RESULT_BACKEND")
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60
+# Задачи распределяются по очередям, которые обслуживают отдельные воркеры (см. docker-compose.yaml):
+# notifications - напоминания и команды бота, чувствительные ко времени; maintenance - обслуживание расписаний и
+# очистка журналов; analytics - пересчет статистики. Долгие фоновые задачи не задерживают отправку напоминаний.
+CELERY_TASK_DEFAULT_QUEUE = "default"
+CELERY_TASK_ROUTES = {
+    "main.tasks.send_tg_notification": {"queue": "notifications"},
+    "main.tasks.send_tg_notifications_batch": {"queue": "notifications"},
+    "main.tasks.dispatch_due_reminders": {"queue": "notifications"},
+    "main.tasks.drain_delayed_queue": {"queue": "notifications"},
+    "main.tasks.process_telegram_update": {"queue": "notifications"},
+    "main.tasks.sync_habit_reminder": {"queue": "maintenance"},
+    "main.tasks.delete_reminder_tasks": {"queue": "maintenance"},
+    "main.tasks.prune_habit_tombstones": {"queue": "maintenance"},
+    "main.tasks.prune_reminder_deliveries": {"queue": "maintenance"},
+    "main.tasks.create_completion_partitions_task": {"queue": "maintenance"},
+    "main.tasks.refresh_habit_stats": {"queue": "analytics"},
+}
+# Воркер резервирует не больше задач, чем может выполнить, чтобы задачи не ждали за долгой задачей в его буфере;
+# для воркера уведомлений значение увеличивается параметром --prefetch-multiplier.
+CELERY_WORKER_PREFETCH_MULTIPLIER = env.int("CELERY_WORKER_PREFETCH_MULTIPLIER", default=1)
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+CELERY_BEAT_SCHEDULE = {}
+
+# Способ планирования напоминаний: "periodic_task" - отдельная задача django-celery-beat на каждую привычку,
+# "dispatcher" - одна ежеминутная задача, выбирающая привычки по индексированному полю next_due_at.
+REMINDER_MODE = env("REMINDER_MODE", default="periodic_task")
+REMINDER_SYNC_COALESCE_SECONDS = env.int("REMINDER_SYNC_COALESCE_SECONDS", default=5)
+REMINDER_SYNC_PENDING_TIMEOUT = env.int("REMINDER_SYNC_PENDING_TIMEOUT", default=60)
+REMINDER_DISPATCH_BATCH_SIZE = env.int("REMINDER_DISPATCH_BATCH_SIZE", default=1000)
+REMINDER_DISPATCH_GRACE = timedelta(minutes=env.int("REMINDER_DISPATCH_GRACE_MINUTES", default=15))
+# Допустимое расхождение часов celery beat и воркера: запуск периодической задачи напоминания раньше момента
+# напоминания по часам воркера в пределах этого окна относится к наступающему напоминанию, а не к предыдущему дню.
+REMINDER_CLOCK_SKEW = timedelta(seconds=env.int("REMINDER_CLOCK_SKEW_SECONDS", default=60))
+
+if REMINDER_MODE == "dispatcher":
+    CELERY_BEAT_SCHEDULE["dispatch-due-reminders"] = {
+        "task": "main.tasks.dispatch_due_reminders",
+        "schedule": crontab(),
+    }
+
+# Журнал доставки напоминаний (не более одной отправки на пару привычка/момент) хранится указанное количество дней.
+REMINDER_DELIVERY_RETENTION = timedelta(days=env.int("REMINDER_DELIVERY_RETENTION_DAYS", default=7))
+
+CELERY_BEAT_SCHEDULE["prune-reminder-deliveries"] = {
+    "task": "main.tasks.prune_reminder_deliveries",
+    "schedule": crontab(minute=15, hour=4),
+}
+
+# Инкрементальная синхронизация привычек (habits/changes/).
+HABIT_CHANGES_PAGE_SIZE = env.int("HABIT_CHANGES_PAGE_SIZE", default=500)
+HABIT_CHANGES_SAFETY_WINDOW = timedelta(seconds=env.int("HABIT_CHANGES_SAFETY_WINDOW_SECONDS", default=60))
+HABIT_TOMBSTONE_RETENTION = timedelta(days=env.int("HABIT_TOMBSTONE_RETENTION_DAYS", default=30))
+
+CELERY_BEAT_SCHEDULE["prune-habit-tombstones"] = {
+    "task": "main.tasks.prune_habit_tombstones",
+    "schedule": crontab(minute=0, hour=4),
+}
+
+# Журнал выполнений привычек секционирован по месяцам; секции создаются заранее на указанное количество месяцев.
+HABIT_COMPLETION_PARTITIONS_AHEAD = env.int("HABIT_COMPLETION_PARTITIONS_AHEAD", default=3)
+
+CELERY_BEAT_SCHEDULE["create-completion-partitions"] = {
+    "task": "main.tasks.create_completion_partitions_task",
+    "schedule": crontab(minute=30, hour=4),
+}
+
+# Статистика привычек строится из агрегатов, которые задача refresh_habit_stats пополняет новыми выполнениями.
+HABIT_STATS_BATCH_SIZE = env.int("HABIT_STATS_BATCH_SIZE", default=10000)
+HABIT_STATS_REFRESH_LAG = timedelta(seconds=env.int("HABIT_STATS_REFRESH_LAG_SECONDS", default=30))
+
+CELERY_BEAT_SCHEDULE["refresh-habit-stats"] = {
+    "task": "main.tasks.refresh_habit_stats",
+    "schedule": crontab(),
+}
+
+# Очередь отложенных задач в Redis (сортированное множество по моменту запуска) и периодичность ее опроса.
+DELAYED_QUEUE_POLL_INTERVAL = env.float("DELAYED_QUEUE_POLL_INTERVAL", default=5)
+DELAYED_QUEUE_BATCH_SIZE = env.int("DELAYED_QUEUE_BATCH_SIZE", default=500)
+# Аренда выданной задачи: если задача не отправлена в брокер за это время (обработчик завершился), она выдается
+# повторно.
+DELAYED_QUEUE_VISIBILITY_TIMEOUT = env.float("DELAYED_QUEUE_VISIBILITY_TIMEOUT", default=60)
+
+CELERY_BEAT_SCHEDULE["drain-delayed-queue"] = {
+    "task": "main.tasks.drain_delayed_queue",
+    "schedule": timedelta(seconds=DELAYED_QUEUE_POLL_INTERVAL),
+}
 
 AUTH_USER_MODEL = "users.CustomUser"
 
 TELEGRAM_URL = env("TELEGRAM_URL")
 TELEGRAM_TOKEN = env("TELEGRAM_TOKEN")
+TELEGRAM_POOL_SIZE = env.int("TELEGRAM_POOL_SIZE", default=20)
+TELEGRAM_BATCH_SIZE = env.int("TELEGRAM_BATCH_SIZE", default=100)
+TELEGRAM_BATCH_CONCURRENCY = env.int("TELEGRAM_BATCH_CONCURRENCY", default=10)
+TELEGRAM_MAX_RETRIES = env.int("TELEGRAM_MAX_RETRIES", default=10)
+
+# Таймауты запросов к Telegram API, повтор с экспоненциальной задержкой и автомат (circuit breaker), который после
+# TELEGRAM_CIRCUIT_FAILURE_THRESHOLD ошибок подряд на TELEGRAM_CIRCUIT_OPEN_SECONDS откладывает отправку.
+TELEGRAM_CONNECT_TIMEOUT = env.float("TELEGRAM_CONNECT_TIMEOUT", default=3.05)
+TELEGRAM_READ_TIMEOUT = env.float("TELEGRAM_READ_TIMEOUT", default=10)
+TELEGRAM_TASK_TIME_LIMIT = env.int("TELEGRAM_TASK_TIME_LIMIT", default=5 * 60)
+TELEGRAM_RETRY_BACKOFF_BASE = env.float("TELEGRAM_RETRY_BACKOFF_BASE", default=2)
+TELEGRAM_RETRY_BACKOFF_MAX = env.float("TELEGRAM_RETRY_BACKOFF_MAX", default=5 * 60)
+TELEGRAM_CIRCUIT_FAILURE_THRESHOLD = env.int("TELEGRAM_CIRCUIT_FAILURE_THRESHOLD", default=5)
+TELEGRAM_CIRCUIT_FAILURE_WINDOW = env.float("TELEGRAM_CIRCUIT_FAILURE_WINDOW", default=60)
+TELEGRAM_CIRCUIT_OPEN_SECONDS = env.float("TELEGRAM_CIRCUIT_OPEN_SECONDS", default=30)
+
+# Ограничения Telegram: около 30 сообщений в секунду на бота и 1 сообщение в секунду в один чат.
+TELEGRAM_RATE_LIMIT_ENABLED = env.bool("TELEGRAM_RATE_LIMIT_ENABLED", default=True)
+TELEGRAM_GLOBAL_RATE = env.float("TELEGRAM_GLOBAL_RATE", default=28)
+TELEGRAM_GLOBAL_BURST = env.int("TELEGRAM_GLOBAL_BURST", default=28)
+TELEGRAM_CHAT_RATE = env.float("TELEGRAM_CHAT_RATE", default=1)
+TELEGRAM_CHAT_BURST = env.int("TELEGRAM_CHAT_BURST", default=1)
+TELEGRAM_RATE_LIMIT_MAX_SLEEP = env.float("TELEGRAM_RATE_LIMIT_MAX_SLEEP", default=2)
+
+# Вебхук входящих команд бота: Telegram передает секрет в заголовке X-Telegram-Bot-Api-Secret-Token. Пока секрет
+# не задан, вебхук отключен. Повторно доставленные обновления отбрасываются по update_id.
+TELEGRAM_WEBHOOK_SECRET = env("TELEGRAM_WEBHOOK_SECRET", default="")
+TELEGRAM_UPDATE_DEDUP_TIMEOUT = env.int("TELEGRAM_UPDATE_DEDUP_TIMEOUT", default=24 * 60 * 60)
+TELEGRAM_SNOOZE_MINUTES = env.int("TELEGRAM_SNOOZE_MINUTES", default=10)
+TELEGRAM_SNOOZE_MAX_MINUTES = env.int("TELEGRAM_SNOOZE_MAX_MINUTES", default=12 * 60)
+
+# Эндпоинт /metrics: Prometheus передает токен в заголовке "Authorization: Bearer <METRICS_TOKEN>". Пока токен не
+# задан, эндпоинт отключен. Процессы каждого контейнера записывают метрики в собственный каталог
+# PROMETHEUS_MULTIPROC_DIR внутри общего каталога PROMETHEUS_MULTIPROC_ROOT, /metrics объединяет все подкаталоги.
+METRICS_TOKEN = env("METRICS_TOKEN", default="")
+PROMETHEUS_MULTIPROC_ROOT = env("PROMETHEUS_MULTIPROC_ROOT", default="")
 
 CORS_ALLOWED_ORIGINS = [env("CORS_ALLOWED_ORIGINS")]
 
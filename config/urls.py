@@ -23,6 +23,8 @@ from rest_framework import permissions
 from django.conf import settings
 from django.conf.urls.static import static
 
+from main.views import metrics
+
 schema_view = get_schema_view(
     openapi.Info(
         title="Healthy Habbit Tracker API",
@@ -51,4 +53,5 @@ urlpatterns = [
     path("redoc/", schema_view.with_ui("redoc", cache_timeout=0), name="schema-redoc"),
     path("users/", include("users.urls"), name="users"),
     path("api/", include("main.urls"), name="main"),
+    path("metrics", metrics, name="metrics"),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
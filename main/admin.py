@@ -1,5 +1,18 @@
 from django.contrib import admin
 
-from main.models import Habit
+from main.models import Habit, ReminderDelivery
 
 admin.site.register(Habit)
+
+
+@admin.register(ReminderDelivery)
+class ReminderDeliveryAdmin(admin.ModelAdmin):
+    """
+    Журнал доставки напоминаний: запланированный момент, момент отправки и задержка между ними.
+    """
+
+    list_display = ("habit_id", "scheduled_for", "claimed_at", "sent_at", "latency")
+    list_select_related = False
+    date_hierarchy = "scheduled_for"
+    ordering = ("-scheduled_for",)
+    show_full_result_count = False
@@ -6,4 +6,5 @@ class MainConfig(AppConfig):
     name = "main"
 
     def ready(self):
+        import main.metrics  # noqa: F401
         import main.signals  # noqa: F401
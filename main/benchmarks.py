@@ -0,0 +1,258 @@
+import json
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+BENCHMARK_EMAIL_DOMAIN = "benchmark.local"
+BENCHMARK_PASSWORD = "benchmark-password"
+
+
+def benchmark_email(number):
+    """
+    Возвращает email пользователя, созданного для нагрузочного тестирования.
+    """
+
+    return f"bench{number}@{BENCHMARK_EMAIL_DOMAIN}"
+
+
+def percentile(values, percent):
+    """
+    Вычисляет перцентиль выборки с линейной интерполяцией между соседними значениями.
+
+    Аргументы:
+        values : list
+            Значения выборки.
+        percent : float
+            Перцентиль от 0 до 100.
+
+    Возвращает:
+        float: Значение перцентиля или 0, если выборка пуста.
+    """
+
+    if not values:
+        return 0.0
+
+    values = sorted(values)
+    rank = (len(values) - 1) * percent / 100
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+
+    return values[lower] + (values[upper] - values[lower]) * (rank - lower)
+
+
+def summarize(name, samples, elapsed):
+    """
+    Формирует сводку результатов сценария.
+
+    Аргументы:
+        name : str
+            Название сценария.
+        samples : list
+            Результаты запросов - словари с ключами latency (секунды), status и queries (None, если количество
+            запросов к базе данных неизвестно).
+        elapsed : float
+            Общее время выполнения сценария в секундах.
+
+    Возвращает:
+        dict: Количество запросов, req/s, p50/p95/p99 задержки в миллисекундах, среднее количество запросов к базе
+        данных на один запрос и количество ответов с ошибкой.
+    """
+
+    latencies = [sample["latency"] * 1000 for sample in samples]
+    queries = [sample["queries"] for sample in samples if sample["queries"] is not None]
+
+    return {
+        "scenario": name,
+        "requests": len(samples),
+        "rps": len(samples) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "queries": sum(queries) / len(queries) if queries else None,
+        "max_queries": max(queries) if queries else None,
+        "errors": len([sample for sample in samples if sample["status"] >= 400]),
+    }
+
+
+class InProcessTransport:
+    """
+    Выполняет запросы к API внутри текущего процесса через тестовый клиент Django.
+
+    Позволяет подсчитать количество запросов к базе данных на каждый HTTP-запрос, но не учитывает накладные расходы
+    веб-сервера и сети.
+    """
+
+    concurrency = 1
+
+    def __init__(self):
+        self.client = Client()
+
+    def request(self, method, path, data=None, token=None):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"} if token else {}
+
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = getattr(self.client, method)(path, data, content_type="application/json", **headers)
+            latency = time.perf_counter() - started
+
+        body = response.json() if response.content else None
+
+        return {"latency": latency, "status": response.status_code, "queries": len(context)}, body
+
+
+class HttpTransport:
+    """
+    Выполняет запросы к запущенному серверу по HTTP с заданной параллельностью.
+
+    Количество запросов к базе данных в этом режиме неизвестно.
+    """
+
+    def __init__(self, base_url, concurrency=1):
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = concurrency
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method, path, data=None, token=None):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        kwargs = {"params": data} if method == "get" else {"json": data}
+
+        started = time.perf_counter()
+        response = self.session.request(method, f"{self.base_url}{path}", headers=headers, timeout=30, **kwargs)
+        latency = time.perf_counter() - started
+
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+
+        return {"latency": latency, "status": response.status_code, "queries": None}, body
+
+
+def run_scenario(name, transport, iterations, make_request):
+    """
+    Выполняет сценарий нагрузочного тестирования.
+
+    Аргументы:
+        name : str
+            Название сценария.
+        transport : InProcessTransport или HttpTransport
+            Способ выполнения запросов.
+        iterations : int
+            Количество запросов.
+        make_request : callable
+            Функция, принимающая номер итерации и выполняющая один запрос через transport. Возвращает результат
+            запроса (словарь latency, status, queries).
+
+    Возвращает:
+        dict: Сводка результатов (см. summarize).
+    """
+
+    started = time.perf_counter()
+
+    if transport.concurrency > 1:
+        with ThreadPoolExecutor(max_workers=transport.concurrency) as executor:
+            samples = list(executor.map(make_request, range(iterations)))
+    else:
+        samples = [make_request(number) for number in range(iterations)]
+
+    return summarize(name, samples, time.perf_counter() - started)
+
+
+def format_report(results):
+    """
+    Форматирует результаты сценариев в виде текстовой таблицы.
+    """
+
+    header = f"{'scenario':<20}{'requests':>10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}" \
+             f"{'queries':>10}{'errors':>8}"
+    lines = [header, "-" * len(header)]
+
+    for result in results:
+        queries = "-" if result["queries"] is None else f"{result['queries']:.1f}"
+        lines.append(
+            f"{result['scenario']:<20}{result['requests']:>10}{result['rps']:>10.1f}{result['p50_ms']:>10.2f}"
+            f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}{queries:>10}{result['errors']:>8}"
+        )
+
+    return "\n".join(lines)
+
+
+class FakeTelegramServer:
+    """
+    Локальный HTTP-сервер, имитирующий метод sendMessage Telegram Bot API.
+
+    Используется в нагрузочном сценарии reminder_fanout и тестах вместо настоящего Telegram: запоминает полученные
+    сообщения и отвечает заранее заданными ответами (по умолчанию - успешным).
+
+    Атрибуты:
+        requests : list
+            Параметры (chat_id, text) полученных запросов.
+        responses : list
+            Очередь ответов (код, тело JSON). Когда очередь пуста, возвращается успешный ответ.
+        url : str
+            Базовый адрес сервера в формате настройки TELEGRAM_URL.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.responses = []
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.make_handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/bot"
+
+    def make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+                with fake.lock:
+                    fake.requests.append(params)
+                    status, body = fake.responses.pop(0) if fake.responses else (200, {"ok": True, "result": {}})
+
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def rate_limit_next(self, retry_after):
+        """
+        Добавляет в очередь ответ 429 с указанным retry_after.
+        """
+
+        self.responses.append(
+            (429, {"ok": False, "error_code": 429, "parameters": {"retry_after": retry_after}})
+        )
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,67 @@
+from django.core.cache import cache
+
+PUBLIC_FEED_VERSION_KEY = "habits:public_feed:version"
+
+
+def get_public_feed_version():
+    """
+    Возвращает текущую версию кэша ленты публичных привычек.
+
+    Возвращает:
+        int: Номер версии, входящий в ключи кэшированных страниц ленты.
+    """
+
+    version = cache.get(PUBLIC_FEED_VERSION_KEY)
+
+    if version is None:
+        cache.add(PUBLIC_FEED_VERSION_KEY, 1, timeout=None)
+        version = cache.get(PUBLIC_FEED_VERSION_KEY, 1)
+
+    return version
+
+
+async def aget_public_feed_version():
+    """
+    Асинхронный вариант get_public_feed_version.
+    """
+
+    version = await cache.aget(PUBLIC_FEED_VERSION_KEY)
+
+    if version is None:
+        await cache.aadd(PUBLIC_FEED_VERSION_KEY, 1, timeout=None)
+        version = await cache.aget(PUBLIC_FEED_VERSION_KEY, 1)
+
+    return version
+
+
+def bump_public_feed_version():
+    """
+    Увеличивает версию кэша ленты публичных привычек.
+
+    Описание:
+        Все ранее закэшированные страницы ленты перестают использоваться (их ключи содержат старую версию) и
+        вытесняются из кэша по истечении PUBLIC_FEED_CACHE_TIMEOUT.
+    """
+
+    try:
+        cache.incr(PUBLIC_FEED_VERSION_KEY)
+    except ValueError:
+        cache.add(PUBLIC_FEED_VERSION_KEY, 1, timeout=None)
+        cache.incr(PUBLIC_FEED_VERSION_KEY)
+
+
+def get_public_feed_cache_key(query_params):
+    """
+    Формирует ключ кэша страницы ленты публичных привычек.
+
+    Аргументы:
+        query_params : QueryDict
+            Параметры запроса (курсор, размер страницы).
+
+    Возвращает:
+        str: Ключ кэша, включающий текущую версию ленты.
+    """
+
+    query = "&".join(f"{key}={value}" for key, value in sorted(query_params.items()))
+
+    return f"habits:public_feed:{get_public_feed_version()}:{query}"
@@ -0,0 +1,218 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from main.cache import bump_public_feed_version
+from main.models import Habit, HabitTombstone
+
+CHANGES_TOKEN_SALT = "main.habit_changes"
+START_POSITION = (datetime(1970, 1, 1, tzinfo=dt_timezone.utc), 0)
+
+
+class ChangesTokenExpired(APIException):
+    """
+    Исключение для токена синхронизации, записи об удалениях после которого уже удалены.
+    """
+
+    status_code = status.HTTP_410_GONE
+    default_detail = "Токен синхронизации устарел. Выполните полную синхронизацию без параметра since."
+    default_code = "changes_token_expired"
+
+
+def record_deleted_habits(habits):
+    """
+    Создает записи об удалении для набора привычек одним запросом.
+
+    Аргументы:
+        habits : QuerySet
+            Привычки, которые будут удалены. Вызывается до удаления, в той же транзакции.
+
+    Описание:
+        Используется массовыми операциями (bulk_sync), при которых обработчики pre_delete и post_delete записи не
+        создают и связанные привычки не обновляют (см. touch_related_habits).
+    """
+
+    touch_related_habits(habits)
+    HabitTombstone.objects.bulk_create(
+        HabitTombstone(habit_id=pk, owner_id=owner_id, is_public=is_public)
+        for pk, owner_id, is_public in habits.values_list("id", "owner_id", "is_public")
+    )
+
+
+def touch_related_habits(habits):
+    """
+    Обновляет момент изменения привычек, связанных с удаляемыми привычками.
+
+    Аргументы:
+        habits : QuerySet или list
+            Удаляемые привычки или их идентификаторы. Вызывается до удаления, в той же транзакции.
+
+    Описание:
+        При удалении связанной привычки Django обнуляет related_habit ссылающихся на нее привычек запросом UPDATE
+        (on_delete=SET_NULL), который не меняет updated_at. Без обновления момента изменения эти привычки не попали
+        бы в список измененных, а их ETag не изменился бы, и клиенты продолжали бы видеть удаленную связь. Если среди
+        них есть публичные привычки, после фиксации транзакции сбрасывается кэш ленты публичных привычек.
+    """
+
+    linked = Habit.objects.filter(related_habit__in=habits)
+
+    if linked.update(updated_at=timezone.now()) and linked.filter(is_public=True).exists():
+        transaction.on_commit(bump_public_feed_version)
+
+
+def record_visibility_changes(unpublished=(), republished=()):
+    """
+    Обновляет записи о публичных привычках, которые пропали из списков других пользователей или вернулись в них.
+
+    Аргументы:
+        unpublished : list
+            Привычки, переставшие быть публичными: для них создаются записи с признаком is_unpublished.
+        republished : list
+            Привычки, снова ставшие публичными: их записи is_unpublished удаляются, чтобы клиент, получивший
+            привычку в списке измененных, не удалил ее по записи, выданной позже.
+    """
+
+    if unpublished:
+        HabitTombstone.objects.bulk_create(
+            HabitTombstone(habit_id=habit.pk, owner_id=habit.owner_id, is_public=True, is_unpublished=True)
+            for habit in unpublished
+        )
+
+    if republished:
+        HabitTombstone.objects.filter(habit_id__in=[habit.pk for habit in republished], is_unpublished=True).delete()
+
+
+def encode_token(habits_position, deleted_position):
+    """
+    Формирует непрозрачный подписанный токен с позициями в потоках измененных и удаленных привычек.
+    """
+
+    return signing.dumps(
+        [habits_position[0].isoformat(), habits_position[1], deleted_position[0].isoformat(), deleted_position[1]],
+        salt=CHANGES_TOKEN_SALT,
+    )
+
+
+def decode_token(token):
+    """
+    Извлекает позиции потоков из токена синхронизации.
+
+    Исключения:
+        ValidationError: Если токен поврежден или подделан.
+    """
+
+    try:
+        habits_at, habits_id, deleted_at, deleted_id = signing.loads(token, salt=CHANGES_TOKEN_SALT)
+        return (
+            (datetime.fromisoformat(habits_at), int(habits_id)),
+            (datetime.fromisoformat(deleted_at), int(deleted_id)),
+        )
+    except (signing.BadSignature, TypeError, ValueError) as e:
+        raise ValidationError({"since": ["Некорректный токен синхронизации."]}) from e
+
+
+def after(field, position):
+    """
+    Возвращает условие "строка после позиции" для сортировки по (field, id).
+    """
+
+    moment, pk = position
+
+    return Q(**{f"{field}__gt": moment}) | Q(**{field: moment, "id__gt": pk})
+
+
+def read_stream(queryset, field, position, limit, values):
+    """
+    Выбирает очередную порцию строк потока изменений, отсортированную по (field, id).
+
+    Возвращает:
+        tuple: Строки (не более limit), признак наличия следующих строк и позиция последней строки.
+    """
+
+    rows = list(queryset.filter(after(field, position)).order_by(field, "id").values(*values)[: limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    last = (rows[-1][field], rows[-1]["id"]) if rows else position
+
+    return rows, has_more, last
+
+
+def next_position(position, last, has_more, safe_position):
+    """
+    Вычисляет позицию потока для следующего токена.
+
+    Описание:
+        Если поток прочитан не полностью, позиция сдвигается на последнюю выданную строку. Иначе позиция
+        сдвигается на safe_position (текущий момент минус HABIT_CHANGES_SAFETY_WINDOW), но не дальше: updated_at и
+        deleted_at устанавливаются до фиксации транзакции, и строки, зафиксированные с опозданием, попадут в
+        следующий ответ. Строки внутри окна могут быть выданы повторно, поэтому клиент применяет изменения
+        идемпотентно.
+    """
+
+    if has_more:
+        return last
+
+    return max(position, safe_position)
+
+
+def get_changes(user, token, serializer):
+    """
+    Возвращает привычки, измененные и удаленные с момента, зафиксированного в токене.
+
+    Аргументы:
+        user : CustomUser
+            Текущий пользователь; учитываются его привычки и публичные привычки других пользователей.
+        token : str или None
+            Токен предыдущей синхронизации. Без токена выдаются все видимые привычки (полная синхронизация).
+        serializer : HabitValuesSerializer
+            Сериализатор привычек с выбранными полями.
+
+    Возвращает:
+        dict: changed - созданные и измененные привычки, deleted - идентификаторы привычек, которые нужно удалить
+        на клиенте (применяются до changed), next - токен следующей синхронизации, has_more - признак того, что
+        изменения выданы не полностью и запрос нужно повторить с новым токеном.
+
+    Исключения:
+        ValidationError: Если токен некорректен.
+        ChangesTokenExpired: Если токен старше HABIT_TOMBSTONE_RETENTION.
+    """
+
+    now = timezone.now()
+    safe_position = (now - settings.HABIT_CHANGES_SAFETY_WINDOW, 0)
+    limit = settings.HABIT_CHANGES_PAGE_SIZE
+
+    if token:
+        habits_position, deleted_position = decode_token(token)
+
+        if deleted_position[0] < now - settings.HABIT_TOMBSTONE_RETENTION:
+            raise ChangesTokenExpired()
+    else:
+        habits_position, deleted_position = START_POSITION, safe_position
+
+    habits = Habit.objects.filter(Q(owner=user) | Q(is_public=True))
+    rows, habits_more, habits_last = read_stream(
+        habits, "updated_at", habits_position, limit, serializer.get_queryset_fields(("updated_at", "id"))
+    )
+
+    tombstones = HabitTombstone.objects.filter(
+        Q(owner=user, is_unpublished=False) | (Q(is_public=True) & ~Q(owner=user))
+    )
+    deleted, deleted_more, deleted_last = read_stream(
+        tombstones, "deleted_at", deleted_position, limit, ("deleted_at", "id", "habit_id")
+    )
+
+    return {
+        "changed": serializer.to_representation(rows),
+        "deleted": list(dict.fromkeys(row["habit_id"] for row in deleted)),
+        "next": encode_token(
+            next_position(habits_position, habits_last, habits_more, safe_position),
+            next_position(deleted_position, deleted_last, deleted_more, safe_position),
+        ),
+        "has_more": habits_more or deleted_more,
+    }
@@ -0,0 +1,119 @@
+import logging
+
+import redis
+from django.conf import settings
+
+from main.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Учитывает неудачный вызов: при TELEGRAM_CIRCUIT_FAILURE_THRESHOLD неудачах подряд (в пределах окна) размыкает
+# автомат на ARGV[3] миллисекунд. Возвращает 1, если автомат разомкнут этим вызовом.
+FAILURE_SCRIPT = """
+local failures = redis.call('INCR', KEYS[1])
+
+if failures == 1 then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+
+if failures >= tonumber(ARGV[1]) then
+    redis.call('SET', KEYS[2], 1, 'PX', ARGV[3])
+    redis.call('DEL', KEYS[1])
+    return 1
+end
+
+return 0
+"""
+
+
+class CircuitBreaker:
+    """
+    Автоматический выключатель (circuit breaker) для обращений к внешнему сервису.
+
+    Состояние хранится в Redis и общее для всех воркеров Celery: после TELEGRAM_CIRCUIT_FAILURE_THRESHOLD неудачных
+    вызовов подряд (сетевые ошибки, таймауты, ответы 5xx) автомат размыкается на TELEGRAM_CIRCUIT_OPEN_SECONDS, и
+    вызовы сразу завершаются ошибкой, не занимая воркер ожиданием таймаута. После этого вызовы снова разрешаются;
+    если сервис все еще недоступен, автомат размыкается повторно.
+
+    Атрибуты:
+        name : str
+            Имя защищаемого сервиса.
+        client : redis.Redis
+            Клиент Redis, в котором хранится состояние.
+    """
+
+    key_prefix = "circuit"
+
+    def __init__(self, name, client=None):
+        self.name = name
+        self.client = client or get_redis()
+        self.failure_script = self.client.register_script(FAILURE_SCRIPT)
+        self.failures_key = f"{self.key_prefix}:{name}:failures"
+        self.open_key = f"{self.key_prefix}:{name}:open"
+
+    def get_open_time(self):
+        """
+        Возвращает время в секундах, на которое автомат еще разомкнут, или 0, если вызовы разрешены.
+
+        Описание:
+            При недоступности Redis автомат считается замкнутым (fail-open), как и ограничитель частоты.
+        """
+
+        try:
+            remaining = self.client.pttl(self.open_key)
+        except redis.RedisError as exc:
+            logger.warning("Состояние автомата %s недоступно: %s", self.name, exc)
+            return 0.0
+
+        return remaining / 1000 if remaining > 0 else 0.0
+
+    def record_failure(self):
+        """
+        Учитывает неудачный вызов и при достижении порога размыкает автомат.
+        """
+
+        args = [
+            settings.TELEGRAM_CIRCUIT_FAILURE_THRESHOLD,
+            int(settings.TELEGRAM_CIRCUIT_FAILURE_WINDOW * 1000),
+            int(settings.TELEGRAM_CIRCUIT_OPEN_SECONDS * 1000),
+        ]
+
+        try:
+            opened = self.failure_script(keys=[self.failures_key, self.open_key], args=args)
+        except redis.RedisError as exc:
+            logger.warning("Не удалось учесть ошибку автомата %s: %s", self.name, exc)
+            return
+
+        if opened:
+            logger.warning("Автомат %s разомкнут на %s с", self.name, settings.TELEGRAM_CIRCUIT_OPEN_SECONDS)
+
+    def record_success(self):
+        """
+        Сбрасывает счетчик неудач после успешного вызова.
+
+        Описание:
+            Счетчик общий для всех процессов, поэтому сбрасывается после каждого успешного вызова (одна команда
+            DEL): иначе успешные вызовы процессов, не учитывавших неудач, не прерывали бы серию, и автомат
+            размыкался бы по неудачам, перемежающимся успешными вызовами.
+        """
+
+        try:
+            self.client.delete(self.failures_key)
+        except redis.RedisError as exc:
+            logger.warning("Не удалось сбросить счетчик автомата %s: %s", self.name, exc)
+
+
+_breaker = None
+
+
+def get_telegram_circuit_breaker():
+    """
+    Возвращает общий для процесса автомат обращений к Telegram API.
+    """
+
+    global _breaker
+
+    if _breaker is None:
+        _breaker = CircuitBreaker("telegram")
+
+    return _breaker
@@ -0,0 +1,160 @@
+import logging
+from datetime import date, datetime, time, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from main.models import HabitCompletion, HabitStreak
+from main.scheduling import get_zone
+
+logger = logging.getLogger(__name__)
+
+COMPLETION_TABLE = HabitCompletion._meta.db_table
+
+
+def add_months(day, months):
+    """
+    Возвращает первое число месяца, отстоящего от месяца day на months месяцев.
+    """
+
+    years, month = divmod(day.month - 1 + months, 12)
+
+    return date(day.year + years, month + 1, 1)
+
+
+def get_partition_name(month):
+    """
+    Возвращает имя секции журнала выполнений за месяц, например main_habitcompletion_p202610.
+    """
+
+    return f"{COMPLETION_TABLE}_p{month:%Y%m}"
+
+
+def create_completion_partitions(months_ahead=None, today=None):
+    """
+    Создает недостающие месячные секции журнала выполнений на текущий и следующие месяцы.
+
+    Аргументы:
+        months_ahead : int, optional
+            Количество месяцев вперед. По умолчанию HABIT_COMPLETION_PARTITIONS_AHEAD.
+        today : date, optional
+            Текущая дата (UTC). По умолчанию сегодня.
+
+    Возвращает:
+        list: Имена обработанных секций.
+
+    Описание:
+        Границы секций задаются в UTC. Строки, для месяца которых секция не создана, попадают в секцию по умолчанию;
+        если в ней уже есть строки этого месяца, Postgres не позволит создать секцию - ошибка записывается в журнал, а
+        остальные секции создаются.
+    """
+
+    months_ahead = settings.HABIT_COMPLETION_PARTITIONS_AHEAD if months_ahead is None else months_ahead
+    first_month = add_months(today or timezone.now().date(), 0)
+    partitions = []
+
+    for offset in range(months_ahead + 1):
+        lower = add_months(first_month, offset)
+        upper = add_months(first_month, offset + 1)
+        name = get_partition_name(lower)
+        bounds = [datetime.combine(day, time.min, tzinfo=dt_timezone.utc).isoformat() for day in (lower, upper)]
+
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {COMPLETION_TABLE} "
+                    f"FOR VALUES FROM ('{bounds[0]}') TO ('{bounds[1]}')"
+                )
+        except DatabaseError:
+            logger.exception("Не удалось создать секцию %s журнала выполнений", name)
+            continue
+
+        partitions.append(name)
+
+    return partitions
+
+
+def apply_completion(streak, day, frequency):
+    """
+    Обновляет счетчики серии с учетом выполнения привычки в день day.
+
+    Аргументы:
+        streak : HabitStreak
+            Счетчики привычки.
+        day : date
+            Дата выполнения в часовом поясе владельца.
+        frequency : int
+            Периодичность привычки в днях.
+
+    Описание:
+        Серия продолжается, если с предыдущего выполнения прошло не больше периода привычки, и начинается заново
+        после пропуска. Повторное выполнение в тот же день увеличивает только общее количество выполнений.
+    """
+
+    last = streak.last_completed_on
+    streak.total_completions += 1
+
+    if last is None or (day - last).days > frequency:
+        streak.current_streak = 1
+    elif day > last:
+        streak.current_streak += 1
+
+    streak.best_streak = max(streak.best_streak, streak.current_streak)
+
+    if last is None or day > last:
+        streak.last_completed_on = day
+
+
+def get_current_streak(streak, frequency, today):
+    """
+    Возвращает текущую серию с учетом пропуска, наступившего после последнего выполнения.
+    """
+
+    if streak.last_completed_on is None or (today - streak.last_completed_on).days > frequency:
+        return 0
+
+    return streak.current_streak
+
+
+def complete_habit(habit, source=HabitCompletion.SOURCE_API, now=None):
+    """
+    Отмечает выполнение привычки и обновляет ее счетчики.
+
+    Аргументы:
+        habit : Habit
+            Выполненная привычка (с загруженным владельцем).
+        source : str
+            Источник отметки (HabitCompletion.SOURCE_API или SOURCE_TELEGRAM).
+        now : datetime, optional
+            Момент выполнения. По умолчанию текущее время.
+
+    Возвращает:
+        HabitStreak: Обновленные счетчики привычки.
+
+    Описание:
+        Запись добавляется в журнал вместе с датой, часом и днем недели в часовом поясе владельца на момент
+        отметки (последующая смена часового пояса не переносит прошлые выполнения), а счетчики обновляются в той
+        же транзакции под блокировкой строки HabitStreak, поэтому параллельные отметки не теряют приращений, а
+        чтение серии не требует просмотра истории.
+    """
+
+    now = now or timezone.now()
+    local = now.astimezone(get_zone(habit.owner.timezone))
+    day = local.date()
+
+    with transaction.atomic():
+        HabitCompletion.objects.create(
+            habit=habit,
+            owner_id=habit.owner_id,
+            completed_at=now,
+            local_date=day,
+            local_hour=local.hour,
+            local_weekday=local.isoweekday(),
+            source=source,
+        )
+        streak, _ = HabitStreak.objects.select_for_update().get_or_create(habit=habit)
+        apply_completion(streak, day, habit.frequency)
+        streak.save()
+
+    return streak
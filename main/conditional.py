@@ -0,0 +1,75 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    """
+    Формирует ETag ответа из значений, однозначно определяющих его содержимое.
+
+    Аргументы:
+        parts : tuple
+            Значения (идентификаторы, даты изменения, параметры запроса), от которых зависит тело ответа.
+
+    Возвращает:
+        str: Строгий ETag в кавычках.
+    """
+
+    digest = hashlib.md5("|".join(str(part) for part in parts).encode(), usedforsecurity=False).hexdigest()
+
+    return quote_etag(digest)
+
+
+def set_validators(response, etag, last_modified=None):
+    """
+    Добавляет в ответ валидаторы кэша (ETag, Last-Modified) и заголовки, запрещающие хранить ответ в общих кэшах.
+
+    Аргументы:
+        response : HttpResponse
+            Ответ представления.
+        etag : str
+            ETag ответа.
+        last_modified : datetime или None
+            Момент последнего изменения данных ответа.
+
+    Возвращает:
+        HttpResponse: Тот же ответ.
+    """
+
+    response.headers["ETag"] = etag
+
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified.timestamp())
+
+    # Ответ зависит от пользователя и формата, поэтому клиент обязан перепроверять его при каждом запросе.
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ("Accept", "Authorization"))
+
+    return response
+
+
+def get_not_modified_response(request, etag, last_modified=None):
+    """
+    Проверяет условные заголовки запроса (If-None-Match, If-Modified-Since) до сериализации ответа.
+
+    Аргументы:
+        request : Request
+            Текущий запрос.
+        etag : str
+            ETag текущей версии данных.
+        last_modified : datetime или None
+            Момент последнего изменения данных.
+
+    Возвращает:
+        HttpResponse или None: Ответ 304 Not Modified (412 при невыполненном If-Match) с валидаторами, если у
+        клиента актуальная версия данных, иначе None.
+    """
+
+    timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+    if response is not None:
+        set_validators(response, etag, last_modified)
+
+    return response
@@ -0,0 +1,279 @@
+import json
+import logging
+import time
+import uuid
+
+import redis
+from celery import current_app
+from django.conf import settings
+
+from main.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Атомарно выдает до ARGV[2] задач, срок которых наступил к моменту ARGV[1], перенося их запуск на момент ARGV[3]
+# (окончание аренды): параллельный обработчик не получит задачу, пока аренда не истекла, а задача обработчика,
+# завершившегося до подтверждения отправки, будет выдана повторно. Возвращает пары (идентификатор, данные).
+CLAIM_SCRIPT = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+local jobs = {}
+
+for i, id in ipairs(ids) do
+    local payload = redis.call('HGET', KEYS[2], id)
+
+    if payload then
+        redis.call('ZADD', KEYS[1], ARGV[3], id)
+        jobs[#jobs + 1] = id
+        jobs[#jobs + 1] = payload
+    else
+        redis.call('ZREM', KEYS[1], id)
+    end
+end
+
+return jobs
+"""
+
+# Удаляет отправленные задачи (пары идентификатор, окончание аренды в ARGV), если их запуск не был перенесен
+# повторной постановкой с тем же идентификатором во время аренды.
+ACK_SCRIPT = """
+for i = 1, #ARGV, 2 do
+    local score = redis.call('ZSCORE', KEYS[1], ARGV[i])
+
+    if score and tonumber(score) == tonumber(ARGV[i + 1]) then
+        redis.call('ZREM', KEYS[1], ARGV[i])
+        redis.call('HDEL', KEYS[2], ARGV[i])
+    end
+end
+"""
+
+# Возвращает неотправленные задачи (пары в ARGV, начиная со второго) к запуску в момент ARGV[1], если их запуск не
+# был перенесен во время аренды.
+RELEASE_SCRIPT = """
+for i = 2, #ARGV, 2 do
+    local score = redis.call('ZSCORE', KEYS[1], ARGV[i])
+
+    if score and tonumber(score) == tonumber(ARGV[i + 1]) then
+        redis.call('ZADD', KEYS[1], ARGV[1], ARGV[i])
+    end
+end
+"""
+
+
+class DelayedQueue:
+    """
+    Очередь отложенных задач Celery в Redis.
+
+    Задачи хранятся в сортированном множестве (оценка - момент запуска в секундах Unix) и таблице с данными задач.
+    Постановка в очередь и отмена выполняются за O(log n) и не создают периодических задач django-celery-beat;
+    наступившие задачи отправляет в брокер задача drain_delayed_queue, которую celery beat запускает каждые
+    DELAYED_QUEUE_POLL_INTERVAL секунд.
+
+    Задача удаляется из очереди только после отправки в брокер: при выдаче ее запуск переносится на
+    DELAYED_QUEUE_VISIBILITY_TIMEOUT секунд (аренда), поэтому задача, выданная обработчику, завершившемуся до
+    отправки, не теряется, а отправляется повторно после окончания аренды.
+
+    Атрибуты:
+        client : redis.Redis
+            Клиент Redis, в котором хранится очередь.
+    """
+
+    queue_key = "delayed:queue"
+    payload_key = "delayed:payload"
+
+    def __init__(self, client=None):
+        self.client = client or get_redis()
+        self.claim_script = self.client.register_script(CLAIM_SCRIPT)
+        self.ack_script = self.client.register_script(ACK_SCRIPT)
+        self.release_script = self.client.register_script(RELEASE_SCRIPT)
+
+    def schedule(self, task_name, args=(), kwargs=None, countdown=0, job_id=None, options=None):
+        """
+        Ставит задачу Celery в очередь на запуск через countdown секунд.
+
+        Аргументы:
+            task_name : str
+                Имя задачи, например "main.tasks.send_tg_notification".
+            args : tuple
+                Позиционные аргументы задачи.
+            kwargs : dict, optional
+                Именованные аргументы задачи.
+            countdown : float
+                Задержка запуска в секундах.
+            job_id : str, optional
+                Идентификатор в очереди. Повторная постановка с тем же идентификатором переносит запуск, а не
+                добавляет еще одну задачу. По умолчанию генерируется уникальный.
+            options : dict, optional
+                Параметры отправки задачи (например, queue или retries).
+
+        Возвращает:
+            str: Идентификатор задачи в очереди.
+
+        Исключения:
+            redis.RedisError: Если Redis недоступен.
+        """
+
+        job_id = job_id or uuid.uuid4().hex
+        payload = json.dumps({"task": task_name, "args": list(args), "kwargs": kwargs or {}, "options": options or {}})
+
+        pipeline = self.client.pipeline()
+        pipeline.hset(self.payload_key, job_id, payload)
+        pipeline.zadd(self.queue_key, {job_id: time.time() + countdown})
+        pipeline.execute()
+
+        return job_id
+
+    def cancel(self, job_id):
+        """
+        Удаляет задачу из очереди. Возвращает True, если задача была в очереди.
+        """
+
+        pipeline = self.client.pipeline()
+        pipeline.zrem(self.queue_key, job_id)
+        pipeline.hdel(self.payload_key, job_id)
+
+        return bool(pipeline.execute()[0])
+
+    def claim_due(self, now=None, limit=None):
+        """
+        Выдает задачи, срок запуска которых наступил, в аренду на DELAYED_QUEUE_VISIBILITY_TIMEOUT секунд.
+
+        Аргументы:
+            now : float, optional
+                Момент в секундах Unix. По умолчанию текущее время.
+            limit : int, optional
+                Максимальное количество задач. По умолчанию DELAYED_QUEUE_BATCH_SIZE.
+
+        Возвращает:
+            list: Словари с ключами task, args, kwargs и options, а также job_id (идентификатор в очереди) и lease
+            (окончание аренды). Каждую задачу нужно подтвердить (ack) после отправки или вернуть (release).
+        """
+
+        now = time.time() if now is None else now
+        limit = limit or settings.DELAYED_QUEUE_BATCH_SIZE
+        lease = now + settings.DELAYED_QUEUE_VISIBILITY_TIMEOUT
+        result = self.claim_script(keys=[self.queue_key, self.payload_key], args=[now, limit, lease])
+
+        return [
+            {**json.loads(payload), "job_id": job_id.decode(), "lease": lease}
+            for job_id, payload in zip(result[::2], result[1::2])
+        ]
+
+    def ack(self, jobs):
+        """
+        Удаляет из очереди отправленные задачи, выданные claim_due.
+
+        Описание:
+            Задача, повторно поставленная с тем же идентификатором во время аренды, остается в очереди с новым
+            моментом запуска.
+        """
+
+        if jobs:
+            self.ack_script(
+                keys=[self.queue_key, self.payload_key], args=[value for job in jobs for value in self.lease_of(job)]
+            )
+
+    def release(self, jobs, now=None):
+        """
+        Возвращает неотправленные задачи, выданные claim_due, к запуску в момент now (по умолчанию сейчас).
+        """
+
+        if jobs:
+            now = time.time() if now is None else now
+            self.release_script(
+                keys=[self.queue_key], args=[now, *(value for job in jobs for value in self.lease_of(job))]
+            )
+
+    @staticmethod
+    def lease_of(job):
+        return job["job_id"], job["lease"]
+
+    def drain(self, now=None, limit=None):
+        """
+        Отправляет в брокер Celery все задачи, срок запуска которых наступил.
+
+        Возвращает:
+            int: Количество отправленных задач.
+
+        Описание:
+            Задачи выдаются пакетами по DELAYED_QUEUE_BATCH_SIZE и удаляются из очереди после отправки. Если брокер
+            недоступен, неотправленные задачи возвращаются в очередь с текущим моментом запуска и будут отправлены
+            следующим запуском; при аварийном завершении процесса - после окончания аренды.
+        """
+
+        limit = limit or settings.DELAYED_QUEUE_BATCH_SIZE
+        sent = 0
+
+        while True:
+            jobs = self.claim_due(now, limit)
+            sent_jobs = []
+
+            try:
+                for job in jobs:
+                    current_app.send_task(job["task"], args=job["args"], kwargs=job["kwargs"], **job["options"])
+                    sent_jobs.append(job)
+            except Exception:
+                self.release(jobs[len(sent_jobs):])
+                raise
+            finally:
+                self.ack(sent_jobs)
+
+            sent += len(sent_jobs)
+
+            if len(jobs) < limit:
+                return sent
+
+
+_queue = None
+
+
+def get_delayed_queue():
+    """
+    Возвращает общую для процесса очередь отложенных задач.
+    """
+
+    global _queue
+
+    if _queue is None:
+        _queue = DelayedQueue()
+
+    return _queue
+
+
+def schedule_task(task, args=(), kwargs=None, countdown=0, job_id=None):
+    """
+    Ставит задачу Celery в очередь отложенных задач, а при недоступности Redis - в брокер с задержкой countdown.
+
+    Аргументы:
+        task : celery.Task
+            Задача.
+        args, kwargs, countdown, job_id:
+            См. DelayedQueue.schedule.
+    """
+
+    try:
+        get_delayed_queue().schedule(task.name, args, kwargs, countdown, job_id)
+    except redis.RedisError as exc:
+        logger.warning("Очередь отложенных задач недоступна, задача %s отправлена в брокер: %s", task.name, exc)
+        task.apply_async(args, kwargs, countdown=countdown)
+
+
+def cancel_task(job_id):
+    """
+    Удаляет задачу из очереди отложенных задач.
+
+    Аргументы:
+        job_id : str
+            Идентификатор задачи в очереди (см. DelayedQueue.schedule).
+
+    Возвращает:
+        bool: True, если задача была в очереди; False, если ее нет или Redis недоступен.
+
+    Описание:
+        Задача, отправленная в брокер при недоступности Redis (см. schedule_task), не отменяется.
+    """
+
+    try:
+        return get_delayed_queue().cancel(job_id)
+    except redis.RedisError as exc:
+        logger.warning("Очередь отложенных задач недоступна, задача %s не отменена: %s", job_id, exc)
+        return False
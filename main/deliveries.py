@@ -0,0 +1,167 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from main.models import Habit, ReminderDelivery
+from main.scheduling import get_last_due_at
+
+
+def create_deliveries(habits):
+    """
+    Создает записи журнала доставки для наступивших напоминаний одним запросом.
+
+    Аргументы:
+        habits : list
+            Привычки, для которых отправляется напоминание на момент next_due_at.
+
+    Возвращает:
+        list: Записи ReminderDelivery с первичными ключами в порядке habits.
+
+    Описание:
+        Если запись для пары (привычка, момент) уже существует, используется она (ON CONFLICT DO UPDATE без
+        изменения данных), поэтому повторная постановка того же напоминания не отправит его второй раз.
+    """
+
+    return ReminderDelivery.objects.bulk_create(
+        [ReminderDelivery(habit_id=habit.pk, scheduled_for=habit.next_due_at) for habit in habits],
+        update_conflicts=True,
+        unique_fields=["habit", "scheduled_for"],
+        update_fields=["scheduled_for"],
+    )
+
+
+def claim_deliveries(delivery_ids, now=None):
+    """
+    Берет на отправку еще не взятые напоминания.
+
+    Аргументы:
+        delivery_ids : iterable
+            Идентификаторы записей ReminderDelivery.
+        now : datetime, optional
+            Момент взятия. По умолчанию текущее время.
+
+    Возвращает:
+        set: Идентификаторы напоминаний, которые должен отправить вызывающий обработчик.
+
+    Описание:
+        Строки блокируются с SKIP LOCKED и помечаются в одной транзакции: параллельный обработчик пропускает
+        заблокированные строки, а после фиксации - уже взятые, поэтому каждое напоминание достается одному
+        обработчику.
+    """
+
+    with transaction.atomic():
+        claimed = set(
+            ReminderDelivery.objects.select_for_update(skip_locked=True)
+            .filter(pk__in=list(delivery_ids), claimed_at__isnull=True)
+            .values_list("pk", flat=True)
+        )
+
+        if claimed:
+            ReminderDelivery.objects.filter(pk__in=claimed).update(claimed_at=now or timezone.now())
+
+    return claimed
+
+
+def claim_reminder(habit_id, now=None):
+    """
+    Берет на отправку напоминание о привычке, запланированное на последний наступивший момент.
+
+    Аргументы:
+        habit_id : int
+            Идентификатор привычки.
+        now : datetime, optional
+            Текущее время. По умолчанию timezone.now().
+
+    Возвращает:
+        int: Идентификатор записи ReminderDelivery или None, если напоминание уже отправлено (взято) или привычка
+        удалена.
+
+    Описание:
+        Используется периодическими задачами напоминаний (REMINDER_MODE = "periodic_task"), для которых запись
+        журнала заранее не создается: она создается при взятии, а повторный запуск задачи нарушит уникальность пары
+        (привычка, момент) и не получит напоминание. Условный UPDATE ... WHERE claimed_at IS NULL атомарен: из
+        параллельных запусков строку получает только один.
+
+        Момент напоминания определяется по часам воркера с запасом REMINDER_CLOCK_SKEW: kwargs периодической задачи
+        неизменны и не содержат момент запуска, а если часы воркера отстают от часов celery beat, без запаса
+        задача, запущенная в момент напоминания, получила бы ключ предыдущего дня и сегодняшнее напоминание было бы
+        отброшено как уже отправленное.
+    """
+
+    now = now or timezone.now()
+    habit = Habit.objects.filter(pk=habit_id).values_list("time", "owner__timezone").first()
+
+    if habit is None:
+        return None
+
+    scheduled_for = get_last_due_at(habit[0], now + settings.REMINDER_CLOCK_SKEW, habit[1])
+    reminder = ReminderDelivery.objects.filter(habit_id=habit_id, scheduled_for=scheduled_for)
+
+    # Запись уже есть, если отправка была отложена и возвращена release_deliveries.
+    if reminder.filter(claimed_at__isnull=True).update(claimed_at=now):
+        return reminder.values_list("pk", flat=True).get()
+
+    try:
+        with transaction.atomic():
+            return ReminderDelivery.objects.create(habit_id=habit_id, scheduled_for=scheduled_for, claimed_at=now).pk
+    except IntegrityError:
+        return None
+
+
+def release_deliveries(delivery_ids):
+    """
+    Возвращает напоминания, отправка которых отложена (ограничение частоты), чтобы повтор задачи мог их взять.
+    """
+
+    delivery_ids = [delivery_id for delivery_id in delivery_ids if delivery_id is not None]
+
+    if delivery_ids:
+        ReminderDelivery.objects.filter(pk__in=delivery_ids).update(claimed_at=None)
+
+
+def mark_delivered(delivery_ids, now=None):
+    """
+    Отмечает момент успешной отправки напоминаний.
+    """
+
+    delivery_ids = [delivery_id for delivery_id in delivery_ids if delivery_id is not None]
+
+    if delivery_ids:
+        ReminderDelivery.objects.filter(pk__in=delivery_ids).update(sent_at=now or timezone.now())
+
+
+def get_park_deadline(delivery_ids, expires_at=None):
+    """
+    Возвращает срок, после которого отложенное до замыкания автомата сообщение не отправляется.
+
+    Аргументы:
+        delivery_ids : iterable
+            Идентификаторы записей ReminderDelivery откладываемых напоминаний.
+        expires_at : float, optional
+            Срок, назначенный при предыдущем откладывании (Unix-время). Если указан, возвращается без изменений.
+
+    Возвращает:
+        float: Unix-время: самый ранний момент напоминания (или текущее время для сообщений без записи журнала)
+        плюс REMINDER_DISPATCH_GRACE.
+
+    Описание:
+        Срок назначается один раз, при первом откладывании, и переносится в повторные постановки, поэтому сообщение
+        не возвращается в очередь бесконечно, пока автомат разомкнут: напоминание, опоздавшее больше чем на
+        REMINDER_DISPATCH_GRACE, уже бесполезно (тот же допуск, что и у dispatch_due_reminders).
+    """
+
+    if expires_at is not None:
+        return expires_at
+
+    delivery_ids = [delivery_id for delivery_id in delivery_ids if delivery_id is not None]
+    scheduled_for = None
+
+    if delivery_ids:
+        scheduled_for = (
+            ReminderDelivery.objects.filter(pk__in=delivery_ids)
+            .order_by("scheduled_for")
+            .values_list("scheduled_for", flat=True)
+            .first()
+        )
+
+    return ((scheduled_for or timezone.now()) + settings.REMINDER_DISPATCH_GRACE).timestamp()
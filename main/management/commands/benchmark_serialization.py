@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from main.models import Habit
+from main.renderers import ORJSONRenderer, orjson
+from main.serializers import HabitSerializer, HabitValuesSerializer
+
+
+class Command(BaseCommand):
+    """
+    Команда для сравнения затрат процессорного времени на сериализацию списка привычек.
+
+    Для каждого варианта (HabitSerializer с экземплярами модели, HabitValuesSerializer со строками QuerySet.values(),
+    рендеринг стандартным json и orjson, выборка части полей) измеряется процессорное время процесса (включая
+    выборку строк и создание объектов, но без времени работы сервера базы данных) в пересчете на 1000 привычек.
+    """
+
+    help = "Измеряет процессорное время сериализации списка привычек на 1000 привычек"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--habits", type=int, default=1000, help="Количество привычек в списке")
+        parser.add_argument("--repeat", type=int, default=20, help="Количество повторов каждого варианта")
+        parser.add_argument(
+            "--fields",
+            default="id,action,time,is_public",
+            help="Поля для варианта с выборкой части полей",
+        )
+
+    def handle(self, *args, **options):
+        limit = options["habits"]
+        queryset = Habit.objects.order_by("id")[:limit]
+        count = queryset.count()
+
+        if not count:
+            raise CommandError("Нет привычек. Заполните базу командой seed_benchmark_data.")
+
+        sparse = HabitValuesSerializer(options["fields"].split(","))
+        compact = HabitValuesSerializer()
+        variants = {
+            "model_serializer+json": lambda: JSONRenderer().render(
+                HabitSerializer(queryset.select_related("owner", "related_habit"), many=True).data
+            ),
+            "values+json": lambda: JSONRenderer().render(
+                compact.to_representation(queryset.values(*compact.fields))
+            ),
+            "values+orjson": lambda: ORJSONRenderer().render(
+                compact.to_representation(queryset.values(*compact.fields))
+            ),
+            "values_sparse+orjson": lambda: ORJSONRenderer().render(
+                sparse.to_representation(queryset.values(*sparse.fields))
+            ),
+        }
+
+        if orjson is None:
+            self.stdout.write("orjson не установлен, варианты +orjson используют стандартный json")
+
+        self.stdout.write(f"{'variant':<24}{'cpu ms/1000':>14}{'bytes':>12}")
+        baseline = None
+
+        for name, render in variants.items():
+            content = render()
+            started = time.process_time()
+
+            for _ in range(options["repeat"]):
+                render()
+
+            cpu = (time.process_time() - started) / options["repeat"] * 1000 / count * 1000
+            baseline = baseline or cpu
+            self.stdout.write(f"{name:<24}{cpu:>14.2f}{len(content):>12}  x{baseline / cpu:.1f}")
@@ -0,0 +1,132 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import requests
+from django.core.management.base import CommandError
+
+from main.benchmarks import HttpTransport, benchmark_email, format_report, run_scenario
+from main.management.commands.run_benchmarks import Command as BenchmarkCommand
+
+SERVERS = {
+    "wsgi": ["-m", "gunicorn", "config.wsgi:application", "--bind", "127.0.0.1:{port}", "--workers", "{workers}"],
+    "asgi": [
+        "-m", "uvicorn", "config.asgi:application", "--port", "{port}", "--workers", "{workers}",
+        "--no-access-log", "--log-level", "warning",
+    ],
+}
+HTTP_SCENARIOS = ("habit_list", "habit_retrieve", "public_feed")
+
+
+def get_free_port():
+    """
+    Возвращает свободный TCP-порт на локальном интерфейсе.
+    """
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get_process_tree_rss(pid):
+    """
+    Возвращает суммарный объем резидентной памяти процесса и его потомков в мегабайтах (только Linux).
+
+    Возвращает:
+        float или None: Объем памяти или None, если /proc недоступен.
+    """
+
+    total = 0
+    pids = [pid]
+
+    try:
+        while pids:
+            current = pids.pop()
+
+            with open(f"/proc/{current}/status") as file:
+                for line in file:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+
+            with open(f"/proc/{current}/task/{current}/children") as file:
+                pids.extend(int(child) for child in file.read().split())
+    except OSError:
+        return None
+
+    return total / 1024
+
+
+class Command(BenchmarkCommand):
+    """
+    Команда для сравнения пропускной способности WSGI (gunicorn) и ASGI (uvicorn) развертываний.
+
+    Оба сервера запускаются с одинаковым количеством процессов (--workers), то есть с сопоставимым объемом памяти,
+    который измеряется и выводится вместе с результатами. Сценарии выполняются по HTTP с параллельностью
+    --concurrency от имени пользователя, созданного командой seed_benchmark_data.
+    """
+
+    help = "Сравнивает req/s и задержки WSGI и ASGI серверов при одинаковом количестве процессов"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--servers", nargs="+", choices=SERVERS, default=list(SERVERS), help="Серверы")
+        parser.add_argument("--workers", type=int, default=2, help="Количество процессов сервера")
+        parser.add_argument("--concurrency", type=int, default=50, help="Количество параллельных HTTP-клиентов")
+        parser.add_argument("--iterations", type=int, default=1000, help="Количество запросов в каждом сценарии")
+        parser.add_argument(
+            "--scenarios",
+            nargs="+",
+            choices=HTTP_SCENARIOS,
+            default=["habit_list", "habit_retrieve"],
+            help="Выполняемые сценарии",
+        )
+        parser.add_argument("--user", type=int, default=1, help="Номер пользователя bench<N>@benchmark.local")
+
+    def handle(self, *args, **options):
+        email = benchmark_email(options["user"])
+        results = []
+
+        for server in options["servers"]:
+            port = get_free_port()
+            command = [
+                part.format(port=port, workers=options["workers"]) for part in SERVERS[server]
+            ]
+            process = subprocess.Popen([sys.executable, *command], env=os.environ.copy())
+
+            try:
+                base_url = f"http://127.0.0.1:{port}"
+                self.wait_until_ready(process, base_url)
+                transport = HttpTransport(base_url, options["concurrency"])
+                token = self.obtain_token(transport, email)
+
+                for scenario in options["scenarios"]:
+                    make_request = getattr(self, f"make_{scenario}")(transport, token, email)
+                    run_scenario(scenario, transport, options["concurrency"], make_request)
+                    result = run_scenario(f"{server}:{scenario}", transport, options["iterations"], make_request)
+                    result["rss_mb"] = get_process_tree_rss(process.pid)
+                    results.append(result)
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+
+        self.stdout.write(format_report(results))
+
+        for result in results:
+            rss = "-" if result["rss_mb"] is None else f"{result['rss_mb']:.0f} MB"
+            self.stdout.write(f"{result['scenario']}: память сервера {rss}")
+
+    def wait_until_ready(self, process, base_url, timeout=30):
+        deadline = time.monotonic() + timeout
+
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f"Сервер завершился с кодом {process.returncode}")
+
+            try:
+                requests.get(f"{base_url}/admin/login/", timeout=1)
+                return
+            except requests.RequestException:
+                time.sleep(0.2)
+
+        raise CommandError(f"Сервер {base_url} не запустился за {timeout} с.")
@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django_celery_beat.models import PeriodicTask
+
+from main.models import Habit
+from main.reminders import bulk_sync, sync_periodic_tasks
+
+
+class Command(BaseCommand):
+    """
+    Команда для приведения периодических задач напоминаний в соответствие с привычками.
+
+    Удаляет задачи напоминаний, не связанные ни с одной привычкой (например, оставшиеся от прежней схемы именования
+    задач по действию и пользователю), и в режиме periodic_task создает задачи для привычек, у которых их нет.
+    """
+
+    help = "Удаляет осиротевшие периодические задачи напоминаний и создает недостающие"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только показать количество задач, ничего не изменяя",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Количество привычек, обрабатываемых за один пакет",
+        )
+
+    def handle(self, *args, **options):
+        orphans = PeriodicTask.objects.filter(
+            task="main.tasks.send_tg_notification", habit_reminder__isnull=True
+        )
+        missing = Habit.objects.filter(reminder__isnull=True).select_related("owner").order_by("id")
+
+        if settings.REMINDER_MODE != "periodic_task":
+            missing = missing.none()
+
+        if options["dry_run"]:
+            self.stdout.write(f"Осиротевших задач: {orphans.count()}")
+            self.stdout.write(f"Привычек без задачи: {missing.count()}")
+            return
+
+        with bulk_sync():
+            deleted, _ = orphans.delete()
+
+        created = 0
+        last_id = 0
+
+        while True:
+            batch = list(missing.filter(id__gt=last_id)[:options["batch_size"]])
+
+            if not batch:
+                break
+
+            sync_periodic_tasks(batch)
+            created += len(batch)
+            last_id = batch[-1].id
+
+        self.stdout.write(f"Удалено осиротевших задач: {deleted}")
+        self.stdout.write(f"Создано задач: {created}")
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django_celery_beat.models import PeriodicTask
+
+from main.reminders import bulk_sync
+
+
+class Command(BaseCommand):
+    """
+    Команда для удаления периодических задач напоминаний, созданных для отдельных привычек.
+
+    Используется при переходе на режим диспетчера (REMINDER_MODE = "dispatcher"), чтобы напоминания не отправлялись
+    дважды: и по задаче привычки, и диспетчером.
+    """
+
+    help = "Удаляет периодические задачи напоминаний о привычках из django-celery-beat"
+
+    def handle(self, *args, **options):
+        with bulk_sync():
+            deleted, _ = PeriodicTask.objects.filter(task="main.tasks.send_tg_notification").delete()
+        self.stdout.write(f"Удалено периодических задач: {deleted}")
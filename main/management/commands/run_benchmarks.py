@@ -0,0 +1,178 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from main.benchmarks import (
+    BENCHMARK_EMAIL_DOMAIN,
+    BENCHMARK_PASSWORD,
+    FakeTelegramServer,
+    HttpTransport,
+    InProcessTransport,
+    benchmark_email,
+    format_report,
+    run_scenario,
+    summarize,
+)
+from main.models import Habit
+from main.tasks import build_notification_message, send_tg_notifications_batch
+from users.models import CustomUser
+
+SCENARIOS = ("token", "habit_list", "habit_retrieve", "habit_create", "public_feed", "reminder_fanout")
+
+
+class Command(BaseCommand):
+    """
+    Команда для нагрузочного тестирования API привычек и рассылки напоминаний.
+
+    Сценарии выполняются от имени пользователя, созданного командой seed_benchmark_data. По умолчанию запросы
+    выполняются внутри процесса тестовым клиентом Django, что позволяет подсчитать количество запросов к базе данных
+    на каждый HTTP-запрос. С опцией --base-url запросы отправляются запущенному серверу по HTTP с заданной
+    параллельностью. Сценарий reminder_fanout отправляет напоминания задачей send_tg_notifications_batch на локальный
+    фейковый сервер Telegram.
+    """
+
+    help = "Выполняет нагрузочные сценарии и выводит req/s, p50/p95/p99 задержки и количество запросов к БД"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200, help="Количество запросов в каждом сценарии")
+        parser.add_argument(
+            "--scenarios",
+            nargs="+",
+            choices=SCENARIOS,
+            default=SCENARIOS,
+            help="Выполняемые сценарии",
+        )
+        parser.add_argument("--user", type=int, default=1, help="Номер пользователя bench<N>@benchmark.local")
+        parser.add_argument("--base-url", help="Адрес запущенного сервера, например http://localhost:8000")
+        parser.add_argument("--concurrency", type=int, default=1, help="Количество параллельных HTTP-клиентов")
+        parser.add_argument("--fanout-messages", type=int, default=1000, help="Количество напоминаний в рассылке")
+        parser.add_argument(
+            "--rate-limit",
+            action="store_true",
+            help="Учитывать ограничитель частоты Telegram в сценарии reminder_fanout",
+        )
+        parser.add_argument("--json", dest="json_path", help="Сохранить результаты в JSON-файл")
+
+    def handle(self, *args, **options):
+        if options["base_url"]:
+            transport = HttpTransport(options["base_url"], options["concurrency"])
+        else:
+            transport = InProcessTransport()
+
+        email = benchmark_email(options["user"])
+        iterations = options["iterations"]
+        results = []
+
+        for scenario in options["scenarios"]:
+            if scenario == "reminder_fanout":
+                results.append(self.run_fanout(options["fanout_messages"], options["rate_limit"]))
+                continue
+
+            token = self.obtain_token(transport, email)
+            make_request = getattr(self, f"make_{scenario}")(transport, token, email)
+            results.append(run_scenario(scenario, transport, iterations, make_request))
+
+        self.stdout.write(format_report(results))
+
+        if options["json_path"]:
+            with open(options["json_path"], "w") as file:
+                json.dump(results, file, indent=2)
+
+    def obtain_token(self, transport, email):
+        sample, body = transport.request("post", "/users/token/", {"email": email, "password": BENCHMARK_PASSWORD})
+
+        if sample["status"] != 200:
+            raise CommandError(
+                f"Не удалось получить токен для {email}. Заполните базу командой seed_benchmark_data."
+            )
+
+        return body["access"]
+
+    def make_token(self, transport, token, email):
+        data = {"email": email, "password": BENCHMARK_PASSWORD}
+
+        def make_request(number):
+            return transport.request("post", "/users/token/", data)[0]
+
+        return make_request
+
+    def make_habit_list(self, transport, token, email):
+        def make_request(number):
+            return transport.request("get", "/api/habits/", token=token)[0]
+
+        return make_request
+
+    def make_habit_retrieve(self, transport, token, email):
+        ids = list(Habit.objects.filter(owner__email=email).order_by("id").values_list("id", flat=True)[:100])
+
+        if not ids:
+            raise CommandError(f"У пользователя {email} нет привычек.")
+
+        def make_request(number):
+            return transport.request("get", f"/api/habits/{ids[number % len(ids)]}/", token=token)[0]
+
+        return make_request
+
+    def make_habit_create(self, transport, token, email):
+        owner = CustomUser.objects.values_list("id", flat=True).get(email=email)
+
+        def make_request(number):
+            data = {
+                "owner": owner,
+                "place": "Дом",
+                "time": "08:00:00",
+                "action": f"benchmark create {number}",
+                "frequency": 1,
+                "reward": "benchmark reward",
+                "time_to_complete": 60,
+            }
+            return transport.request("post", "/api/habits/", data, token=token)[0]
+
+        return make_request
+
+    def make_public_feed(self, transport, token, email):
+        def make_request(number):
+            return transport.request("get", "/api/habits/public/", token=token)[0]
+
+        return make_request
+
+    def run_fanout(self, count, rate_limit):
+        habits = Habit.objects.filter(owner__email__endswith=f"@{BENCHMARK_EMAIL_DOMAIN}").select_related("owner")
+        notifications = [
+            [habit.owner.tg_id, build_notification_message(habit.action, habit.reward)]
+            for habit in habits[:count]
+        ]
+        batch_size = settings.TELEGRAM_BATCH_SIZE
+        samples = []
+
+        with FakeTelegramServer() as server, override_settings(
+            TELEGRAM_URL=server.url, TELEGRAM_RATE_LIMIT_ENABLED=rate_limit
+        ):
+            started = time.perf_counter()
+
+            for start in range(0, len(notifications), batch_size):
+                with CaptureQueriesContext(connection) as context:
+                    batch_started = time.perf_counter()
+                    result = send_tg_notifications_batch.apply(args=(notifications[start:start + batch_size],))
+                    latency = time.perf_counter() - batch_started
+
+                samples.append(
+                    {"latency": latency, "status": 200 if result.successful() else 500, "queries": len(context)}
+                )
+
+            elapsed = time.perf_counter() - started
+
+        summary = summarize("reminder_fanout", samples, elapsed)
+        summary["messages"] = len(server.requests)
+        summary["messages_per_second"] = len(server.requests) / elapsed if elapsed else 0.0
+        self.stdout.write(
+            f"reminder_fanout: отправлено {summary['messages']} сообщений, "
+            f"{summary['messages_per_second']:.1f} сообщений/с (строка отчета - пачки по {batch_size})"
+        )
+
+        return summary
@@ -0,0 +1,109 @@
+import random
+from datetime import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main.benchmarks import BENCHMARK_EMAIL_DOMAIN, BENCHMARK_PASSWORD, benchmark_email
+from main.cache import bump_public_feed_version
+from main.changes import record_deleted_habits
+from main.models import Habit, HabitReminder
+from main.reminders import bulk_sync, delete_periodic_tasks, sync_periodic_tasks
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    """
+    Команда для заполнения базы данных пользователями и привычками для нагрузочного тестирования.
+
+    Пользователи создаются с email вида bench<N>@benchmark.local и общим паролем BENCHMARK_PASSWORD, что позволяет
+    удалить их вместе с привычками опцией --clear.
+    """
+
+    help = "Создает пользователей и привычки для нагрузочного тестирования"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100, help="Количество пользователей")
+        parser.add_argument("--habits", type=int, default=10000, help="Общее количество привычек")
+        parser.add_argument("--public-ratio", type=float, default=0.1, help="Доля публичных привычек")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Размер пакета bulk_create")
+        parser.add_argument(
+            "--with-reminders",
+            action="store_true",
+            help="Создать периодические задачи напоминаний (режим periodic_task)",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Начальное значение генератора случайных чисел")
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Удалить ранее созданные данные нагрузочного тестирования и завершить работу",
+        )
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            self.clear()
+            return
+
+        rng = random.Random(options["seed"])
+        password = make_password(BENCHMARK_PASSWORD)
+        existing = CustomUser.objects.filter(email__endswith=f"@{BENCHMARK_EMAIL_DOMAIN}").count()
+
+        users = CustomUser.objects.bulk_create(
+            (
+                CustomUser(email=benchmark_email(number), password=password, tg_id=number)
+                for number in range(existing + 1, existing + options["users"] + 1)
+            ),
+            batch_size=options["batch_size"],
+        )
+
+        if not users:
+            return
+
+        created = 0
+
+        while created < options["habits"]:
+            size = min(options["batch_size"], options["habits"] - created)
+            habits = []
+
+            for number in range(created, created + size):
+                habit_time = time(rng.randrange(24), rng.randrange(0, 60, 5))
+                habits.append(
+                    Habit(
+                        owner=users[number % len(users)],
+                        place=rng.choice(("Дом", "Офис", "Парк", "Спортзал")),
+                        time=habit_time,
+                        action=f"benchmark action {number}",
+                        frequency=rng.randint(1, 7),
+                        reward="benchmark reward",
+                        time_to_complete=rng.randint(1, 120),
+                        is_public=rng.random() < options["public_ratio"],
+                    )
+                )
+
+            Habit.refresh_next_due_ats(habits)
+
+            with transaction.atomic(), bulk_sync():
+                Habit.objects.bulk_create(habits)
+
+                if options["with_reminders"]:
+                    sync_periodic_tasks(habits)
+
+            created += size
+
+        bump_public_feed_version()
+        self.stdout.write(f"Создано пользователей: {len(users)}, привычек: {created}")
+
+    def clear(self):
+        users = CustomUser.objects.filter(email__endswith=f"@{BENCHMARK_EMAIL_DOMAIN}")
+
+        with transaction.atomic(), bulk_sync():
+            task_ids = list(
+                HabitReminder.objects.filter(habit__owner__in=users).values_list("periodic_task_id", flat=True)
+            )
+            record_deleted_habits(Habit.objects.filter(owner__in=users, is_public=True))
+            deleted, _ = users.delete()
+            delete_periodic_tasks(task_ids)
+
+        bump_public_feed_version()
+        self.stdout.write(f"Удалено объектов: {deleted}")
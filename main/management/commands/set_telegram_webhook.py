@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from main.services import get_telegram_session
+
+
+class Command(BaseCommand):
+    """
+    Команда для регистрации вебхука входящих обновлений в Telegram (метод setWebhook).
+
+    Telegram будет передавать TELEGRAM_WEBHOOK_SECRET в заголовке X-Telegram-Bot-Api-Secret-Token каждого запроса и
+    присылать только сообщения.
+    """
+
+    help = "Регистрирует вебхук бота в Telegram"
+
+    def add_arguments(self, parser):
+        parser.add_argument("url", help="Публичный адрес вебхука, например https://example.com/api/telegram/webhook/")
+        parser.add_argument(
+            "--max-connections",
+            type=int,
+            default=40,
+            help="Максимальное количество одновременных запросов Telegram к вебхуку",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.TELEGRAM_WEBHOOK_SECRET:
+            raise CommandError("Не задан TELEGRAM_WEBHOOK_SECRET.")
+
+        response = get_telegram_session().post(
+            f"{settings.TELEGRAM_URL}{settings.TELEGRAM_TOKEN}/setWebhook",
+            json={
+                "url": options["url"],
+                "secret_token": settings.TELEGRAM_WEBHOOK_SECRET,
+                "allowed_updates": ["message"],
+                "max_connections": options["max_connections"],
+            },
+        )
+
+        if not response.ok:
+            raise CommandError(f"Telegram отклонил запрос: {response.text}")
+
+        self.stdout.write(f"Вебхук зарегистрирован: {options['url']}")
@@ -0,0 +1,289 @@
+import glob
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+from celery.signals import before_task_publish, task_postrun, task_prerun, worker_init, worker_process_shutdown
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Histogram, generate_latest, multiprocess
+from prometheus_client import REGISTRY
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100, 200)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP-запроса",
+    ["view", "method", "status"],
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Количество запросов к базе данных на HTTP-запрос",
+    ["view", "method"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Суммарное время запросов к базе данных на HTTP-запрос",
+    ["view", "method"],
+)
+TASK_DURATION = Histogram(
+    "celery_task_duration_seconds",
+    "Время выполнения задачи Celery",
+    ["task", "state"],
+)
+TASK_QUEUE_LAG = Histogram(
+    "celery_task_queue_lag_seconds",
+    "Время ожидания задачи Celery в очереди от публикации (или наступления eta) до начала выполнения",
+    ["task"],
+)
+
+_task_started = {}
+_current_queries = ContextVar("current_queries", default=None)
+
+
+class QueryMetrics:
+    """
+    Статистика запросов к базе данных, выполненных при обработке одного HTTP-запроса.
+
+    Атрибуты:
+        count : int
+            Количество выполненных запросов.
+        duration : float
+            Суммарное время выполнения запросов в секундах.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+
+@contextmanager
+def track_queries():
+    """
+    Контекстный менеджер, собирающий статистику запросов к базе данных в текущем контексте выполнения.
+
+    Возвращает:
+        QueryMetrics: Статистика, заполняемая по мере выполнения запросов.
+
+    Описание:
+        Статистика хранится в ContextVar, поэтому учитываются и запросы асинхронных представлений, которые Django
+        выполняет в отдельном потоке (sync_to_async копирует контекст в поток).
+    """
+
+    queries = QueryMetrics()
+    token = _current_queries.set(queries)
+
+    try:
+        yield queries
+    finally:
+        _current_queries.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Обертка выполнения запросов к базе данных (connection.execute_wrapper), учитывающая их в текущей статистике.
+    """
+
+    queries = _current_queries.get()
+
+    if queries is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        queries.count += 1
+        queries.duration += time.perf_counter() - started
+
+
+@receiver(connection_created)
+def install_query_wrapper(sender, connection, **kwargs):
+    """
+    Подключает record_query к каждому новому соединению с базой данных.
+    """
+
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def observe_request(view, method, status, duration, queries):
+    """
+    Записывает метрики обработанного HTTP-запроса.
+
+    Аргументы:
+        view : str
+            Имя представления (маршрута), обработавшего запрос.
+        method : str
+            HTTP-метод.
+        status : int
+            Код ответа.
+        duration : float
+            Время обработки запроса в секундах.
+        queries : QueryMetrics
+            Статистика запросов к базе данных.
+    """
+
+    REQUEST_LATENCY.labels(view, method, str(status)).observe(duration)
+    REQUEST_DB_QUERIES.labels(view, method).observe(queries.count)
+    REQUEST_DB_DURATION.labels(view, method).observe(queries.duration)
+
+
+class MultiDirectoryCollector:
+    """
+    Сборщик метрик нескольких групп процессов, каждая из которых записывает файлы метрик в собственный каталог.
+
+    Атрибуты:
+        root : str
+            Общий каталог, подкаталоги которого - каталоги PROMETHEUS_MULTIPROC_DIR отдельных контейнеров.
+    """
+
+    def __init__(self, root, registry):
+        self.root = root
+        registry.register(self)
+
+    def collect(self):
+        files = glob.glob(os.path.join(self.root, "*", "*.db"))
+
+        return multiprocess.MultiProcessCollector.merge(files, accumulate=True)
+
+
+def get_registry():
+    """
+    Возвращает реестр метрик для выдачи на эндпоинте /metrics.
+
+    Описание:
+        Если задан PROMETHEUS_MULTIPROC_ROOT, объединяются метрики всех контейнеров (веб-сервер и воркеры Celery
+        записывают их в собственные подкаталоги, чтобы файлы процессов с одинаковыми pid не совпадали). Если задана
+        только переменная окружения PROMETHEUS_MULTIPROC_DIR, метрики собираются из файлов этого каталога. Иначе
+        используется реестр текущего процесса.
+    """
+
+    if settings.PROMETHEUS_MULTIPROC_ROOT:
+        registry = CollectorRegistry()
+        MultiDirectoryCollector(settings.PROMETHEUS_MULTIPROC_ROOT, registry)
+        return registry
+
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+
+    return REGISTRY
+
+
+def reset_multiprocess_dir():
+    """
+    Удаляет файлы метрик, оставшиеся в каталоге PROMETHEUS_MULTIPROC_DIR от предыдущего запуска.
+
+    Описание:
+        Вызывается главным процессом веб-сервера или воркера Celery до запуска дочерних процессов. Каталог хранится
+        в томе и переживает перезапуск контейнера, а файлы завершившихся процессов продолжали бы учитываться в
+        счетчиках, в том числе под pid новых процессов.
+    """
+
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+    if not path:
+        return
+
+    os.makedirs(path, exist_ok=True)
+
+    for name in glob.glob(os.path.join(path, "*.db")):
+        os.remove(name)
+
+
+def mark_process_dead(pid):
+    """
+    Удаляет файлы метрик-показателей (gauge) завершившегося дочернего процесса.
+    """
+
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(pid)
+
+
+def render_metrics():
+    """
+    Возвращает метрики в текстовом формате Prometheus и соответствующий Content-Type.
+    """
+
+    return generate_latest(get_registry()), CONTENT_TYPE_LATEST
+
+
+def parse_eta(eta):
+    """
+    Преобразует eta задачи Celery (строка ISO 8601 или datetime) во временную метку.
+    """
+
+    if not eta:
+        return None
+
+    if isinstance(eta, str):
+        eta = datetime.fromisoformat(eta)
+
+    return eta.timestamp()
+
+
+@before_task_publish.connect
+def stamp_published_at(headers=None, **kwargs):
+    """
+    Добавляет в заголовки публикуемой задачи время публикации для расчета времени ожидания в очереди.
+    """
+
+    if headers is not None:
+        headers.setdefault("published_at", time.time())
+
+
+@task_prerun.connect
+def record_task_start(task_id=None, task=None, **kwargs):
+    """
+    Запоминает время начала выполнения задачи и записывает время ее ожидания в очереди.
+
+    Описание:
+        Для отложенных задач (countdown, eta, повторные попытки) ожидание отсчитывается от наступления eta, а не от
+        публикации, чтобы метрика отражала задержку обработки очереди, а не запланированную паузу.
+    """
+
+    _task_started[task_id] = time.perf_counter()
+    published_at = getattr(task.request, "published_at", None)
+
+    if published_at is None:
+        return
+
+    ready_at = max(float(published_at), parse_eta(task.request.eta) or 0)
+    TASK_QUEUE_LAG.labels(task.name).observe(max(time.time() - ready_at, 0))
+
+
+@task_postrun.connect
+def record_task_duration(task_id=None, task=None, state=None, **kwargs):
+    """
+    Записывает время выполнения задачи с ее итоговым состоянием.
+    """
+
+    started = _task_started.pop(task_id, None)
+
+    if started is not None:
+        TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - started)
+
+
+@worker_init.connect
+def reset_worker_metrics(**kwargs):
+    """
+    Очищает каталог метрик при запуске воркера Celery.
+    """
+
+    reset_multiprocess_dir()
+
+
+@worker_process_shutdown.connect
+def mark_worker_process_dead(pid=None, **kwargs):
+    """
+    Учитывает завершение дочернего процесса воркера Celery.
+    """
+
+    mark_process_dead(pid or os.getpid())
@@ -0,0 +1,55 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from main.metrics import observe_request, track_queries
+
+
+class MetricsMiddleware:
+    """
+    Middleware, записывающий для каждого запроса время обработки, количество и время запросов к базе данных.
+
+    Описание:
+        Метрики группируются по имени маршрута (view_name), HTTP-методу и коду ответа и выдаются эндпоинтом
+        /metrics в формате Prometheus. Запросы к базе данных подсчитываются оберткой соединения (record_query),
+        поэтому не требуют DEBUG = True. Запросы, не сопоставленные ни одному маршруту, учитываются как
+        "<unmatched>". Middleware поддерживает как синхронный (WSGI), так и асинхронный (ASGI) режим, чтобы не
+        переводить асинхронные представления в отдельный поток.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        started = time.perf_counter()
+
+        with track_queries() as queries:
+            response = self.get_response(request)
+
+        self.observe(request, response, started, queries)
+
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+
+        with track_queries() as queries:
+            response = await self.get_response(request)
+
+        self.observe(request, response, started, queries)
+
+        return response
+
+    def observe(self, request, response, started, queries):
+        resolver_match = getattr(request, "resolver_match", None)
+        view = resolver_match.view_name if resolver_match else "<unmatched>"
+        observe_request(view, request.method, response.status_code, time.perf_counter() - started, queries)
@@ -0,0 +1,38 @@
+# Generated by Django 5.1 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+from main.scheduling import compute_next_due_at
+
+
+def fill_next_due_at(apps, schema_editor):
+    Habit = apps.get_model("main", "Habit")
+    batch = []
+
+    for habit in Habit.objects.only("id", "time").iterator(chunk_size=2000):
+        habit.next_due_at = compute_next_due_at(habit.time)
+        batch.append(habit)
+
+        if len(batch) >= 2000:
+            Habit.objects.bulk_update(batch, ["next_due_at"])
+            batch = []
+
+    Habit.objects.bulk_update(batch, ["next_due_at"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0002_alter_habit_options"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="habit",
+            name="next_due_at",
+            field=models.DateTimeField(
+                blank=True, db_index=True, null=True, verbose_name="следующее напоминание"
+            ),
+        ),
+        migrations.RunPython(fill_next_due_at, migrations.RunPython.noop),
+    ]
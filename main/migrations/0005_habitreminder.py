@@ -0,0 +1,26 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_celery_beat', '0019_alter_periodictasks_options'),
+        ('main', '0004_habit_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HabitReminder',
+            fields=[
+                ('habit', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='reminder', serialize=False, to='main.habit', verbose_name='привычка')),
+                ('periodic_task', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='habit_reminder', to='django_celery_beat.periodictask', verbose_name='периодическая задача')),
+            ],
+            options={
+                'verbose_name': 'напоминание',
+                'verbose_name_plural': 'напоминания',
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.15 on 2026-10-18 21:40
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0005_habitreminder"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="habit",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now, verbose_name="дата изменения"
+            ),
+            preserve_default=False,
+        ),
+        migrations.RemoveIndex(
+            model_name="habit",
+            name="habit_owner_id_idx",
+        ),
+        migrations.AddIndex(
+            model_name="habit",
+            index=models.Index(fields=["owner", "id"], include=["updated_at"], name="habit_owner_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="habit",
+            index=models.Index(fields=["updated_at"], name="habit_updated_idx"),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0006_habit_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HabitTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('habit_id', models.BigIntegerField(verbose_name='идентификатор привычки')),
+                ('is_public', models.BooleanField(default=False, verbose_name='признак публичности')),
+                ('is_unpublished', models.BooleanField(default=False, verbose_name='снята с публикации')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, verbose_name='дата удаления')),
+                ('owner', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='владелец')),
+            ],
+            options={
+                'verbose_name': 'удаленная привычка',
+                'verbose_name_plural': 'удаленные привычки',
+                'indexes': [models.Index(fields=['owner', 'deleted_at', 'id'], name='tombstone_owner_deleted_idx'), models.Index(condition=models.Q(('is_public', True)), fields=['deleted_at', 'id'], name='tombstone_public_deleted_idx')],
+            },
+        ),
+    ]
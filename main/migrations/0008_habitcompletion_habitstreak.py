@@ -0,0 +1,96 @@
+# Generated by Django 5.1.15 on 2026-10-18 22:10
+
+from datetime import date
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+CREATE_COMPLETION_TABLE = """
+CREATE TABLE main_habitcompletion (
+    id bigserial NOT NULL,
+    completed_at timestamp with time zone NOT NULL,
+    local_date date NOT NULL,
+    source varchar(16) NOT NULL,
+    habit_id bigint NOT NULL REFERENCES main_habit (id) DEFERRABLE INITIALLY DEFERRED,
+    owner_id bigint NOT NULL REFERENCES users_customuser (id) DEFERRABLE INITIALLY DEFERRED,
+    PRIMARY KEY (id, completed_at)
+) PARTITION BY RANGE (completed_at);
+CREATE INDEX completion_habit_idx ON main_habitcompletion (habit_id, completed_at);
+CREATE INDEX completion_owner_idx ON main_habitcompletion (owner_id, completed_at);
+CREATE TABLE main_habitcompletion_default PARTITION OF main_habitcompletion DEFAULT;
+"""
+
+
+# Секции на текущий и три следующих месяца; дальше их создает периодическая задача
+# main.tasks.create_completion_partitions_task.
+INITIAL_PARTITION_MONTHS = 4
+
+
+def month_start(day, months):
+    years, month = divmod(day.month - 1 + months, 12)
+
+    return date(day.year + years, month + 1, 1)
+
+
+def create_partitions(apps, schema_editor):
+    today = timezone.now().date()
+
+    for offset in range(INITIAL_PARTITION_MONTHS):
+        lower, upper = month_start(today, offset), month_start(today, offset + 1)
+        schema_editor.execute(
+            f"CREATE TABLE IF NOT EXISTS main_habitcompletion_p{lower:%Y%m} PARTITION OF main_habitcompletion "
+            f"FOR VALUES FROM ('{lower} 00:00:00+00') TO ('{upper} 00:00:00+00')"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0007_habittombstone"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HabitStreak",
+            fields=[
+                ("habit", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name="streak", serialize=False, to="main.habit", verbose_name="привычка")),
+                ("current_streak", models.PositiveIntegerField(default=0, verbose_name="текущая серия")),
+                ("best_streak", models.PositiveIntegerField(default=0, verbose_name="лучшая серия")),
+                ("total_completions", models.PositiveIntegerField(default=0, verbose_name="количество выполнений")),
+                ("last_completed_on", models.DateField(blank=True, null=True, verbose_name="дата последнего выполнения")),
+            ],
+            options={
+                "verbose_name": "серия выполнений",
+                "verbose_name_plural": "серии выполнений",
+            },
+        ),
+        # Django не создает секционированные таблицы, поэтому таблица журнала создается SQL, а модель - только в
+        # состоянии миграций.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(CREATE_COMPLETION_TABLE, "DROP TABLE main_habitcompletion;"),
+                migrations.RunPython(create_partitions, migrations.RunPython.noop),
+            ],
+            state_operations=[
+                migrations.CreateModel(
+                    name="HabitCompletion",
+                    fields=[
+                        ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                        ("completed_at", models.DateTimeField(verbose_name="момент выполнения")),
+                        ("local_date", models.DateField(verbose_name="дата выполнения")),
+                        ("source", models.CharField(choices=[("api", "API"), ("telegram", "Telegram")], default="api", max_length=16, verbose_name="источник")),
+                        ("habit", models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name="completions", to="main.habit", verbose_name="привычка")),
+                        ("owner", models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name="+", to=settings.AUTH_USER_MODEL, verbose_name="владелец")),
+                    ],
+                    options={
+                        "verbose_name": "выполнение привычки",
+                        "verbose_name_plural": "выполнения привычек",
+                        "indexes": [models.Index(fields=["habit", "completed_at"], name="completion_habit_idx"), models.Index(fields=["owner", "completed_at"], name="completion_owner_idx")],
+                    },
+                ),
+            ],
+        ),
+    ]
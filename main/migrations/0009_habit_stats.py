@@ -0,0 +1,68 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:50
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0008_habitcompletion_habitstreak"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="habit",
+            name="created_at",
+            field=models.DateTimeField(
+                auto_now_add=True, default=django.utils.timezone.now, verbose_name="дата создания"
+            ),
+            preserve_default=False,
+        ),
+        migrations.CreateModel(
+            name="AggregationCursor",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=64, primary_key=True, serialize=False, verbose_name="обработчик"),
+                ),
+                ("position", models.BigIntegerField(default=0, verbose_name="позиция")),
+            ],
+            options={
+                "verbose_name": "позиция обработки",
+                "verbose_name_plural": "позиции обработки",
+            },
+        ),
+        migrations.CreateModel(
+            name="HabitActivityStat",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("weekday", models.PositiveSmallIntegerField(verbose_name="день недели")),
+                ("hour", models.PositiveSmallIntegerField(verbose_name="час")),
+                ("is_pleasant", models.BooleanField(verbose_name="приятные привычки")),
+                ("completions", models.PositiveIntegerField(default=0, verbose_name="количество выполнений")),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="пользователь",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "агрегат выполнений",
+                "verbose_name_plural": "агрегаты выполнений",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("owner", "weekday", "hour", "is_pleasant"), name="activity_stat_unique"
+                    )
+                ],
+            },
+        ),
+    ]
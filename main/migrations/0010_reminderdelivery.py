@@ -0,0 +1,41 @@
+# Generated by Django 5.1.15 on 2026-10-18 20:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0009_habit_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReminderDelivery",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("scheduled_for", models.DateTimeField(verbose_name="запланировано на")),
+                ("claimed_at", models.DateTimeField(blank=True, null=True, verbose_name="взято на отправку")),
+                ("sent_at", models.DateTimeField(blank=True, null=True, verbose_name="отправлено")),
+                (
+                    "habit",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="deliveries",
+                        to="main.habit",
+                        verbose_name="привычка",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "доставка напоминания",
+                "verbose_name_plural": "доставки напоминаний",
+                "indexes": [models.Index(fields=["scheduled_for"], name="delivery_scheduled_idx")],
+                "constraints": [
+                    models.UniqueConstraint(fields=("habit", "scheduled_for"), name="delivery_habit_scheduled_unique")
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.15 on 2026-10-18 23:30
+
+from django.db import migrations, models
+
+# Для записанных ранее выполнений час и день недели вычисляются в текущем часовом поясе владельца - другого
+# источника нет.
+BACKFILL_SQL = """
+UPDATE main_habitcompletion c
+SET local_hour = EXTRACT(HOUR FROM c.completed_at AT TIME ZONE u.timezone),
+    local_weekday = EXTRACT(ISODOW FROM c.completed_at AT TIME ZONE u.timezone)
+FROM users_customuser u
+WHERE u.id = c.owner_id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0010_reminderdelivery"),
+        ("users", "0005_customuser_timezone"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="habitcompletion",
+            name="local_hour",
+            field=models.PositiveSmallIntegerField(null=True, verbose_name="час выполнения"),
+        ),
+        migrations.AddField(
+            model_name="habitcompletion",
+            name="local_weekday",
+            field=models.PositiveSmallIntegerField(null=True, verbose_name="день недели выполнения"),
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+        migrations.AlterField(
+            model_name="habitcompletion",
+            name="local_hour",
+            field=models.PositiveSmallIntegerField(verbose_name="час выполнения"),
+        ),
+        migrations.AlterField(
+            model_name="habitcompletion",
+            name="local_weekday",
+            field=models.PositiveSmallIntegerField(verbose_name="день недели выполнения"),
+        ),
+    ]
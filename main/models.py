@@ -1,6 +1,8 @@
 from django.core.exceptions import ValidationError
 from django.db import models
+from django_celery_beat.models import PeriodicTask
 
+from main.scheduling import compute_next_due_at, compute_next_due_ats
 from users.models import CustomUser
 
 
@@ -11,7 +13,7 @@ class Habit(models.Model):
     Атрибуты:
         owner (ForeignKey): Владелец привычки.
         place (CharField): Место выполнения привычки.
-        time (TimeField): Время выполнения привычки.
+        time (TimeField): Время выполнения привычки в часовом поясе владельца.
         action (CharField): Описание действия привычки.
         is_pleasant_habit (BooleanField): Признак приятной привычки.
         related_habit (ForeignKey): Связанная привычка.
@@ -19,6 +21,9 @@ class Habit(models.Model):
         reward (CharField): Вознаграждение за выполнение привычки.
         time_to_complete (PositiveIntegerField): Время на выполнение привычки в секундах.
         is_public (BooleanField): Признак публичности привычки.
+        next_due_at (DateTimeField): Момент следующего напоминания о привычке.
+        created_at (DateTimeField): Момент создания привычки.
+        updated_at (DateTimeField): Момент последнего изменения привычки.
     """
 
     owner = models.ForeignKey(
@@ -51,6 +56,11 @@ class Habit(models.Model):
         verbose_name="время на выполнение", help_text="секунд"
     )
     is_public = models.BooleanField(default=False, verbose_name="признак публичности")
+    next_due_at = models.DateTimeField(
+        null=True, blank=True, db_index=True, verbose_name="следующее напоминание"
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="дата создания")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="дата изменения")
 
     def __str__(self):
         """
@@ -59,6 +69,80 @@ class Habit(models.Model):
 
         return self.action
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Создает экземпляр привычки из строки базы данных, запоминая исходные значения признака публичности и
+        расписания.
+        """
+
+        instance = super().from_db(db, field_names, values)
+        instance._was_public = instance.__dict__.get("is_public", False)
+        instance._loaded_schedule = instance.get_schedule()
+
+        return instance
+
+    def get_schedule(self):
+        """
+        Возвращает расписание привычки (время, периодичность) или None, если одно из полей не загружено.
+        """
+
+        if "time" not in self.__dict__ or "frequency" not in self.__dict__:
+            return None
+
+        return self.time, self.frequency
+
+    def schedule_changed(self):
+        """
+        Проверяет, изменилось ли расписание привычки с момента загрузки из базы данных.
+
+        Описание:
+            Для новой привычки или экземпляра, созданного не из базы данных, расписание считается измененным.
+        """
+
+        loaded = getattr(self, "_loaded_schedule", None)
+
+        return self._state.adding or loaded is None or loaded != self.get_schedule()
+
+    def save(self, *args, **kwargs):
+        """
+        Сохраняет привычку, пересчитывая момент следующего напоминания при изменении расписания.
+
+        Описание:
+            Момент пересчитывается, только если изменились время или периодичность привычки: изменение других полей
+            не сдвигает напоминание привычки с периодичностью больше дня на ближайший день.
+        """
+
+        update_fields = kwargs.get("update_fields")
+
+        if self.schedule_changed() and (update_fields is None or {"time", "frequency"} & set(update_fields)):
+            self.refresh_next_due_at()
+
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "next_due_at"}
+
+        super().save(*args, **kwargs)
+        self._loaded_schedule = self.get_schedule()
+
+    def refresh_next_due_at(self):
+        """
+        Пересчитывает момент следующего напоминания по времени выполнения привычки в часовом поясе владельца.
+        """
+
+        self.next_due_at = compute_next_due_at(self.time, tz=self.owner.timezone)
+
+    @classmethod
+    def refresh_next_due_ats(cls, habits):
+        """
+        Пересчитывает моменты следующих напоминаний для набора привычек (с загруженными владельцами) одним расчетом
+        на каждую уникальную пару (время, часовой пояс).
+        """
+
+        due_ats = compute_next_due_ats((habit.time, habit.owner.timezone) for habit in habits)
+
+        for habit, due_at in zip(habits, due_ats):
+            habit.next_due_at = due_at
+
     def clean(self):
         """
         Выполняет проверку корректности данных, установленных для привычки.
@@ -89,3 +173,284 @@ class Habit(models.Model):
     class Meta:
         verbose_name = "привычка"
         verbose_name_plural = "привычки"
+        indexes = [
+            models.Index(fields=["owner", "id"], include=["updated_at"], name="habit_owner_id_idx"),
+            models.Index(fields=["id"], condition=models.Q(is_public=True), name="habit_public_id_idx"),
+            models.Index(fields=["updated_at"], name="habit_updated_idx"),
+        ]
+
+
+class HabitReminder(models.Model):
+    """
+    Модель, связывающая привычку с периодической задачей django-celery-beat, отправляющей напоминания о ней.
+
+    Атрибуты:
+        habit (OneToOneField): Привычка (первичный ключ).
+        periodic_task (OneToOneField): Периодическая задача напоминания.
+    """
+
+    habit = models.OneToOneField(
+        Habit,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="reminder",
+        verbose_name="привычка",
+    )
+    periodic_task = models.OneToOneField(
+        PeriodicTask,
+        on_delete=models.CASCADE,
+        related_name="habit_reminder",
+        verbose_name="периодическая задача",
+    )
+
+    def __str__(self):
+        """
+        Возвращает строковое представление напоминания.
+        """
+
+        return f"Напоминание о привычке {self.habit_id}"
+
+    class Meta:
+        verbose_name = "напоминание"
+        verbose_name_plural = "напоминания"
+
+
+class HabitTombstone(models.Model):
+    """
+    Модель записи об исчезновении привычки из списка пользователя для синхронизации изменений клиентами.
+
+    Запись создается при удалении привычки, а также когда чужая публичная привычка перестает быть публичной (она
+    пропадает из списков других пользователей, но не удаляется). Записи старше HABIT_TOMBSTONE_RETENTION удаляются
+    задачей prune_habit_tombstones.
+
+    Атрибуты:
+        habit_id (BigIntegerField): Идентификатор привычки.
+        owner (ForeignKey): Владелец привычки. Связь без ограничения внешнего ключа: записи о публичных привычках
+            нужны другим пользователям и после удаления владельца.
+        is_public (BooleanField): Была ли привычка публичной, то есть видна ли запись другим пользователям.
+        is_unpublished (BooleanField): Привычка не удалена, а перестала быть публичной; запись не видна владельцу.
+        deleted_at (DateTimeField): Момент удаления.
+    """
+
+    habit_id = models.BigIntegerField(verbose_name="идентификатор привычки")
+    owner = models.ForeignKey(
+        CustomUser,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name="+",
+        verbose_name="владелец",
+    )
+    is_public = models.BooleanField(default=False, verbose_name="признак публичности")
+    is_unpublished = models.BooleanField(default=False, verbose_name="снята с публикации")
+    deleted_at = models.DateTimeField(auto_now_add=True, verbose_name="дата удаления")
+
+    def __str__(self):
+        """
+        Возвращает строковое представление записи об удалении.
+        """
+
+        return f"Удаление привычки {self.habit_id}"
+
+    class Meta:
+        verbose_name = "удаленная привычка"
+        verbose_name_plural = "удаленные привычки"
+        indexes = [
+            models.Index(fields=["owner", "deleted_at", "id"], name="tombstone_owner_deleted_idx"),
+            models.Index(
+                fields=["deleted_at", "id"], condition=models.Q(is_public=True), name="tombstone_public_deleted_idx"
+            ),
+        ]
+
+
+class HabitCompletion(models.Model):
+    """
+    Модель записи о выполнении привычки (журнал только для добавления).
+
+    Таблица секционирована по месяцам поля completed_at (PARTITION BY RANGE), секции создаются заранее задачей
+    create_completion_partitions (см. main.completions). Первичный ключ в базе данных составной (id, completed_at),
+    так как ключ секционирования должен входить в уникальные ограничения.
+
+    Атрибуты:
+        habit (ForeignKey): Выполненная привычка.
+        owner (ForeignKey): Владелец привычки (для выборок по пользователю без соединения с таблицей привычек).
+        completed_at (DateTimeField): Момент выполнения.
+        local_date (DateField): Дата выполнения в часовом поясе владельца.
+        local_hour (PositiveSmallIntegerField): Час выполнения в часовом поясе владельца.
+        local_weekday (PositiveSmallIntegerField): День недели выполнения в часовом поясе владельца (ISO, 1 -
+            понедельник).
+        source (CharField): Источник отметки: API или Telegram.
+    """
+
+    SOURCE_API = "api"
+    SOURCE_TELEGRAM = "telegram"
+    SOURCE_CHOICES = ((SOURCE_API, "API"), (SOURCE_TELEGRAM, "Telegram"))
+
+    habit = models.ForeignKey(
+        Habit, on_delete=models.CASCADE, db_index=False, related_name="completions", verbose_name="привычка"
+    )
+    owner = models.ForeignKey(
+        CustomUser, on_delete=models.CASCADE, db_index=False, related_name="+", verbose_name="владелец"
+    )
+    completed_at = models.DateTimeField(verbose_name="момент выполнения")
+    local_date = models.DateField(verbose_name="дата выполнения")
+    local_hour = models.PositiveSmallIntegerField(verbose_name="час выполнения")
+    local_weekday = models.PositiveSmallIntegerField(verbose_name="день недели выполнения")
+    source = models.CharField(max_length=16, choices=SOURCE_CHOICES, default=SOURCE_API, verbose_name="источник")
+
+    def __str__(self):
+        """
+        Возвращает строковое представление записи о выполнении.
+        """
+
+        return f"Выполнение привычки {self.habit_id} {self.local_date}"
+
+    class Meta:
+        verbose_name = "выполнение привычки"
+        verbose_name_plural = "выполнения привычек"
+        indexes = [
+            models.Index(fields=["habit", "completed_at"], name="completion_habit_idx"),
+            models.Index(fields=["owner", "completed_at"], name="completion_owner_idx"),
+        ]
+
+
+class HabitStreak(models.Model):
+    """
+    Модель счетчиков выполнения привычки, обновляемых при каждой отметке о выполнении.
+
+    Атрибуты:
+        habit (OneToOneField): Привычка (первичный ключ).
+        current_streak (PositiveIntegerField): Длина текущей серии выполнений без пропуска периода.
+        best_streak (PositiveIntegerField): Длина лучшей серии.
+        total_completions (PositiveIntegerField): Общее количество отметок о выполнении.
+        last_completed_on (DateField): Дата последнего выполнения в часовом поясе владельца.
+    """
+
+    habit = models.OneToOneField(
+        Habit, on_delete=models.CASCADE, primary_key=True, related_name="streak", verbose_name="привычка"
+    )
+    current_streak = models.PositiveIntegerField(default=0, verbose_name="текущая серия")
+    best_streak = models.PositiveIntegerField(default=0, verbose_name="лучшая серия")
+    total_completions = models.PositiveIntegerField(default=0, verbose_name="количество выполнений")
+    last_completed_on = models.DateField(null=True, blank=True, verbose_name="дата последнего выполнения")
+
+    def __str__(self):
+        """
+        Возвращает строковое представление счетчиков.
+        """
+
+        return f"Серия привычки {self.habit_id}: {self.current_streak}"
+
+    class Meta:
+        verbose_name = "серия выполнений"
+        verbose_name_plural = "серии выполнений"
+
+
+class HabitActivityStat(models.Model):
+    """
+    Модель агрегата выполнений привычек пользователя по дню недели и часу (в часовом поясе пользователя).
+
+    Строки пополняются задачей refresh_habit_stats по новым записям журнала выполнений и используются для
+    статистики пользователя без просмотра истории.
+
+    Атрибуты:
+        owner (ForeignKey): Пользователь.
+        weekday (PositiveSmallIntegerField): День недели по ISO 8601 (1 - понедельник, 7 - воскресенье).
+        hour (PositiveSmallIntegerField): Час выполнения (0-23).
+        is_pleasant (BooleanField): Выполнения приятных (True) или полезных (False) привычек.
+        completions (PositiveIntegerField): Количество выполнений.
+    """
+
+    owner = models.ForeignKey(
+        CustomUser, on_delete=models.CASCADE, db_index=False, related_name="+", verbose_name="пользователь"
+    )
+    weekday = models.PositiveSmallIntegerField(verbose_name="день недели")
+    hour = models.PositiveSmallIntegerField(verbose_name="час")
+    is_pleasant = models.BooleanField(verbose_name="приятные привычки")
+    completions = models.PositiveIntegerField(default=0, verbose_name="количество выполнений")
+
+    def __str__(self):
+        """
+        Возвращает строковое представление агрегата.
+        """
+
+        return f"Выполнения пользователя {self.owner_id}: день {self.weekday}, час {self.hour}"
+
+    class Meta:
+        verbose_name = "агрегат выполнений"
+        verbose_name_plural = "агрегаты выполнений"
+        constraints = [
+            models.UniqueConstraint(fields=["owner", "weekday", "hour", "is_pleasant"], name="activity_stat_unique"),
+        ]
+
+
+class AggregationCursor(models.Model):
+    """
+    Модель позиции инкрементальной обработки журнала (например, последней учтенной записи журнала выполнений).
+
+    Атрибуты:
+        name (CharField): Имя обработчика (первичный ключ).
+        position (BigIntegerField): Идентификатор последней обработанной записи.
+    """
+
+    name = models.CharField(max_length=64, primary_key=True, verbose_name="обработчик")
+    position = models.BigIntegerField(default=0, verbose_name="позиция")
+
+    def __str__(self):
+        """
+        Возвращает строковое представление позиции.
+        """
+
+        return f"{self.name}: {self.position}"
+
+    class Meta:
+        verbose_name = "позиция обработки"
+        verbose_name_plural = "позиции обработки"
+
+
+class ReminderDelivery(models.Model):
+    """
+    Модель записи журнала доставки напоминаний о привычках.
+
+    Запись соответствует одному напоминанию - паре (привычка, момент напоминания) - и гарантирует, что оно будет
+    отправлено не более одного раза, даже если celery beat после перезапуска или повтор задачи поставит его в
+    очередь повторно.
+
+    Атрибуты:
+        habit (ForeignKey): Привычка.
+        scheduled_for (DateTimeField): Момент, на который запланировано напоминание.
+        claimed_at (DateTimeField): Момент, когда обработчик взял напоминание на отправку.
+        sent_at (DateTimeField): Момент успешной отправки в Telegram.
+    """
+
+    habit = models.ForeignKey(
+        Habit, on_delete=models.CASCADE, db_index=False, related_name="deliveries", verbose_name="привычка"
+    )
+    scheduled_for = models.DateTimeField(verbose_name="запланировано на")
+    claimed_at = models.DateTimeField(null=True, blank=True, verbose_name="взято на отправку")
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name="отправлено")
+
+    def __str__(self):
+        """
+        Возвращает строковое представление записи.
+        """
+
+        return f"Напоминание о привычке {self.habit_id} на {self.scheduled_for}"
+
+    @property
+    def latency(self):
+        """
+        Задержка отправки относительно запланированного момента или None, если напоминание не отправлено.
+        """
+
+        return self.sent_at - self.scheduled_for if self.sent_at else None
+
+    class Meta:
+        verbose_name = "доставка напоминания"
+        verbose_name_plural = "доставки напоминаний"
+        constraints = [
+            models.UniqueConstraint(fields=["habit", "scheduled_for"], name="delivery_habit_scheduled_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["scheduled_for"], name="delivery_scheduled_idx"),
+        ]
@@ -1,4 +1,6 @@
-from rest_framework.pagination import PageNumberPagination
+from django.core.paginator import InvalidPage
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination, _reverse_ordering
 
 
 class HabitPagination(PageNumberPagination):
@@ -9,3 +11,161 @@ class HabitPagination(PageNumberPagination):
     """
 
     page_size = 5
+
+
+class AsyncHabitPagination(HabitPagination):
+    """
+    Постраничный пагинатор для асинхронных представлений.
+
+    Количество строк (COUNT) и строки страницы выбираются асинхронными запросами ORM, остальная логика совпадает с
+    HabitPagination.
+    """
+
+    async def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+
+        self.page.object_list = [row async for row in self.page.object_list]
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+
+        return list(self.page)
+
+
+class HabitCursorPagination(CursorPagination):
+    """
+    Курсорный (keyset) пагинатор для объектов Habit.
+
+    Выбирает следующую страницу условием по id вместо OFFSET и не выполняет COUNT(*), поэтому время получения
+    страницы не зависит от ее глубины. Размер страницы задается параметром page_size, но не более max_page_size.
+
+    Логика CursorPagination.paginate_queryset разделена на построение запроса страницы (get_page_queryset) и
+    разбор выбранных строк (set_page), чтобы асинхронный вариант выполнял выборку запросом ORM в цикле событий.
+    """
+
+    page_size = 5
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = "id"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.get_page_queryset(queryset, request, view)
+
+        if page_queryset is None:
+            return None
+
+        return self.set_page(list(page_queryset))
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """
+        Возвращает запрос строк страницы с одной лишней строкой для определения следующей позиции или None, если
+        пагинация отключена. Обращений к базе данных не выполняет.
+        """
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        if self.cursor is None:
+            self.offset, self.reverse, self.current_position = 0, False, None
+        else:
+            self.offset, self.reverse, self.current_position = self.cursor
+
+        if self.reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if self.current_position is not None:
+            order = self.ordering[0]
+            order_attr = order.lstrip("-")
+
+            if self.cursor.reverse != order.startswith("-"):
+                queryset = queryset.filter(**{f"{order_attr}__lt": self.current_position})
+            else:
+                queryset = queryset.filter(**{f"{order_attr}__gt": self.current_position})
+
+        return queryset[self.offset:self.offset + self.page_size + 1]
+
+    def set_page(self, results):
+        """
+        Формирует страницу и позиции соседних страниц по строкам, выбранным запросом get_page_queryset.
+        """
+
+        self.page = results[:self.page_size]
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        has_current_position = self.current_position is not None or self.offset > 0
+
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = has_current_position, has_following_position
+            self.next_position, self.previous_position = self.current_position, following_position
+        else:
+            self.has_next, self.has_previous = has_following_position, has_current_position
+            self.next_position, self.previous_position = following_position, self.current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+
+class AsyncHabitCursorPagination(HabitCursorPagination):
+    """
+    Курсорный пагинатор для асинхронных представлений: строки страницы выбираются асинхронным запросом ORM.
+    """
+
+    async def paginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.get_page_queryset(queryset, request, view)
+
+        if page_queryset is None:
+            return None
+
+        return self.set_page([row async for row in page_queryset])
+
+
+def get_habit_paginator(request, asynchronous=False):
+    """
+    Выбирает пагинатор списка привычек по параметрам запроса.
+
+    Аргументы:
+        request: Текущий запрос.
+        asynchronous: Вернуть пагинатор с асинхронным методом paginate_queryset (для представлений adrf).
+
+    Возвращает:
+        BasePagination: HabitPagination, если передан параметр page или pagination=page (совместимость со старыми
+        клиентами), иначе HabitCursorPagination (или их асинхронные варианты).
+    """
+
+    params = request.query_params
+
+    if "page" in params or params.get("pagination") == "page":
+        return AsyncHabitPagination() if asynchronous else HabitPagination()
+
+    return AsyncHabitCursorPagination() if asynchronous else HabitCursorPagination()
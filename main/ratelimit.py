@@ -0,0 +1,144 @@
+import logging
+import time
+
+import redis
+from django.conf import settings
+
+from main.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Атомарно пополняет и проверяет все переданные корзины. Токен списывается только если он есть во всех корзинах,
+# иначе возвращается время ожидания (в секундах) до появления токена в самой "пустой" из них.
+TOKEN_BUCKET_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local wait = 0
+local states = {}
+
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i * 2 - 1])
+    local capacity = tonumber(ARGV[i * 2])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    states[i] = tokens
+
+    if tokens < 1 then
+        wait = math.max(wait, (1 - tokens) / rate)
+    end
+end
+
+if wait > 0 then
+    return tostring(wait)
+end
+
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i * 2 - 1])
+    local capacity = tonumber(ARGV[i * 2])
+    redis.call('HSET', key, 'tokens', states[i] - 1, 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate * 1000) + 1000)
+end
+
+return '0'
+"""
+
+
+class TelegramRateLimiter:
+    """
+    Ограничитель частоты отправки сообщений в Telegram по алгоритму token bucket.
+
+    Состояние корзин хранится в Redis, поэтому ограничение общее для всех воркеров Celery. Используются глобальная
+    корзина бота (TELEGRAM_GLOBAL_RATE сообщений в секунду) и корзина каждого чата (TELEGRAM_CHAT_RATE).
+
+    Атрибуты:
+        client : redis.Redis
+            Клиент Redis, в котором хранятся корзины.
+    """
+
+    key_prefix = "telegram:ratelimit"
+
+    def __init__(self, client=None):
+        self.client = client or get_redis()
+        self.script = self.client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def acquire(self, chat_id):
+        """
+        Пытается получить разрешение на отправку одного сообщения в чат.
+
+        Аргументы:
+            chat_id : int или str
+                Идентификатор чата в Telegram.
+
+        Возвращает:
+            float: 0, если сообщение можно отправлять, иначе время ожидания в секундах.
+
+        Описание:
+            При недоступности Redis ограничение не применяется (fail-open), чтобы сбой Redis не останавливал
+            рассылку напоминаний.
+        """
+
+        if not settings.TELEGRAM_RATE_LIMIT_ENABLED:
+            return 0.0
+
+        keys = [f"{self.key_prefix}:global", f"{self.key_prefix}:chat:{chat_id}"]
+        args = [
+            settings.TELEGRAM_GLOBAL_RATE,
+            settings.TELEGRAM_GLOBAL_BURST,
+            settings.TELEGRAM_CHAT_RATE,
+            settings.TELEGRAM_CHAT_BURST,
+        ]
+
+        try:
+            return float(self.script(keys=keys, args=args))
+        except redis.RedisError as exc:
+            logger.warning("Ограничение частоты отправки в Telegram не применяется: %s", exc)
+            return 0.0
+
+    def wait_for_slot(self, chat_id, max_wait=None):
+        """
+        Ожидает разрешения на отправку, если ждать нужно не дольше max_wait.
+
+        Аргументы:
+            chat_id : int или str
+                Идентификатор чата в Telegram.
+            max_wait : float, optional
+                Максимальное время ожидания в процессе. По умолчанию TELEGRAM_RATE_LIMIT_MAX_SLEEP.
+
+        Возвращает:
+            float: 0, если разрешение получено, иначе оставшееся время ожидания - сообщение нужно отложить.
+        """
+
+        if max_wait is None:
+            max_wait = settings.TELEGRAM_RATE_LIMIT_MAX_SLEEP
+
+        deadline = time.monotonic() + max_wait
+
+        while True:
+            wait = self.acquire(chat_id)
+
+            if not wait:
+                return 0.0
+
+            if time.monotonic() + wait > deadline:
+                return wait
+
+            time.sleep(wait)
+
+
+_limiter = None
+
+
+def get_rate_limiter():
+    """
+    Возвращает общий для процесса ограничитель частоты отправки в Telegram.
+    """
+
+    global _limiter
+
+    if _limiter is None:
+        _limiter = TelegramRateLimiter()
+
+    return _limiter
@@ -0,0 +1,27 @@
+import redis
+from django.conf import settings
+
+_client = None
+
+
+def get_redis():
+    """
+    Возвращает общий для процесса клиент Redis.
+
+    Возвращает:
+        redis.Redis: Клиент, подключенный к REDIS_URL.
+
+    Описание:
+        Клиент создается лениво; пул соединений redis-py безопасно переоткрывается в дочерних процессах после fork.
+    """
+
+    global _client
+
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        )
+
+    return _client
@@ -0,0 +1,249 @@
+import json
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django_celery_beat.models import CrontabSchedule, IntervalSchedule, PeriodicTask, PeriodicTasks
+
+from main.models import Habit, HabitReminder
+from main.scheduling import REMINDER_ADVANCE, compute_next_due_ats
+
+_state = threading.local()
+
+
+@contextmanager
+def bulk_sync():
+    """
+    Контекстный менеджер, отключающий синхронизацию напоминаний и запись об удалении в обработчиках сигналов Habit.
+
+    Описание:
+        Используется массовыми операциями, которые сами синхронизируют напоминания одним пакетом (например,
+        удаление набора привычек через QuerySet.delete(), отправляющее сигнал post_delete для каждой строки) и
+        создают записи об удалении через main.changes.record_deleted_habits.
+    """
+
+    previous = getattr(_state, "bulk", False)
+    _state.bulk = True
+
+    try:
+        yield
+    finally:
+        _state.bulk = previous
+
+
+def in_bulk_sync():
+    """
+    Возвращает True, если выполняется массовая операция, синхронизирующая напоминания самостоятельно.
+    """
+
+    return getattr(_state, "bulk", False)
+
+
+def reminder_task_name(habit):
+    """
+    Возвращает имя периодической задачи напоминания для привычки.
+    """
+
+    return f"habit_reminder_{habit.pk}"
+
+
+def get_reminder_crontab_key(habit):
+    """
+    Возвращает ключ ежедневного расписания crontab напоминания: минута, час и часовой пояс владельца привычки.
+    """
+
+    reminder_time = (datetime.combine(date.min, habit.time) + timedelta(days=1) - REMINDER_ADVANCE).time()
+
+    return str(reminder_time.minute), str(reminder_time.hour), habit.owner.timezone
+
+
+def get_crontab_schedules(keys):
+    """
+    Возвращает ежедневные расписания crontab по ключам (минута, час, часовой пояс), создавая недостающие.
+
+    Описание:
+        Существующие расписания выбираются одним запросом; crontab вычисляется celery beat в часовом поясе
+        расписания, поэтому напоминание сохраняет локальное время при переходе на летнее или зимнее время.
+    """
+
+    if not keys:
+        return {}
+
+    daily = {"day_of_week": "*", "day_of_month": "*", "month_of_year": "*"}
+    schedules = {
+        (schedule.minute, schedule.hour, str(schedule.timezone)): schedule
+        for schedule in CrontabSchedule.objects.filter(
+            minute__in={key[0] for key in keys},
+            hour__in={key[1] for key in keys},
+            timezone__in={key[2] for key in keys},
+            **daily,
+        )
+    }
+
+    for minute, hour, tz in keys - schedules.keys():
+        schedules[minute, hour, tz], _ = CrontabSchedule.objects.get_or_create(
+            minute=minute, hour=hour, timezone=tz, **daily
+        )
+
+    return schedules
+
+
+def sync_periodic_tasks(habits):
+    """
+    Создает или обновляет периодические задачи напоминаний для набора привычек одним пакетом.
+
+    Аргументы:
+        habits : iterable
+            Сохраненные привычки (с загруженным владельцем).
+
+    Описание:
+        Задачи привычек находятся через таблицу HabitReminder по первичному ключу привычки одним запросом, расписания
+        выбираются одним запросом на каждый вид (недостающие создаются). Ежедневные привычки получают расписание
+        crontab в часовом поясе владельца, остальные - интервальное расписание с первым запуском в ближайший момент
+        напоминания (интервал имеет фиксированную длину, поэтому после перехода на летнее или зимнее время такие
+        напоминания смещаются на час; точное время с учетом перехода обеспечивает режим диспетчера). Новые задачи и
+        связи создаются через bulk_create, существующие задачи обновляются через bulk_update. Так как массовые
+        операции не отправляют сигналы, изменение расписания явно отмечается в PeriodicTasks, чтобы celery beat
+        перечитал задачи. В режиме диспетчера ничего не делает.
+
+        Синхронизация выполняется в одной транзакции с блокировкой строк привычек (в порядке первичного ключа),
+        поэтому параллельные синхронизации одной привычки выполняются по очереди, и вторая находит связь,
+        созданную первой, а ошибка на любом шаге не оставляет периодических задач без связи. Привычки, удаленные до
+        начала синхронизации, пропускаются.
+
+    Возвращает:
+        None
+    """
+
+    if settings.REMINDER_MODE != "periodic_task":
+        return
+
+    habits = {habit.pk: habit for habit in habits}
+
+    if not habits:
+        return
+
+    with transaction.atomic():
+        locked = Habit.objects.select_for_update().filter(pk__in=habits).order_by("pk").values_list("pk", flat=True)
+        habits = {habit_id: habits[habit_id] for habit_id in locked}
+
+        if habits:
+            create_or_update_periodic_tasks(habits)
+
+
+def create_or_update_periodic_tasks(habits):
+    """
+    Создает или обновляет периодические задачи напоминаний привычек (словарь по первичному ключу), строки которых
+    заблокированы вызывающим кодом (см. sync_periodic_tasks).
+    """
+
+    frequencies = {habit.frequency for habit in habits.values() if habit.frequency != 1}
+    schedules = {
+        schedule.every: schedule
+        for schedule in IntervalSchedule.objects.filter(every__in=frequencies, period=IntervalSchedule.DAYS)
+    }
+
+    for frequency in frequencies - schedules.keys():
+        schedules[frequency], _ = IntervalSchedule.objects.get_or_create(
+            every=frequency, period=IntervalSchedule.DAYS
+        )
+
+    crontabs = get_crontab_schedules(
+        {get_reminder_crontab_key(habit) for habit in habits.values() if habit.frequency == 1}
+    )
+    start_times = compute_next_due_ats((habit.time, habit.owner.timezone) for habit in habits.values())
+    existing = {
+        reminder.habit_id: reminder.periodic_task
+        for reminder in HabitReminder.objects.filter(habit_id__in=habits).select_related("periodic_task")
+    }
+    # Задачи без связи с тем же именем (оставшиеся после сбоя до появления транзакции) используются повторно, иначе
+    # их имя не даст создать новую задачу.
+    orphans = {
+        task.name: task
+        for task in PeriodicTask.objects.filter(
+            name__in=[reminder_task_name(habit) for habit_id, habit in habits.items() if habit_id not in existing],
+            habit_reminder__isnull=True,
+        )
+    }
+    to_create = []
+    to_update = []
+
+    for (habit_id, habit), start_time in zip(habits.items(), start_times):
+        task = existing.get(habit_id) or orphans.get(reminder_task_name(habit)) or PeriodicTask(
+            name=reminder_task_name(habit)
+        )
+
+        if habit.frequency == 1:
+            task.interval = None
+            task.crontab = crontabs[get_reminder_crontab_key(habit)]
+        else:
+            task.interval = schedules[habit.frequency]
+            task.crontab = None
+
+        task.task = "main.tasks.send_tg_notification"
+        task.start_time = start_time
+        task.kwargs = json.dumps(
+            {
+                "action": habit.action,
+                "chat_id": habit.owner.tg_id,
+                "reward": habit.reward,
+                "habit_id": habit_id,
+            }
+        )
+
+        if task.pk is not None:
+            to_update.append(task)
+
+        if habit_id not in existing:
+            to_create.append(HabitReminder(habit_id=habit_id, periodic_task=task))
+
+    PeriodicTask.objects.bulk_create(
+        [reminder.periodic_task for reminder in to_create if reminder.periodic_task.pk is None]
+    )
+    PeriodicTask.objects.bulk_update(to_update, ["interval", "crontab", "task", "start_time", "kwargs"])
+
+    HabitReminder.objects.bulk_create(to_create)
+    PeriodicTasks.update_changed()
+
+
+def reschedule_user_habits(user):
+    """
+    Пересчитывает напоминания всех привычек пользователя после изменения его часового пояса.
+
+    Аргументы:
+        user : CustomUser
+            Пользователь с новым часовым поясом.
+
+    Описание:
+        Моменты напоминаний вычисляются пакетно (compute_next_due_ats) и сохраняются одним bulk_update, периодические
+        задачи обновляются одним вызовом sync_periodic_tasks вместо обработчика сигнала для каждой привычки.
+    """
+
+    habits = list(Habit.objects.filter(owner=user))
+
+    for habit in habits:
+        habit.owner = user
+
+    Habit.refresh_next_due_ats(habits)
+    Habit.objects.bulk_update(habits, ["next_due_at"])
+    sync_periodic_tasks(habits)
+
+
+def delete_periodic_tasks(task_ids):
+    """
+    Удаляет периодические задачи напоминаний по их идентификаторам.
+
+    Аргументы:
+        task_ids : iterable
+            Идентификаторы периодических задач.
+
+    Возвращает:
+        None
+    """
+
+    task_ids = list(task_ids)
+
+    if task_ids:
+        PeriodicTask.objects.filter(pk__in=task_ids).delete()
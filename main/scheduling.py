@@ -0,0 +1,195 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+from django.utils import timezone
+
+REMINDER_ADVANCE = timedelta(minutes=15)
+
+
+@lru_cache(maxsize=None)
+def get_zone(name):
+    """
+    Возвращает часовой пояс по имени IANA (например, "Europe/Berlin").
+    """
+
+    return ZoneInfo(name)
+
+
+def to_zone(tz):
+    """
+    Приводит часовой пояс, заданный именем или объектом tzinfo, к объекту tzinfo. None означает текущий часовой пояс.
+    """
+
+    if tz is None:
+        return timezone.get_current_timezone()
+
+    if isinstance(tz, str):
+        return get_zone(tz)
+
+    return tz
+
+
+def get_fire_at(day, habit_time, tz):
+    """
+    Вычисляет момент напоминания о привычке в заданный день.
+
+    Аргументы:
+        day : date
+            Локальная дата выполнения привычки.
+        habit_time : time
+            Локальное время выполнения привычки.
+        tz : tzinfo
+            Часовой пояс пользователя.
+
+    Возвращает:
+        datetime: Момент в UTC за REMINDER_ADVANCE до выполнения привычки.
+
+    Описание:
+        Локальное время переводится в UTC по смещению, действующему в этот день, поэтому после перехода на летнее
+        или зимнее время напоминание приходит в то же локальное время. Несуществующее время (пропущенный при
+        переходе на летнее время час) переводится по смещению до перехода, то есть сдвигается вперед на час;
+        неоднозначное время (повторяющийся час) соответствует первому из двух моментов.
+    """
+
+    local = datetime.combine(day, habit_time, tzinfo=tz)
+
+    return local.astimezone(dt_timezone.utc) - REMINDER_ADVANCE
+
+
+def compute_next_due_at(habit_time, now=None, tz=None):
+    """
+    Вычисляет ближайший момент отправки напоминания о привычке.
+
+    Аргументы:
+        habit_time : time
+            Время выполнения привычки в часовом поясе пользователя.
+        now : datetime, optional
+            Момент, относительно которого ищется ближайшее напоминание. По умолчанию текущее время.
+        tz : str или tzinfo, optional
+            Часовой пояс пользователя. По умолчанию часовой пояс сервера (TIME_ZONE).
+
+    Возвращает:
+        datetime: Момент времени в UTC, наступающий строго после now, за REMINDER_ADVANCE до выполнения привычки.
+    """
+
+    now = now or timezone.now()
+    tz = to_zone(tz)
+    day = now.astimezone(tz).date()
+    due_at = get_fire_at(day, habit_time, tz)
+
+    # За REMINDER_ADVANCE до полуночи напоминание о привычке следующего дня может еще не наступить.
+    while due_at <= now:
+        day += timedelta(days=1)
+        due_at = get_fire_at(day, habit_time, tz)
+
+    return due_at
+
+
+def get_last_due_at(habit_time, now=None, tz=None):
+    """
+    Вычисляет последний наступивший момент напоминания о привычке.
+
+    Аргументы:
+        habit_time : time
+            Время выполнения привычки в часовом поясе пользователя.
+        now : datetime, optional
+            Момент отсчета. По умолчанию текущее время.
+        tz : str или tzinfo, optional
+            Часовой пояс пользователя. По умолчанию часовой пояс сервера (TIME_ZONE).
+
+    Возвращает:
+        datetime: Момент в UTC не позже now, за REMINDER_ADVANCE до выполнения привычки в один из дней.
+
+    Описание:
+        Используется как ключ напоминания, отправленного периодической задачей: задача celery beat запускается в
+        момент напоминания, и повторные запуски до следующего дня дают тот же ключ.
+    """
+
+    now = now or timezone.now()
+    due_at = compute_next_due_at(habit_time, now - timedelta(days=2), tz)
+
+    while True:
+        next_due_at = compute_next_due_at(habit_time, due_at, tz)
+
+        if next_due_at > now:
+            return due_at
+
+        due_at = next_due_at
+
+
+def compute_next_due_ats(schedules, now=None):
+    """
+    Вычисляет ближайшие моменты напоминаний для набора привычек.
+
+    Аргументы:
+        schedules : iterable
+            Пары (время выполнения привычки, часовой пояс пользователя).
+        now : datetime, optional
+            Общий для всех привычек момент отсчета. По умолчанию текущее время.
+
+    Возвращает:
+        list: Моменты напоминаний в UTC в порядке schedules.
+
+    Описание:
+        Расчет выполняется один раз для каждой уникальной пары (время, часовой пояс), поэтому стоимость пересчета
+        тысяч привычек определяется количеством различных расписаний, а не привычек.
+    """
+
+    now = now or timezone.now()
+    results = {}
+    due_ats = []
+
+    for habit_time, tz in schedules:
+        key = (habit_time, tz)
+
+        if key not in results:
+            results[key] = compute_next_due_at(habit_time, now, tz)
+
+        due_ats.append(results[key])
+
+    return due_ats
+
+
+def advance_next_due_at(due_at, frequency, after, habit_time=None, tz=None):
+    """
+    Сдвигает момент напоминания на целое число периодов привычки так, чтобы он оказался позже after.
+
+    Аргументы:
+        due_at : datetime
+            Текущий (наступивший) момент напоминания.
+        frequency : int
+            Периодичность привычки в днях.
+        after : datetime
+            Граница, после которой должен оказаться новый момент напоминания.
+        habit_time : time, optional
+            Время выполнения привычки в часовом поясе пользователя.
+        tz : str или tzinfo, optional
+            Часовой пояс пользователя.
+
+    Возвращает:
+        datetime: Следующий момент напоминания.
+
+    Описание:
+        Если задано время привычки, период отсчитывается в календарных днях часового пояса пользователя, и
+        напоминание сохраняет локальное время при переходе на летнее или зимнее время. Без него момент сдвигается
+        на фиксированное число суток.
+    """
+
+    period = timedelta(days=frequency)
+    periods = max((after - due_at) // period + 1, 1)
+
+    if habit_time is None:
+        return due_at + period * periods
+
+    tz = to_zone(tz)
+    day = (due_at + REMINDER_ADVANCE).astimezone(tz).date()
+
+    # Оценка по фиксированным суткам может ошибиться на один период из-за разницы смещений до и после перехода.
+    while periods > 1 and get_fire_at(day + period * (periods - 1), habit_time, tz) > after:
+        periods -= 1
+
+    while get_fire_at(day + period * periods, habit_time, tz) <= after:
+        periods += 1
+
+    return get_fire_at(day + period * periods, habit_time, tz)
@@ -1,6 +1,79 @@
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 
-from main.models import Habit
+from main.cache import bump_public_feed_version
+from main.changes import record_visibility_changes
+from main.completions import get_current_streak
+from main.models import Habit, HabitStreak
+from main.reminders import sync_periodic_tasks
+
+
+class HabitListSerializer(serializers.ListSerializer):
+    """
+    Сериализатор списка привычек для массовых операций.
+
+    Создает и обновляет привычки одним запросом (bulk_create / bulk_update) в одной транзакции и синхронизирует
+    напоминания одним пакетом вместо обработчиков сигналов для каждой строки.
+    """
+
+    def create(self, validated_data):
+        habits = [Habit(**attrs) for attrs in validated_data]
+        Habit.refresh_next_due_ats(habits)
+
+        with transaction.atomic():
+            Habit.objects.bulk_create(habits)
+            sync_periodic_tasks(habits)
+
+        if any(habit.is_public for habit in habits):
+            transaction.on_commit(bump_public_feed_version)
+
+        return habits
+
+    def update(self, instances, validated_data):
+        fields = set()
+        public_changed = False
+        unpublished = []
+        republished = []
+        rescheduled = []
+
+        for habit, attrs in zip(instances, validated_data):
+            was_public = habit.is_public
+            public_changed = public_changed or was_public
+
+            for field, value in attrs.items():
+                setattr(habit, field, value)
+
+            if was_public != habit.is_public:
+                (unpublished if was_public else republished).append(habit)
+
+            if habit.schedule_changed():
+                rescheduled.append(habit)
+                fields.add("next_due_at")
+
+            fields.update(attrs)
+            public_changed = public_changed or habit.is_public
+
+        Habit.refresh_next_due_ats(rescheduled)
+
+        if fields:
+            # bulk_update не вызывает pre_save полей, поэтому auto_now-поле updated_at заполняется явно.
+            now = timezone.now()
+
+            for habit in instances:
+                habit.updated_at = now
+
+            fields.add("updated_at")
+
+            with transaction.atomic():
+                Habit.objects.bulk_update(instances, fields)
+                record_visibility_changes(unpublished, republished)
+                sync_periodic_tasks(instances)
+
+        if public_changed:
+            transaction.on_commit(bump_public_feed_version)
+
+        return instances
 
 
 class HabitSerializer(serializers.ModelSerializer):
@@ -11,9 +84,126 @@ class HabitSerializer(serializers.ModelSerializer):
 
     Вложенный класс Meta:
         model (Model): Модель, которую нужно сериализовать.
-        fields (str): Поля, которые нужно включить в сериализацию.
+        exclude (tuple): Служебные поля, которые не включаются в сериализацию.
+        list_serializer_class (ListSerializer): Сериализатор списка для массовых операций.
     """
 
     class Meta:
         model = Habit
-        fields = "__all__"
+        exclude = ("next_due_at",)
+        list_serializer_class = HabitListSerializer
+
+
+class HabitValuesSerializer:
+    """
+    Облегченный сериализатор списка привычек для ответов только на чтение.
+
+    Сериализует словари QuerySet.values() без создания экземпляров модели и полей DRF. Формат ответа совпадает с
+    HabitSerializer: связи представлены первичными ключами, время, даты создания и изменения - строками ISO 8601.
+
+    Атрибуты:
+        FIELDS (tuple): Поля ответа в порядке HabitSerializer (берутся из него, поэтому новое поле модели
+            появляется в обоих ответах).
+        fields (tuple): Выбранные поля (параметр запроса fields), по умолчанию все поля.
+    """
+
+    FIELDS = tuple(HabitSerializer().fields)
+    datetime_field = serializers.DateTimeField()
+
+    def __init__(self, fields=None):
+        self.fields = tuple(fields) if fields else self.FIELDS
+
+    @classmethod
+    def from_request(cls, request):
+        """
+        Создает сериализатор с полями из параметра запроса fields (список через запятую).
+
+        Исключения:
+            ValidationError: Если запрошено неизвестное поле.
+        """
+
+        param = request.query_params.get("fields")
+
+        if not param:
+            return cls()
+
+        fields = [field.strip() for field in param.split(",") if field.strip()]
+        unknown = [field for field in fields if field not in cls.FIELDS]
+
+        if unknown:
+            raise serializers.ValidationError({"fields": [f"Неизвестное поле: {field}." for field in unknown]})
+
+        return cls(dict.fromkeys(fields))
+
+    def get_queryset_fields(self, ordering):
+        """
+        Возвращает поля для QuerySet.values(): выбранные поля и поле сортировки, необходимое пагинатору.
+        """
+
+        return tuple(dict.fromkeys((*self.fields, *ordering)))
+
+    def to_representation(self, rows):
+        """
+        Преобразует строки QuerySet.values() в данные ответа.
+        """
+
+        data = []
+
+        for row in rows:
+            item = {field: row[field] for field in self.fields}
+
+            if item.get("time") is not None:
+                item["time"] = item["time"].isoformat()
+
+            for field in ("created_at", "updated_at"):
+                if item.get(field) is not None:
+                    item[field] = self.datetime_field.to_representation(item[field])
+
+            data.append(item)
+
+        return data
+
+
+class HabitBulkSerializer(HabitSerializer):
+    """
+    Сериализатор привычки для массовых операций.
+
+    Владелец привычки всегда берется из запроса, поэтому поле owner доступно только для чтения и не требует
+    отдельного запроса к базе данных для каждого элемента списка.
+    """
+
+    class Meta(HabitSerializer.Meta):
+        read_only_fields = ("owner",)
+
+
+class HabitBulkDeleteSerializer(serializers.Serializer):
+    """
+    Сериализатор запроса на массовое удаление привычек.
+
+    Поля:
+        ids (ListField): Идентификаторы удаляемых привычек.
+    """
+
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+
+class HabitStreakSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор счетчиков выполнения привычки.
+
+    Текущая серия обнуляется при выдаче, если после последнего выполнения прошло больше периода привычки. Дата
+    "сегодня" в часовом поясе пользователя передается в контексте (today); без нее серия выдается как есть.
+    """
+
+    class Meta:
+        model = HabitStreak
+        fields = ("habit", "current_streak", "best_streak", "total_completions", "last_completed_on")
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        today = self.context.get("today")
+
+        if today is not None:
+            data["current_streak"] = get_current_streak(instance, instance.habit.frequency, today)
+
+        return data
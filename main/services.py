@@ -1,6 +1,111 @@
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from main.circuit import get_telegram_circuit_breaker
+from main.ratelimit import get_rate_limiter
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class TelegramRateLimitError(Exception):
+    """
+    Исключение, возникающее при ответе Telegram API с кодом 429 (Too Many Requests).
+
+    Атрибуты:
+        retry_after : float
+            Время в секундах, через которое Telegram разрешает повторить отправку.
+    """
+
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        super().__init__(f"Telegram ограничил частоту отправки, повтор через {retry_after} с.")
+
+
+class TelegramUnavailableError(Exception):
+    """
+    Исключение, возникающее, когда Telegram API недоступен: сетевая ошибка, таймаут, ответ 5xx или разомкнутый
+    автомат (circuit breaker).
+
+    Атрибуты:
+        retry_after : float
+            Время в секундах, на которое разомкнут автомат, или 0, если автомат замкнут и повтор выполняется с
+            экспоненциальной задержкой (get_backoff).
+    """
+
+    def __init__(self, message, retry_after=0.0):
+        self.retry_after = retry_after
+        super().__init__(message)
+
+    @property
+    def circuit_open(self):
+        return self.retry_after > 0
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter с таймаутами подключения и чтения по умолчанию (TELEGRAM_CONNECT_TIMEOUT, TELEGRAM_READ_TIMEOUT).
+
+    Без таймаута запрос к недоступному Telegram блокирует воркер до ограничения времени задачи.
+    """
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = (settings.TELEGRAM_CONNECT_TIMEOUT, settings.TELEGRAM_READ_TIMEOUT)
+
+        return super().send(request, **kwargs)
+
+
+def get_backoff(retries):
+    """
+    Возвращает задержку повтора после retries неудачных попыток: экспоненциальную с ограничением
+    TELEGRAM_RETRY_BACKOFF_MAX и случайной составляющей (от половины до полной задержки), чтобы повторы воркеров
+    после сбоя не приходили в Telegram одновременно.
+    """
+
+    delay = min(settings.TELEGRAM_RETRY_BACKOFF_MAX, settings.TELEGRAM_RETRY_BACKOFF_BASE * 2 ** retries)
+
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def get_park_delay(open_time):
+    """
+    Возвращает задержку повторной отправки сообщения, отложенного при разомкнутом автомате: после его замыкания со
+    случайным сдвигом в пределах TELEGRAM_CIRCUIT_OPEN_SECONDS, чтобы накопленные сообщения не отправлялись разом.
+    """
+
+    return open_time + random.uniform(0, settings.TELEGRAM_CIRCUIT_OPEN_SECONDS)
+
+
+def get_telegram_session():
+    """
+    Возвращает общую для процесса HTTP-сессию для обращений к Telegram API.
+
+    Возвращает:
+        requests.Session: Сессия с пулом keep-alive соединений размером TELEGRAM_POOL_SIZE.
+
+    Описание:
+        Сессия создается лениво при первом обращении, поэтому каждый дочерний процесс Celery (prefork) получает
+        собственный пул соединений, а повторные сообщения не требуют нового TLS-рукопожатия.
+    """
+
+    global _session
 
-from config import settings
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                adapter = TimeoutHTTPAdapter(pool_connections=1, pool_maxsize=settings.TELEGRAM_POOL_SIZE)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+
+    return _session
 
 
 def send_telegram_message(chat_id, message):
@@ -14,17 +119,136 @@ def send_telegram_message(chat_id, message):
             Текст сообщения, которое будет отправлено.
 
     Возвращает:
-        None
+        requests.Response: Ответ Telegram API.
+
+    Исключения:
+        TelegramRateLimitError: Если Telegram ответил кодом 429.
+        TelegramUnavailableError: Если автомат разомкнут, истек таймаут, не удалось подключиться или Telegram
+            ответил кодом 5xx.
 
     Использует:
-        requests.get для отправки HTTP-запроса на Telegram API.
+        Общую сессию get_telegram_session для отправки HTTP-запроса на Telegram API и общий автомат
+        get_telegram_circuit_breaker: пока он разомкнут, запрос не выполняется.
     """
 
+    breaker = get_telegram_circuit_breaker()
+    open_time = breaker.get_open_time()
+
+    if open_time:
+        raise TelegramUnavailableError("Telegram API недоступен (автомат разомкнут).", retry_after=open_time)
+
     params = {
         "chat_id": chat_id,
         "text": message,
     }
 
-    requests.get(
-        f"{settings.TELEGRAM_URL}{settings.TELEGRAM_TOKEN}/sendMessage", params=params
-    )
+    try:
+        response = get_telegram_session().get(
+            f"{settings.TELEGRAM_URL}{settings.TELEGRAM_TOKEN}/sendMessage", params=params
+        )
+    except (requests.ConnectionError, requests.Timeout) as exc:
+        breaker.record_failure()
+        raise TelegramUnavailableError(str(exc)) from exc
+
+    if response.status_code >= 500:
+        breaker.record_failure()
+        raise TelegramUnavailableError(f"HTTP {response.status_code}")
+
+    breaker.record_success()
+
+    if response.status_code == 429:
+        raise TelegramRateLimitError(get_retry_after(response))
+
+    return response
+
+
+def get_retry_after(response):
+    """
+    Извлекает из ответа Telegram API время, через которое можно повторить запрос.
+
+    Аргументы:
+        response : requests.Response
+            Ответ с кодом 429.
+
+    Возвращает:
+        float: Время ожидания в секундах (parameters.retry_after, заголовок Retry-After или 1 секунда).
+    """
+
+    try:
+        return float(response.json()["parameters"]["retry_after"])
+    except (ValueError, KeyError, TypeError):
+        pass
+
+    try:
+        return float(response.headers.get("Retry-After", 1))
+    except (ValueError, TypeError):
+        return 1.0
+
+
+def send_telegram_messages(messages):
+    """
+    Отправляет пачку сообщений в Telegram через общий пул соединений.
+
+    Аргументы:
+        messages : iterable
+            Пары (chat_id, message) для отправки.
+
+    Возвращает:
+        list: Результаты в порядке исходных сообщений - словари с ключами chat_id, ok и error. Для сообщений,
+        отложенных из-за ограничения частоты или разомкнутого автомата, дополнительно указывается retry_after, для
+        неотправленных из-за временной недоступности Telegram - unavailable (а при разомкнутом автомате и
+        circuit_open).
+
+    Описание:
+        Сообщения отправляются параллельно, но не более чем TELEGRAM_BATCH_CONCURRENCY одновременно. Перед отправкой
+        каждого сообщения проверяется общий ограничитель частоты (TelegramRateLimiter). Ошибка отправки одного
+        сообщения не прерывает отправку остальных. Если автомат Telegram разомкнут, пачка не отправляется.
+    """
+
+    messages = list(messages)
+
+    if not messages:
+        return []
+
+    open_time = get_telegram_circuit_breaker().get_open_time()
+
+    if open_time:
+        return [
+            {"chat_id": chat_id, "ok": False, "error": "circuit open", "retry_after": open_time,
+             "unavailable": True, "circuit_open": True}
+            for chat_id, _ in messages
+        ]
+
+    limiter = get_rate_limiter()
+
+    def deliver(item):
+        chat_id, message = item
+
+        wait = limiter.wait_for_slot(chat_id)
+
+        if wait:
+            return {"chat_id": chat_id, "ok": False, "error": "rate limited", "retry_after": wait}
+
+        try:
+            response = send_telegram_message(chat_id, message)
+        except TelegramRateLimitError as exc:
+            return {"chat_id": chat_id, "ok": False, "error": str(exc), "retry_after": exc.retry_after}
+        except TelegramUnavailableError as exc:
+            result = {"chat_id": chat_id, "ok": False, "error": str(exc), "unavailable": True}
+
+            if exc.circuit_open:
+                result.update(retry_after=exc.retry_after, circuit_open=True)
+
+            return result
+        except requests.RequestException as exc:
+            return {"chat_id": chat_id, "ok": False, "error": str(exc)}
+
+        if not response.ok:
+            return {"chat_id": chat_id, "ok": False, "error": f"HTTP {response.status_code}"}
+
+        return {"chat_id": chat_id, "ok": True, "error": None}
+
+    max_workers = min(settings.TELEGRAM_BATCH_CONCURRENCY, len(messages))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(deliver, messages))
@@ -1,12 +1,14 @@
-import json
-from datetime import datetime, timedelta
-
-from django.db.models.signals import post_save, post_delete
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete
 from django.dispatch import receiver
-from django.utils import timezone
-from django_celery_beat.models import IntervalSchedule, PeriodicTask
 
-from main.models import Habit
+from main.cache import bump_public_feed_version
+from main.changes import record_visibility_changes, touch_related_habits
+from main.models import Habit, HabitReminder, HabitTombstone
+from main.reminders import in_bulk_sync, reschedule_user_habits
+from main.tasks import delete_reminder_tasks, enqueue_reminder_sync
+from users.models import CustomUser
 
 
 @receiver(post_save, sender=Habit)
@@ -25,49 +27,60 @@ def create_or_update_periodic_task(sender, instance, created, **kwargs):
             Дополнительные аргументы.
 
     Описание:
-        Создается или находится существующая запись в таблице IntervalSchedule с интервалом, соответствующим
-        указанной пользователем периодичности привычки. Затем создается или обновляется запись в таблице PeriodicTask,
-        которая настроена на отправку уведомлений в Telegram. Уведомление включает в себя действие,
-        идентификатор чата в Telegram и награду, связанные с этой привычкой.
+        После фиксации транзакции идентификатор привычки ставится в очередь фоновой задачи sync_habit_reminder,
+        которая создает или находит запись в таблице IntervalSchedule с интервалом, соответствующим указанной
+        пользователем периодичности привычки, и создает или обновляет запись в таблице PeriodicTask, настроенную на
+        отправку уведомлений в Telegram. Уведомление включает в себя действие, идентификатор чата в Telegram и
+        награду, связанные с этой привычкой. Повторные изменения привычки в течение REMINDER_SYNC_COALESCE_SECONDS
+        объединяются в один пересчет, а откаченные транзакции задачу не создают.
+
+        В режиме диспетчера (REMINDER_MODE = "dispatcher") отдельные периодические задачи не создаются: напоминания
+        рассылает задача dispatch_due_reminders по полю next_due_at. При массовых операциях (bulk_sync)
+        синхронизация выполняется одним пакетом вызывающим кодом.
 
     Возвращает:
         None
     """
 
-    schedule, created_schedule = IntervalSchedule.objects.get_or_create(
-        every=instance.frequency,
-        period=IntervalSchedule.DAYS,
-    )
-
-    task_name = f"notification_{instance.action}_for_user_{instance.owner}"
-    task, created_task = PeriodicTask.objects.update_or_create(
-        name=task_name,
-        defaults={
-            "interval": schedule,
-            "task": "main.tasks.send_tg_notification",
-            "start_time": timezone.make_aware(
-                datetime.combine(datetime.now().date(), instance.time) - timedelta(minutes=15)
-            ),
-            "kwargs": json.dumps(
-                {
-                    "action": instance.action,
-                    "chat_id": instance.owner.tg_id,
-                    "reward": instance.reward,
-                }
-            ),
-        },
-    )
-
-    if not created_task:
-        task.interval = schedule
-        task.save()
+    if settings.REMINDER_MODE != "periodic_task" or in_bulk_sync():
+        return
 
+    transaction.on_commit(lambda: enqueue_reminder_sync(instance.pk))
 
-@receiver(post_delete, sender=Habit)
+
+@receiver(post_delete, sender=HabitReminder)
 def delete_periodic_task(sender, instance, **kwargs):
     """
     Удаляет периодическую задачу для отправки уведомлений в Telegram после удаления объекта Habit.
 
+    Аргументы:
+        sender : модель
+            Модель, пославшая сигнал (в данном случае HabitReminder, удаляемая каскадно вместе с Habit).
+        instance : HabitReminder
+            Экземпляр связи привычки с периодической задачей, который был удален.
+        **kwargs : dict
+            Дополнительные аргументы.
+
+    Описание:
+        После фиксации транзакции ставит в очередь удаление записи из таблицы PeriodicTask, связанной с удаленной
+        привычкой через таблицу HabitReminder.
+
+    Возвращает:
+        None
+    """
+
+    if in_bulk_sync():
+        return
+
+    task_id = instance.periodic_task_id
+    transaction.on_commit(lambda: delete_reminder_tasks.delay([task_id]))
+
+
+@receiver(post_delete, sender=Habit)
+def record_habit_tombstone(sender, instance, **kwargs):
+    """
+    Создает запись об удалении привычки для синхронизации изменений клиентами (эндпоинт habits/changes/).
+
     Аргументы:
         sender : модель
             Модель, пославшая сигнал (в данном случае Habit).
@@ -77,11 +90,136 @@ def delete_periodic_task(sender, instance, **kwargs):
             Дополнительные аргументы.
 
     Описание:
-        Удаляет запись из таблицы PeriodicTask, связанной с удаленной привычкой на основе ее действия и владельца.
+        Запись создается в той же транзакции, что и удаление. При массовых операциях (bulk_sync) записи создаются
+        одним запросом вызывающим кодом (main.changes.record_deleted_habits).
+
+    Возвращает:
+        None
+    """
+
+    if in_bulk_sync():
+        return
+
+    HabitTombstone.objects.create(habit_id=instance.pk, owner_id=instance.owner_id, is_public=instance.is_public)
+
+
+@receiver(pre_delete, sender=Habit)
+def touch_habits_related_to_deleted(sender, instance, **kwargs):
+    """
+    Обновляет момент изменения привычек, у которых удаляемая привычка указана связанной.
+
+    Аргументы:
+        sender : модель
+            Модель, пославшая сигнал (в данном случае Habit).
+        instance : Habit
+            Экземпляр модели Habit, который будет удален.
+        **kwargs : dict
+            Дополнительные аргументы.
+
+    Описание:
+        Обработчик выполняется до того, как Django обнулит related_habit ссылающихся привычек (см.
+        main.changes.touch_related_habits). При массовых операциях (bulk_sync) привычки обновляются одним запросом
+        вызывающим кодом (main.changes.record_deleted_habits).
+
+    Возвращает:
+        None
+    """
+
+    if in_bulk_sync():
+        return
+
+    touch_related_habits([instance.pk])
+
+
+@receiver(post_save, sender=Habit)
+def record_habit_visibility_change(sender, instance, created, **kwargs):
+    """
+    Отмечает для синхронизации изменений, что привычка перестала быть публичной или снова стала публичной.
+
+    Аргументы:
+        sender : модель
+            Модель, пославшая сигнал (в данном случае Habit).
+        instance : Habit
+            Экземпляр модели Habit, который был сохранен.
+        created : bool
+            Флаг, указывающий, был ли создан новый объект Habit.
+        **kwargs : dict
+            Дополнительные аргументы.
+
+    Описание:
+        Обработчик подключен раньше invalidate_public_feed, который обновляет признак _was_public.
+
+    Возвращает:
+        None
+    """
+
+    was_public = getattr(instance, "_was_public", False)
+
+    if created or was_public == instance.is_public:
+        return
+
+    if was_public:
+        record_visibility_changes(unpublished=[instance])
+    else:
+        record_visibility_changes(republished=[instance])
+
+
+@receiver(post_save, sender=Habit)
+@receiver(post_delete, sender=Habit)
+def invalidate_public_feed(sender, instance, **kwargs):
+    """
+    Сбрасывает кэш ленты публичных привычек при изменении или удалении публичной привычки.
+
+    Аргументы:
+        sender : модель
+            Модель, пославшая сигнал (в данном случае Habit).
+        instance : Habit
+            Экземпляр модели Habit, который был сохранен или удален.
+        **kwargs : dict
+            Дополнительные аргументы.
+
+    Описание:
+        Версия кэша увеличивается, только если привычка является публичной или была публичной до изменения.
+        Изменения личных привычек кэш ленты не затрагивают. Версия увеличивается после фиксации транзакции: иначе
+        параллельный запрос ленты успел бы сохранить под новой версией данные до изменения.
 
     Возвращает:
         None
     """
 
-    task_name = f"notification_{instance.action}_for_user_{instance.owner}"
-    PeriodicTask.objects.filter(name=task_name).delete()
+    if instance.is_public or getattr(instance, "_was_public", False):
+        transaction.on_commit(bump_public_feed_version)
+
+    instance._was_public = instance.is_public
+
+
+@receiver(post_save, sender=CustomUser)
+def reschedule_habits_on_timezone_change(sender, instance, created, **kwargs):
+    """
+    Пересчитывает напоминания привычек пользователя при изменении его часового пояса.
+
+    Аргументы:
+        sender : модель
+            Модель, пославшая сигнал (в данном случае CustomUser).
+        instance : CustomUser
+            Сохраненный пользователь.
+        created : bool
+            Флаг, указывающий, был ли создан новый пользователь.
+        **kwargs : dict
+            Дополнительные аргументы.
+
+    Описание:
+        Исходный часовой пояс запоминается при загрузке пользователя из базы данных. Привычки пересчитываются одним
+        пакетом (reschedule_user_habits), а не сигналом для каждой привычки.
+
+    Возвращает:
+        None
+    """
+
+    loaded_timezone = getattr(instance, "_loaded_timezone", None)
+
+    if created or "timezone" not in instance.__dict__ or loaded_timezone in (None, instance.timezone):
+        return
+
+    instance._loaded_timezone = instance.timezone
+    reschedule_user_habits(instance)
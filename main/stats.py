@@ -0,0 +1,168 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from main.models import AggregationCursor, Habit, HabitActivityStat, HabitCompletion
+from main.scheduling import get_zone
+
+STATS_CURSOR = "habit_activity_stats"
+
+STAT_TABLE = HabitActivityStat._meta.db_table
+COMPLETION_TABLE = HabitCompletion._meta.db_table
+
+# Верхняя граница и размер пакета: batch_size записей после позиции, выполненных не позже cutoff.
+BATCH_UPPER_SQL = f"""
+    SELECT max(id), count(*) FROM (
+        SELECT id FROM {COMPLETION_TABLE}
+        WHERE id > %s AND completed_at <= %s
+        ORDER BY id
+        LIMIT %s
+    ) batch
+"""
+
+# Группировка пакета выполнений по локальному дню недели и часу (записанным при отметке) с прибавлением к уже
+# накопленным счетчикам.
+AGGREGATE_SQL = f"""
+    INSERT INTO {STAT_TABLE} (owner_id, weekday, hour, is_pleasant, completions)
+    SELECT c.owner_id, c.local_weekday, c.local_hour, h.is_pleasant_habit, count(*)
+    FROM {COMPLETION_TABLE} c
+    JOIN {Habit._meta.db_table} h ON h.id = c.habit_id
+    WHERE c.id > %s AND c.id <= %s
+    GROUP BY 1, 2, 3, 4
+    ON CONFLICT (owner_id, weekday, hour, is_pleasant)
+    DO UPDATE SET completions = {STAT_TABLE}.completions + EXCLUDED.completions
+"""
+
+
+def refresh_activity_stats(batch_size=None, now=None):
+    """
+    Добавляет в агрегаты HabitActivityStat выполнения привычек, записанные после предыдущего обновления.
+
+    Аргументы:
+        batch_size : int, optional
+            Количество записей журнала, обрабатываемых одним запросом. По умолчанию HABIT_STATS_BATCH_SIZE.
+        now : datetime, optional
+            Текущее время. По умолчанию timezone.now().
+
+    Возвращает:
+        int: Количество учтенных записей журнала.
+
+    Описание:
+        Позиция (идентификатор последней учтенной записи) хранится в AggregationCursor и сдвигается в одной
+        транзакции с изменением агрегатов, поэтому каждая запись учитывается ровно один раз, а параллельные запуски
+        задачи ожидают друг друга на блокировке строки позиции. Каждый пакет обрабатывается одним запросом
+        INSERT ... SELECT ... GROUP BY ... ON CONFLICT DO UPDATE. Выполнения группируются по часу и дню недели в
+        часовом поясе, действовавшем при отметке, поэтому смена часового пояса пользователя не меняет отнесение
+        ни учтенных, ни еще не учтенных выполнений.
+
+        Записи моложе HABIT_STATS_REFRESH_LAG не обрабатываются: идентификаторы выдаются до фиксации транзакции,
+        и запись с меньшим идентификатором может стать видимой позже записи с большим. Выполнения удаленных
+        привычек не учитываются.
+    """
+
+    batch_size = batch_size or settings.HABIT_STATS_BATCH_SIZE
+    cutoff = (now or timezone.now()) - settings.HABIT_STATS_REFRESH_LAG
+    processed = 0
+
+    while True:
+        with transaction.atomic():
+            cursor_row, _ = AggregationCursor.objects.select_for_update().get_or_create(name=STATS_CURSOR)
+
+            with connection.cursor() as cursor:
+                cursor.execute(BATCH_UPPER_SQL, [cursor_row.position, cutoff, batch_size])
+                upper, count = cursor.fetchone()
+
+                if upper is None:
+                    return processed
+
+                cursor.execute(AGGREGATE_SQL, [cursor_row.position, upper])
+
+            processed += count
+            cursor_row.position = upper
+            cursor_row.save(update_fields=["position"])
+
+
+def get_completion_rate(total, created_on, frequency, today):
+    """
+    Возвращает долю выполненных периодов привычки с момента ее создания.
+
+    Аргументы:
+        total : int
+            Количество выполнений привычки.
+        created_on : date
+            Дата создания привычки в часовом поясе пользователя.
+        frequency : int
+            Периодичность привычки в днях.
+        today : date
+            Текущая дата в часовом поясе пользователя.
+
+    Возвращает:
+        tuple: Ожидаемое количество выполнений и доля выполнения (не больше 1).
+    """
+
+    expected = max((today - created_on).days, 0) // frequency + 1
+
+    return expected, round(min(total / expected, 1), 3)
+
+
+def get_user_stats(user, now=None):
+    """
+    Собирает статистику выполнения привычек пользователя из предвычисленных агрегатов.
+
+    Аргументы:
+        user : CustomUser
+            Пользователь.
+        now : datetime, optional
+            Текущее время. По умолчанию timezone.now().
+
+    Возвращает:
+        dict: Статистика пользователя:
+            - habits: для каждой привычки количество выполнений, ожидаемое количество и доля выполнения;
+            - heatmap: матрица 7 x 24 количества выполнений по дням недели (с понедельника) и часам;
+            - pleasant_completions, useful_completions, pleasant_ratio: выполнения приятных и полезных привычек;
+            - best_hour: час, в который пользователь чаще всего выполняет привычки.
+
+    Описание:
+        Выполняются два запроса: привычки со счетчиками HabitStreak и не более 336 строк HabitActivityStat, поэтому
+        время ответа не зависит от объема журнала выполнений. Агрегаты обновляются задачей refresh_habit_stats и
+        могут отставать от журнала на период ее запуска.
+    """
+
+    tz = get_zone(user.timezone)
+    today = (now or timezone.now()).astimezone(tz).date()
+    habits = []
+
+    for habit in Habit.objects.filter(owner=user).order_by("id").values(
+        "id", "action", "frequency", "created_at", "streak__total_completions"
+    ):
+        total = habit["streak__total_completions"] or 0
+        created_on = habit["created_at"].astimezone(tz).date()
+        expected, rate = get_completion_rate(total, created_on, habit["frequency"], today)
+        habits.append({
+            "habit": habit["id"],
+            "action": habit["action"],
+            "total_completions": total,
+            "expected_completions": expected,
+            "completion_rate": rate,
+        })
+
+    heatmap = [[0] * 24 for _ in range(7)]
+    totals = {True: 0, False: 0}
+
+    for weekday, hour, is_pleasant, completions in HabitActivityStat.objects.filter(owner=user).values_list(
+        "weekday", "hour", "is_pleasant", "completions"
+    ):
+        heatmap[weekday - 1][hour] += completions
+        totals[is_pleasant] += completions
+
+    hours = [sum(day[hour] for day in heatmap) for hour in range(24)]
+    overall = totals[True] + totals[False]
+
+    return {
+        "habits": habits,
+        "heatmap": heatmap,
+        "pleasant_completions": totals[True],
+        "useful_completions": totals[False],
+        "pleasant_ratio": round(totals[True] / overall, 3) if overall else None,
+        "best_hour": hours.index(max(hours)) if overall else None,
+    }
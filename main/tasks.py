@@ -1,10 +1,70 @@
+import logging
+import time
+from datetime import timedelta
+
 from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
 
-from main.services import send_telegram_message
+from main.completions import create_completion_partitions
+from main.delayed import get_delayed_queue, schedule_task
+from main.deliveries import (
+    claim_deliveries,
+    claim_reminder,
+    create_deliveries,
+    get_park_deadline,
+    mark_delivered,
+    release_deliveries,
+)
+from main.models import Habit, HabitTombstone, ReminderDelivery
+from main.ratelimit import get_rate_limiter
+from main.reminders import delete_periodic_tasks, sync_periodic_tasks
+from main.scheduling import advance_next_due_at
+from main.stats import refresh_activity_stats
+from main.telegram import handle_update
+from main.services import (
+    TelegramRateLimitError,
+    TelegramUnavailableError,
+    get_backoff,
+    get_park_delay,
+    send_telegram_message,
+    send_telegram_messages,
+)
 
+logger = logging.getLogger(__name__)
 
-@shared_task
-def send_tg_notification(action, chat_id, reward=None):
+
+def build_notification_message(action, reward=None, snoozed=False):
+    """
+    Формирует текст напоминания о привычке.
+
+    Аргументы:
+        action : str
+            Название или описание действия, о выполнении которого необходимо напомнить.
+        reward : str, optional
+            Награда за выполнение действия.
+        snoozed : bool
+            Напоминание отложено командой /snooze и отправляется, когда задачу пора выполнить, а не заранее.
+
+    Возвращает:
+        str: Текст напоминания.
+    """
+
+    if snoozed:
+        message = f"Пора выполнить задачу {action}."
+    else:
+        message = f"Напоминаю о выполнении задачи {action} через 15 минут."
+
+    if reward:
+        return f"{message} Выполнив эту задачу вы можете получить {reward}!"
+
+    return message
+
+
+@shared_task(bind=True, max_retries=settings.TELEGRAM_MAX_RETRIES, time_limit=settings.TELEGRAM_TASK_TIME_LIMIT)
+def send_tg_notification(self, action, chat_id, reward=None, habit_id=None, expires_at=None, snoozed=False):
     """
     Отправляет уведомление в Telegram о выполнении задачи.
 
@@ -16,22 +76,390 @@ def send_tg_notification(action, chat_id, reward=None):
         reward : str, optional
             Награда, которую можно получить за выполнение задачи. Если не указано, сообщение будет без упоминания
             награды.
+        habit_id : int, optional
+            Идентификатор привычки. Если указан, напоминание отправляется не более одного раза (см. claim_reminder)
+            и учитывается в журнале доставки ReminderDelivery.
+        expires_at : float, optional
+            Срок (Unix-время), после которого сообщение, отложенное до замыкания автомата, не отправляется
+            (см. get_park_deadline).
+        snoozed : bool
+            Напоминание отложено командой /snooze (см. build_notification_message).
 
     Возвращает:
         None
 
     Описание:
         Формирует сообщение на основе переданных аргументов и отправляет его в указанный чат Telegram при помощи
-        функции send_telegram_message.
+        функции send_telegram_message. Перед отправкой проверяется общий ограничитель частоты: если ждать
+        разрешения дольше TELEGRAM_RATE_LIMIT_MAX_SLEEP или Telegram ответил кодом 429, задача перезапускается
+        через указанное время (retry_after). При временной недоступности Telegram (таймаут, ошибка сети, ответ 5xx)
+        задача перезапускается с экспоненциальной задержкой со случайной составляющей, а при разомкнутом автомате
+        откладывается в очередь отложенных задач до его замыкания, не расходуя попытки, но не дольше срока
+        expires_at.
+
+        Напоминание отмечается в журнале доставки как отправленное только при успешном ответе Telegram. Прочие
+        ответы с ошибкой (например, 400 для несуществующего чата или 403, если бот заблокирован) не исправятся
+        повтором: ошибка записывается в журнал, а запись доставки остается взятой без момента отправки.
 
     Задача:
         Выполняется как фоновая задача, используя декоратор @shared_task.
     """
 
-    if reward:
-        message = (f"Напоминаю о выполнении задачи {action} через 15 минут. Выполнив эту задачу вы можете получить "
-                   f"{reward}!")
-    else:
-        message = f"Напоминаю о выполнении задачи {action} через 15 минут."
+    if expires_at is not None and time.time() > expires_at:
+        logger.warning("Истек срок отложенного напоминания в чат %s, сообщение не отправлено", chat_id)
+        return
+
+    delivery_id = None
+
+    if habit_id is not None:
+        delivery_id = claim_reminder(habit_id)
+
+        if delivery_id is None:
+            return
+
+    wait = get_rate_limiter().wait_for_slot(chat_id)
+
+    if wait:
+        release_deliveries([delivery_id])
+        raise self.retry(countdown=wait)
+
+    try:
+        response = send_telegram_message(chat_id, build_notification_message(action, reward, snoozed))
+    except TelegramRateLimitError as exc:
+        release_deliveries([delivery_id])
+        raise self.retry(exc=exc, countdown=exc.retry_after)
+    except TelegramUnavailableError as exc:
+        release_deliveries([delivery_id])
+
+        if exc.circuit_open:
+            schedule_task(
+                send_tg_notification,
+                (action, chat_id, reward, habit_id),
+                kwargs={"expires_at": get_park_deadline([delivery_id], expires_at), "snoozed": snoozed},
+                countdown=get_park_delay(exc.retry_after),
+            )
+            return
+
+        raise self.retry(exc=exc, countdown=get_backoff(self.request.retries))
+
+    if not response.ok:
+        logger.warning(
+            "Telegram отклонил напоминание в чат %s (HTTP %s): %s", chat_id, response.status_code, response.text
+        )
+        return
+
+    mark_delivered([delivery_id])
+
+
+@shared_task(bind=True, max_retries=settings.TELEGRAM_MAX_RETRIES, time_limit=settings.TELEGRAM_TASK_TIME_LIMIT)
+def send_tg_notifications_batch(self, notifications, expires_at=None):
+    """
+    Отправляет пачку уведомлений в Telegram одной задачей.
+
+    Аргументы:
+        notifications : list
+            Пары [chat_id, message] для отправки. Напоминание о привычке передается тройкой
+            [chat_id, message, delivery_id] с идентификатором записи журнала доставки.
+        expires_at : float, optional
+            Срок (Unix-время), после которого пачка, отложенная до замыкания автомата, не отправляется
+            (см. get_park_deadline).
+
+    Возвращает:
+        list: Результат отправки каждого сообщения (см. send_telegram_messages).
+
+    Описание:
+        Сообщения отправляются через общий пул keep-alive соединений, что избавляет от отдельного TLS-рукопожатия и
+        отдельного сообщения брокера на каждое напоминание. Сообщения, отложенные ограничителем частоты или
+        ответом 429, отправляются повторно этой же задачей через максимальный из полученных retry_after; не
+        отправленные из-за временной недоступности Telegram - с экспоненциальной задержкой (get_backoff). Если
+        автомат Telegram разомкнут, такие сообщения откладываются в очередь отложенных задач до его замыкания, но
+        не дольше срока expires_at, назначенного при первом откладывании. Сообщения, не отправленные после
+        TELEGRAM_MAX_RETRIES повторов, записываются в журнал с идентификаторами записей доставки.
+
+        Напоминания с delivery_id сначала берутся на отправку (claim_deliveries): уже отправленные или взятые другим
+        обработчиком пропускаются, поэтому повторная постановка той же пачки не дублирует сообщения.
+    """
+
+    if expires_at is not None and time.time() > expires_at:
+        logger.warning("Истек срок отложенной пачки из %s уведомлений, сообщения не отправлены", len(notifications))
+        return []
+
+    delivery_ids = [notification[2] for notification in notifications if len(notification) > 2]
+
+    if delivery_ids:
+        claimed = claim_deliveries(delivery_ids)
+        notifications = [
+            notification for notification in notifications if len(notification) < 3 or notification[2] in claimed
+        ]
+
+    results = send_telegram_messages([notification[:2] for notification in notifications])
+    postponed = [
+        (notification, result.get("retry_after") or get_backoff(self.request.retries))
+        for notification, result in zip(notifications, results)
+        if "retry_after" in result or result.get("unavailable")
+    ]
+
+    if delivery_ids:
+        mark_delivered(
+            notification[2]
+            for notification, result in zip(notifications, results)
+            if len(notification) > 2 and result["ok"]
+        )
+        release_deliveries(notification[2] for notification, _ in postponed if len(notification) > 2)
+
+    if postponed and any(result.get("circuit_open") for result in results):
+        parked = [notification for notification, _ in postponed]
+        deadline = get_park_deadline([notification[2] for notification in parked if len(notification) > 2], expires_at)
+        schedule_task(
+            send_tg_notifications_batch,
+            (parked,),
+            kwargs={"expires_at": deadline},
+            countdown=get_park_delay(max(retry_after for _, retry_after in postponed)),
+        )
+        return results
+
+    if postponed and self.request.retries < self.max_retries:
+        raise self.retry(
+            args=([notification for notification, _ in postponed],),
+            countdown=max(retry_after for _, retry_after in postponed),
+        )
+
+    if postponed:
+        logger.warning(
+            "Попытки отправки пачки исчерпаны, не отправлено %s уведомлений (delivery_id: %s)",
+            len(postponed),
+            [notification[2] for notification, _ in postponed if len(notification) > 2],
+        )
+
+    return results
+
+
+@shared_task
+def dispatch_due_reminders():
+    """
+    Рассылает напоминания о привычках, срок которых наступает в текущую минуту.
+
+    Возвращает:
+        int: Количество поставленных в очередь уведомлений.
+
+    Описание:
+        Задача запускается celery beat раз в минуту (режим REMINDER_MODE = "dispatcher"). Привычки с next_due_at
+        раньше конца текущей минуты выбираются пачками по индексу next_due_at с блокировкой строк (SKIP LOCKED), их
+        next_due_at сдвигается на период привычки в календарных днях часового пояса владельца (с учетом перехода на
+        летнее и зимнее время) одним bulk_update, а уведомления отправляются пачками по TELEGRAM_BATCH_SIZE задачей
+        send_tg_notifications_batch. Напоминания, просроченные более чем на
+        REMINDER_DISPATCH_GRACE (например, после простоя beat), не отправляются, а только переносятся на следующий
+        период.
+
+        Для каждого отправляемого напоминания в той же транзакции создается запись журнала доставки
+        ReminderDelivery, по которой send_tg_notifications_batch отправляет его не более одного раза.
+    """
+
+    now = timezone.now()
+    bucket_end = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    stale_before = now - settings.REMINDER_DISPATCH_GRACE
+    dispatched = 0
+
+    while True:
+        with transaction.atomic():
+            habits = list(
+                Habit.objects.select_for_update(skip_locked=True, of=("self",))
+                .select_related("owner")
+                .filter(next_due_at__lt=bucket_end)
+                .order_by("next_due_at")[: settings.REMINDER_DISPATCH_BATCH_SIZE]
+            )
+
+            if not habits:
+                break
+
+            due = [habit for habit in habits if habit.next_due_at >= stale_before]
+            notifications = [
+                [habit.owner.tg_id, build_notification_message(habit.action, habit.reward), delivery.pk]
+                for habit, delivery in zip(due, create_deliveries(due))
+            ]
+
+            for habit in habits:
+                habit.next_due_at = advance_next_due_at(
+                    habit.next_due_at, habit.frequency, bucket_end, habit.time, habit.owner.timezone
+                )
+
+            Habit.objects.bulk_update(habits, ["next_due_at"])
+
+        for start in range(0, len(notifications), settings.TELEGRAM_BATCH_SIZE):
+            send_tg_notifications_batch.delay(notifications[start:start + settings.TELEGRAM_BATCH_SIZE])
+
+        dispatched += len(notifications)
+
+    return dispatched
+
+
+def get_reminder_sync_key(habit_id):
+    return f"reminders:sync_pending:{habit_id}"
+
+
+def enqueue_reminder_sync(habit_id):
+    """
+    Ставит в очередь синхронизацию напоминания привычки, объединяя повторные запросы.
+
+    Аргументы:
+        habit_id : int
+            Идентификатор привычки.
+
+    Описание:
+        Задача sync_habit_reminder запускается с задержкой REMINDER_SYNC_COALESCE_SECONDS. Пока она не началась,
+        повторные изменения той же привычки новых задач не создают (признак ожидания хранится в кэше), поэтому
+        серия правок приводит к одному пересчету расписания по актуальному состоянию привычки. Если задачу не
+        удалось отправить в брокер, признак ожидания удаляется, чтобы следующее изменение снова поставило задачу.
+    """
+
+    window = settings.REMINDER_SYNC_COALESCE_SECONDS
+    key = get_reminder_sync_key(habit_id)
+
+    if cache.add(key, 1, timeout=window + settings.REMINDER_SYNC_PENDING_TIMEOUT):
+        try:
+            sync_habit_reminder.apply_async((habit_id,), countdown=window)
+        except Exception:
+            cache.delete(key)
+            raise
+
+
+@shared_task
+def sync_habit_reminder(habit_id):
+    """
+    Создает или обновляет периодическую задачу напоминания привычки по ее текущему состоянию.
+
+    Аргументы:
+        habit_id : int
+            Идентификатор привычки.
+
+    Возвращает:
+        None
+    """
+
+    cache.delete(get_reminder_sync_key(habit_id))
+    habit = Habit.objects.select_related("owner").filter(pk=habit_id).first()
+
+    if habit is not None:
+        sync_periodic_tasks([habit])
+
+
+@shared_task
+def delete_reminder_tasks(task_ids):
+    """
+    Удаляет периодические задачи напоминаний удаленных привычек.
+
+    Аргументы:
+        task_ids : list
+            Идентификаторы периодических задач.
+
+    Возвращает:
+        None
+    """
+
+    delete_periodic_tasks(task_ids)
+
+
+@shared_task
+def prune_habit_tombstones():
+    """
+    Удаляет записи об удалении привычек старше HABIT_TOMBSTONE_RETENTION.
+
+    Возвращает:
+        int: Количество удаленных записей.
+
+    Описание:
+        Задача запускается celery beat раз в сутки. Клиенты с токеном синхронизации старше срока хранения получают
+        ответ 410 и выполняют полную синхронизацию.
+    """
+
+    deleted, _ = HabitTombstone.objects.filter(
+        deleted_at__lt=timezone.now() - settings.HABIT_TOMBSTONE_RETENTION
+    ).delete()
+
+    return deleted
+
+
+@shared_task
+def create_completion_partitions_task():
+    """
+    Создает месячные секции журнала выполнений привычек на HABIT_COMPLETION_PARTITIONS_AHEAD месяцев вперед.
+
+    Возвращает:
+        list: Имена обработанных секций.
+
+    Описание:
+        Задача запускается celery beat раз в сутки, чтобы секция следующего месяца существовала до его начала.
+    """
+
+    return create_completion_partitions()
+
+
+@shared_task
+def refresh_habit_stats():
+    """
+    Добавляет в агрегаты статистики привычек выполнения, записанные после предыдущего запуска.
+
+    Возвращает:
+        int: Количество учтенных записей журнала выполнений.
+
+    Описание:
+        Задача запускается celery beat раз в минуту; обрабатываются только новые записи журнала, поэтому стоимость
+        запуска не зависит от объема истории.
+    """
+
+    return refresh_activity_stats()
+
+
+@shared_task
+def process_telegram_update(update):
+    """
+    Выполняет команду бота из входящего обновления Telegram и ставит в очередь ответ пользователю.
+
+    Аргументы:
+        update : dict
+            Объект Update, полученный вебхуком.
+
+    Возвращает:
+        None
+
+    Описание:
+        Ответ отправляется отдельной задачей send_tg_notifications_batch с учетом ограничителя частоты, поэтому
+        повтор отправки после ответа 429 не выполняет команду повторно.
+    """
+
+    reply = handle_update(update)
+
+    if reply is not None:
+        send_tg_notifications_batch.delay([list(reply)])
+
+
+@shared_task
+def drain_delayed_queue():
+    """
+    Отправляет в брокер отложенные задачи (например, повторные напоминания /snooze), срок запуска которых наступил.
+
+    Возвращает:
+        int: Количество отправленных задач.
+
+    Описание:
+        Задача запускается celery beat каждые DELAYED_QUEUE_POLL_INTERVAL секунд; при пустой очереди она выполняет
+        один запрос к Redis.
+    """
+
+    return get_delayed_queue().drain()
+
+
+@shared_task
+def prune_reminder_deliveries():
+    """
+    Удаляет записи журнала доставки напоминаний старше REMINDER_DELIVERY_RETENTION.
+
+    Возвращает:
+        int: Количество удаленных записей.
+    """
+
+    deleted, _ = ReminderDelivery.objects.filter(
+        scheduled_for__lt=timezone.now() - settings.REMINDER_DELIVERY_RETENTION
+    ).delete()
 
-    send_telegram_message(chat_id, message)
+    return deleted
@@ -0,0 +1,145 @@
+from django.conf import settings
+
+from main.completions import complete_habit
+from main.delayed import cancel_task, schedule_task
+from main.models import Habit, HabitCompletion
+from users.models import CustomUser
+
+HELP_MESSAGE = (
+    "Доступные команды:\n"
+    "/list - список привычек\n"
+    "/done <номер> - отметить выполнение привычки\n"
+    "/snooze <номер> [минуты] - напомнить о привычке позже"
+)
+
+
+def get_update_dedup_key(update_id):
+    return f"telegram:update:{update_id}"
+
+
+def get_snooze_job_id(habit_id):
+    return f"snooze:{habit_id}"
+
+
+def parse_command(text):
+    """
+    Разбирает текст сообщения с командой бота.
+
+    Аргументы:
+        text : str
+            Текст сообщения, например "/done 15" или "/done@habits_bot 15".
+
+    Возвращает:
+        tuple: Имя команды без "/" и упоминания бота и список аргументов; (None, []) для обычного текста.
+    """
+
+    parts = (text or "").split()
+
+    if not parts or not parts[0].startswith("/"):
+        return None, []
+
+    return parts[0][1:].split("@", 1)[0].lower(), parts[1:]
+
+
+def get_user_habit(user, args):
+    """
+    Возвращает привычку пользователя по номеру из первого аргумента команды или None.
+    """
+
+    if not args or not args[0].isdigit():
+        return None
+
+    return Habit.objects.filter(owner=user, pk=int(args[0])).select_related("owner").first()
+
+
+def handle_list(user, args):
+    habits = Habit.objects.filter(owner=user).order_by("time", "id").values_list("id", "time", "action")
+
+    if not habits:
+        return "У вас пока нет привычек."
+
+    return "\n".join(f"{pk}. {time:%H:%M} {action}" for pk, time, action in habits)
+
+
+def handle_done(user, args):
+    habit = get_user_habit(user, args)
+
+    if habit is None:
+        return "Укажите номер своей привычки: /done <номер>. Номера привычек выводит команда /list."
+
+    streak = complete_habit(habit, source=HabitCompletion.SOURCE_TELEGRAM)
+    # Выполненная привычка не требует отложенного командой /snooze напоминания.
+    cancel_task(get_snooze_job_id(habit.pk))
+
+    return f"Привычка {habit.action} выполнена. Серия: {streak.current_streak}, всего выполнений: " \
+           f"{streak.total_completions}."
+
+
+def handle_snooze(user, args):
+    # Импорт внутри функции: модуль задач импортирует обработчики команд.
+    from main.tasks import send_tg_notification
+
+    habit = get_user_habit(user, args)
+
+    if habit is None:
+        return "Укажите номер своей привычки: /snooze <номер> [минуты]."
+
+    minutes = settings.TELEGRAM_SNOOZE_MINUTES
+
+    if len(args) > 1:
+        if not args[1].isdigit() or not 1 <= int(args[1]) <= settings.TELEGRAM_SNOOZE_MAX_MINUTES:
+            return f"Количество минут должно быть числом от 1 до {settings.TELEGRAM_SNOOZE_MAX_MINUTES}."
+
+        minutes = int(args[1])
+
+    # Повторная команда для той же привычки переносит напоминание, а не добавляет второе.
+    schedule_task(
+        send_tg_notification, (habit.action, user.tg_id, habit.reward), kwargs={"snoozed": True},
+        countdown=minutes * 60, job_id=get_snooze_job_id(habit.pk),
+    )
+
+    return f"Напомню о привычке {habit.action} через {minutes} мин."
+
+
+COMMAND_HANDLERS = {
+    "list": handle_list,
+    "done": handle_done,
+    "snooze": handle_snooze,
+}
+
+
+def handle_update(update):
+    """
+    Выполняет команду из входящего обновления Telegram.
+
+    Аргументы:
+        update : dict
+            Объект Update из запроса Telegram к вебхуку.
+
+    Возвращает:
+        tuple: Идентификатор чата и текст ответа или None, если отвечать не нужно (обновление без сообщения,
+        обычный текст).
+
+    Описание:
+        Пользователь определяется по идентификатору отправителя (CustomUser.tg_id), поэтому команды доступны только
+        зарегистрированным пользователям и только для их собственных привычек.
+    """
+
+    message = update.get("message") or {}
+    command, args = parse_command(message.get("text"))
+    chat_id = (message.get("chat") or {}).get("id")
+
+    if command is None or chat_id is None:
+        return None
+
+    user = CustomUser.objects.filter(tg_id=(message.get("from") or {}).get("id"), is_active=True).first()
+
+    if user is None:
+        return chat_id, "Телеграм-аккаунт не привязан к пользователю трекера привычек."
+
+    handler = COMMAND_HANDLERS.get(command)
+
+    if handler is None:
+        return chat_id, HELP_MESSAGE
+
+    return chat_id, handler(user, args)
@@ -0,0 +1,95 @@
+from datetime import time
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from main.models import Habit
+from main.views import HabitListCreate, HabitRetrieveUpdateDestroy
+from users.models import CustomUser
+
+
+class AsyncHabitViewsTests(TestCase):
+    """
+    Тесты асинхронных представлений списка и отдельной привычки через ASGI-клиент.
+    """
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email='user@example.com', tg_id=12345678, password='password')
+        self.other = CustomUser.objects.create_user(email='other@example.com', tg_id=87654321, password='password')
+        self.habit = Habit.objects.create(
+            owner=self.user, place='Home', time=time(8, 0), action='drink_water', time_to_complete=60
+        )
+        self.headers = {'Authorization': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+        self.detail_url = reverse('main:habit-retrieve-update-destroy', args=[self.habit.pk])
+
+    def test_views_are_async(self):
+        self.assertTrue(HabitListCreate.view_is_async)
+        self.assertTrue(HabitRetrieveUpdateDestroy.view_is_async)
+
+    async def test_list(self):
+        response = await self.async_client.get(reverse('main:habit-list-create'), headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([habit['id'] for habit in response.json()['results']], [self.habit.pk])
+
+    async def test_list_with_page_number_pagination(self):
+        response = await self.async_client.get(f"{reverse('main:habit-list-create')}?page=1", headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 1)
+        self.assertEqual([habit['id'] for habit in response.json()['results']], [self.habit.pk])
+
+    async def test_list_runs_only_serialization_in_thread(self):
+        calls = []
+
+        def record(func, *args, **kwargs):
+            calls.append(func.__name__)
+            return sync_to_async(func, *args, **kwargs)
+
+        with patch('main.views.sync_to_async', side_effect=record):
+            response = await self.async_client.get(reverse('main:habit-list-create'), headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(calls, ['to_representation'])
+
+    async def test_create(self):
+        response = await self.async_client.post(
+            reverse('main:habit-list-create'),
+            {'owner': self.user.pk, 'place': 'Gym', 'time': '09:00', 'action': 'run', 'time_to_complete': 90},
+            content_type='application/json',
+            headers=self.headers,
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(await Habit.objects.filter(owner=self.user, action='run').aexists())
+
+    async def test_retrieve_and_update(self):
+        response = await self.async_client.get(self.detail_url, headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['action'], 'drink_water')
+
+        response = await self.async_client.patch(
+            self.detail_url, {'place': 'Office'}, content_type='application/json', headers=self.headers
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((await Habit.objects.aget(pk=self.habit.pk)).place, 'Office')
+
+    async def test_update_by_other_user_is_forbidden(self):
+        headers = {'Authorization': f'Bearer {RefreshToken.for_user(self.other).access_token}'}
+
+        response = await self.async_client.patch(
+            self.detail_url, {'place': 'Office'}, content_type='application/json', headers=headers
+        )
+
+        self.assertEqual(response.status_code, 403)
+
+    async def test_delete(self):
+        response = await self.async_client.delete(self.detail_url, headers=self.headers)
+
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(await Habit.objects.filter(pk=self.habit.pk).aexists())
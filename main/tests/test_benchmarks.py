@@ -0,0 +1,68 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import TestCase as SimpleTestCase
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from main.benchmarks import percentile
+from main.models import Habit
+from users.models import CustomUser
+
+
+class PercentileTests(SimpleTestCase):
+    """
+    Тесты вычисления перцентилей задержки.
+    """
+
+    def test_interpolates_between_values(self):
+        values = [float(value) for value in range(1, 101)]
+
+        self.assertEqual(percentile(values, 50), 50.5)
+        self.assertAlmostEqual(percentile(values, 99), 99.01)
+        self.assertEqual(percentile(values, 100), 100)
+
+    def test_empty_sample(self):
+        self.assertEqual(percentile([], 95), 0)
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class BenchmarkCommandsTests(TestCase):
+    """
+    Тесты команд seed_benchmark_data и run_benchmarks.
+    """
+
+    def test_seed_and_clear(self):
+        call_command("seed_benchmark_data", users=5, habits=50, batch_size=20, stdout=StringIO())
+
+        self.assertEqual(CustomUser.objects.filter(email__endswith="@benchmark.local").count(), 5)
+        self.assertEqual(Habit.objects.count(), 50)
+        self.assertFalse(Habit.objects.filter(next_due_at__isnull=True).exists())
+
+        call_command("seed_benchmark_data", clear=True, stdout=StringIO())
+
+        self.assertFalse(CustomUser.objects.exists())
+        self.assertFalse(Habit.objects.exists())
+
+    def test_run_benchmarks_reports_all_scenarios(self):
+        call_command("seed_benchmark_data", users=2, habits=20, stdout=StringIO())
+        out = StringIO()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.json")
+            call_command("run_benchmarks", iterations=3, fanout_messages=20, json_path=path, stdout=out)
+
+            with open(path) as file:
+                results = {result["scenario"]: result for result in json.load(file)}
+
+        self.assertIn("habit_list", out.getvalue())
+        self.assertEqual(
+            set(results),
+            {"token", "habit_list", "habit_retrieve", "habit_create", "public_feed", "reminder_fanout"},
+        )
+        self.assertTrue(all(result["errors"] == 0 for result in results.values()))
+        self.assertEqual(results["habit_list"]["requests"], 3)
+        self.assertIsNotNone(results["habit_list"]["queries"])
+        self.assertEqual(results["reminder_fanout"]["messages"], 20)
@@ -0,0 +1,147 @@
+import time
+from unittest.mock import patch
+
+import fakeredis
+from celery.exceptions import Retry
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from requests.adapters import HTTPAdapter
+
+from main.benchmarks import FakeTelegramServer
+from main.circuit import CircuitBreaker
+from main.services import TelegramUnavailableError, get_backoff, get_telegram_session, send_telegram_message
+from main.tasks import send_tg_notification, send_tg_notifications_batch
+
+
+@override_settings(TELEGRAM_CIRCUIT_FAILURE_THRESHOLD=2, TELEGRAM_CIRCUIT_OPEN_SECONDS=30)
+class TelegramCircuitBreakerTests(SimpleTestCase):
+    """
+    Тесты таймаутов, повторов и автомата (circuit breaker) обращений к Telegram API.
+    """
+
+    def setUp(self):
+        self.server = FakeTelegramServer().__enter__()
+        self.addCleanup(self.server.__exit__, None, None, None)
+        self.breaker = CircuitBreaker("telegram", fakeredis.FakeRedis())
+
+        settings_override = override_settings(TELEGRAM_URL=self.server.url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        patcher = patch("main.services.get_telegram_circuit_breaker", return_value=self.breaker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fail_next(self, count=1):
+        self.server.responses.extend([(502, {"ok": False})] * count)
+
+    def test_circuit_opens_after_consecutive_failures(self):
+        self.fail_next(2)
+
+        for _ in range(2):
+            with self.assertRaises(TelegramUnavailableError):
+                send_telegram_message(42, "Hello")
+
+        with self.assertRaises(TelegramUnavailableError) as context:
+            send_telegram_message(42, "Hello")
+
+        self.assertTrue(context.exception.circuit_open)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_success_resets_failures(self):
+        self.fail_next()
+
+        with self.assertRaises(TelegramUnavailableError):
+            send_telegram_message(42, "Hello")
+
+        send_telegram_message(42, "Hello")
+        self.fail_next()
+
+        with self.assertRaises(TelegramUnavailableError):
+            send_telegram_message(42, "Hello")
+
+        self.assertEqual(self.breaker.get_open_time(), 0)
+
+    def test_success_resets_failures_recorded_by_other_processes(self):
+        other = CircuitBreaker("telegram", self.breaker.client)
+        other.record_failure()
+
+        send_telegram_message(42, "Hello")
+        other.record_failure()
+
+        self.assertEqual(self.breaker.get_open_time(), 0)
+
+    def test_requests_have_default_timeouts(self):
+        with patch.object(HTTPAdapter, "send", autospec=True, side_effect=HTTPAdapter.send) as send:
+            get_telegram_session().get(f"{self.server.url}/test")
+
+        self.assertEqual(
+            send.call_args.kwargs["timeout"], (settings.TELEGRAM_CONNECT_TIMEOUT, settings.TELEGRAM_READ_TIMEOUT)
+        )
+
+    @patch("main.tasks.get_rate_limiter")
+    def test_task_retries_with_backoff_on_server_error(self, get_rate_limiter):
+        get_rate_limiter.return_value.wait_for_slot.return_value = 0
+        self.fail_next()
+
+        with patch.object(send_tg_notification, "retry", side_effect=Retry()) as mock_retry:
+            with self.assertRaises(Retry):
+                send_tg_notification("drink_water", 42)
+
+        countdown = mock_retry.call_args.kwargs["countdown"]
+        self.assertTrue(settings.TELEGRAM_RETRY_BACKOFF_BASE / 2 <= countdown <= settings.TELEGRAM_RETRY_BACKOFF_BASE)
+
+    @patch("main.tasks.schedule_task")
+    @patch("main.tasks.get_rate_limiter")
+    def test_task_is_parked_while_circuit_is_open(self, get_rate_limiter, schedule_task):
+        get_rate_limiter.return_value.wait_for_slot.return_value = 0
+        self.breaker.client.set(self.breaker.open_key, 1, px=30000)
+
+        send_tg_notification("drink_water", 42, "tea")
+
+        self.assertEqual(schedule_task.call_args.args, (send_tg_notification, ("drink_water", 42, "tea", None)))
+        self.assertGreater(schedule_task.call_args.kwargs["countdown"], 29)
+        self.assertAlmostEqual(
+            schedule_task.call_args.kwargs["kwargs"]["expires_at"],
+            time.time() + settings.REMINDER_DISPATCH_GRACE.total_seconds(),
+            delta=5,
+        )
+        self.assertEqual(self.server.requests, [])
+
+    @patch("main.tasks.schedule_task")
+    @patch("main.tasks.get_rate_limiter")
+    def test_parked_task_keeps_its_deadline(self, get_rate_limiter, schedule_task):
+        get_rate_limiter.return_value.wait_for_slot.return_value = 0
+        self.breaker.client.set(self.breaker.open_key, 1, px=30000)
+        expires_at = time.time() + 60
+
+        send_tg_notification("drink_water", 42, expires_at=expires_at)
+
+        self.assertEqual(schedule_task.call_args.kwargs["kwargs"], {"expires_at": expires_at, "snoozed": False})
+
+    @patch("main.tasks.schedule_task")
+    def test_expired_parked_messages_are_dropped(self, schedule_task):
+        self.breaker.client.set(self.breaker.open_key, 1, px=30000)
+        expires_at = time.time() - 1
+
+        send_tg_notification("drink_water", 42, expires_at=expires_at)
+        results = send_tg_notifications_batch([[1, "first"]], expires_at=expires_at)
+
+        self.assertEqual(results, [])
+        schedule_task.assert_not_called()
+        self.assertEqual(self.server.requests, [])
+
+    @patch("main.tasks.schedule_task")
+    def test_batch_is_parked_while_circuit_is_open(self, schedule_task):
+        self.breaker.client.set(self.breaker.open_key, 1, px=30000)
+
+        results = send_tg_notifications_batch([[1, "first"], [2, "second"]])
+
+        self.assertTrue(all(result["circuit_open"] for result in results))
+        self.assertEqual(schedule_task.call_args.args, (send_tg_notifications_batch, ([[1, "first"], [2, "second"]],)))
+        self.assertIn("expires_at", schedule_task.call_args.kwargs["kwargs"])
+        self.assertEqual(self.server.requests, [])
+
+    def test_backoff_grows_and_is_capped(self):
+        self.assertLessEqual(get_backoff(1), settings.TELEGRAM_RETRY_BACKOFF_BASE * 2)
+        self.assertGreaterEqual(get_backoff(3), settings.TELEGRAM_RETRY_BACKOFF_BASE * 4)
+        self.assertLessEqual(get_backoff(100), settings.TELEGRAM_RETRY_BACKOFF_MAX)
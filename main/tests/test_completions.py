@@ -0,0 +1,105 @@
+from datetime import date, time, timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from main.completions import apply_completion, complete_habit, create_completion_partitions, get_partition_name
+from main.models import Habit, HabitCompletion, HabitStreak
+from users.models import CustomUser
+
+
+class HabitCompletionTests(TestCase):
+    """
+    Тесты журнала выполнений привычек и счетчиков серий.
+    """
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email='user@example.com', tg_id=12345678, password='password')
+        self.other = CustomUser.objects.create_user(email='other@example.com', tg_id=87654321, password='password')
+        self.habit = Habit.objects.create(
+            owner=self.user, place='Home', time=time(8, 0), action='drink_water', time_to_complete=60
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('main:habit-complete', args=[self.habit.pk])
+
+    def test_complete_endpoint_updates_streak(self):
+        response = self.client.post(self.url)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['current_streak'], 1)
+        self.assertEqual(response.json()['total_completions'], 1)
+
+        response = self.client.post(self.url)
+
+        self.assertEqual(response.json()['current_streak'], 1)
+        self.assertEqual(response.json()['total_completions'], 2)
+        self.assertEqual(HabitCompletion.objects.filter(habit=self.habit).count(), 2)
+
+    def test_cannot_complete_foreign_habit(self):
+        habit = Habit.objects.create(
+            owner=self.other, place='Park', time=time(9, 0), action='run', time_to_complete=90, is_public=True
+        )
+
+        response = self.client.post(reverse('main:habit-complete', args=[habit.pk]))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_streak_rules(self):
+        streak = HabitStreak(habit=self.habit)
+
+        for day in (1, 2, 2, 3, 6, 7):
+            apply_completion(streak, date(2026, 3, day), frequency=1)
+
+        self.assertEqual(
+            (streak.current_streak, streak.best_streak, streak.total_completions, streak.last_completed_on),
+            (2, 3, 6, date(2026, 3, 7)),
+        )
+
+    def test_streak_list_resets_missed_streak(self):
+        complete_habit(self.habit, now=timezone.now() - timedelta(days=3))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('main:habit-streaks'))
+
+        self.assertEqual(response.json(), [{
+            'habit': self.habit.pk,
+            'current_streak': 0,
+            'best_streak': 1,
+            'total_completions': 1,
+            'last_completed_on': (timezone.localdate() - timedelta(days=3)).isoformat(),
+        }])
+
+    def test_completions_are_stored_in_monthly_partition(self):
+        complete_habit(self.habit)
+
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT tableoid::regclass::text FROM main_habitcompletion')
+            partition = cursor.fetchone()[0]
+
+        self.assertEqual(partition, get_partition_name(timezone.now().date()))
+
+    def test_create_completion_partitions_is_idempotent(self):
+        today = timezone.now().date()
+        partitions = create_completion_partitions(months_ahead=5, today=today)
+
+        self.assertEqual(len(partitions), 6)
+        self.assertEqual(create_completion_partitions(months_ahead=5, today=today), partitions)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT count(*) FROM pg_inherits WHERE inhparent = 'main_habitcompletion'::regclass "
+                "AND inhrelid::regclass::text = ANY(%s)",
+                [partitions],
+            )
+            self.assertEqual(cursor.fetchone()[0], 6)
+
+    def test_habit_deletion_removes_history(self):
+        complete_habit(self.habit)
+        self.habit.delete()
+
+        self.assertFalse(HabitCompletion.objects.exists())
+        self.assertFalse(HabitStreak.objects.exists())
@@ -0,0 +1,121 @@
+from datetime import time, timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+
+from main.models import Habit
+from users.models import CustomUser
+
+
+class ConditionalRequestsTests(TestCase):
+    """
+    Тесты условных запросов (ETag, Last-Modified) к списку и отдельной привычке.
+    """
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email='user@example.com', tg_id=12345678, password='password')
+        self.other = CustomUser.objects.create_user(email='other@example.com', tg_id=87654321, password='password')
+        self.habit = Habit.objects.create(
+            owner=self.user, place='Home', time=time(8, 0), action='drink_water', time_to_complete=60
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.list_url = reverse('main:habit-list-create')
+        self.detail_url = reverse('main:habit-retrieve-update-destroy', args=[self.habit.pk])
+
+    def test_updated_at_changes_on_save(self):
+        updated_at = self.habit.updated_at
+        self.habit.action = 'read'
+        self.habit.save()
+
+        self.assertGreater(self.habit.updated_at, updated_at)
+
+    def test_detail_not_modified(self):
+        response = self.client.get(self.detail_url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response.headers)
+        self.assertEqual(response.headers['Last-Modified'], http_date(self.habit.updated_at.timestamp()))
+        self.assertIn('Authorization', response.headers['Vary'])
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=response.headers['ETag'])
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertIn('ETag', response.headers)
+
+    def test_detail_if_modified_since(self):
+        since = http_date((self.habit.updated_at + timedelta(seconds=1)).timestamp())
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=since)
+
+        self.assertEqual(response.status_code, 304)
+
+        since = http_date((self.habit.updated_at - timedelta(seconds=1)).timestamp())
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=since)
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_detail_etag_changes_after_update(self):
+        etag = self.client.get(self.detail_url).headers['ETag']
+        self.client.patch(self.detail_url, {'action': 'read'}, format='json')
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['action'], 'read')
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_list_not_modified_without_fetching_page(self):
+        etag = self.client.get(self.list_url).headers['ETag']
+
+        with self.assertNumQueries(2):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_list_etag_depends_on_query(self):
+        etag = self.client.get(self.list_url).headers['ETag']
+        response = self.client.get(self.list_url, {'fields': 'id'}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_list_etag_changes_on_create_update_and_delete(self):
+        etags = [self.client.get(self.list_url).headers['ETag']]
+
+        habit = Habit.objects.create(
+            owner=self.other, place='Park', time=time(9, 0), action='run', time_to_complete=90, is_public=True
+        )
+        etags.append(self.client.get(self.list_url).headers['ETag'])
+
+        habit.place = 'Gym'
+        habit.save()
+        etags.append(self.client.get(self.list_url).headers['ETag'])
+
+        self.habit.delete()
+        etags.append(self.client.get(self.list_url).headers['ETag'])
+
+        self.assertEqual(len(set(etags)), 4)
+
+    def test_list_etag_ignores_private_habits_of_other_users(self):
+        etag = self.client.get(self.list_url).headers['ETag']
+        Habit.objects.create(owner=self.other, place='Park', time=time(9, 0), action='run', time_to_complete=90)
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_bulk_update_changes_list_etag(self):
+        etag = self.client.get(self.list_url).headers['ETag']
+        updated_at = self.habit.updated_at
+
+        response = self.client.patch(
+            reverse('main:habit-bulk'), [{'id': self.habit.pk, 'place': 'Office'}], format='json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.habit.refresh_from_db()
+        self.assertGreater(self.habit.updated_at, updated_at)
+        self.assertEqual(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
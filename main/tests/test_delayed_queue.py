@@ -0,0 +1,90 @@
+import time
+from unittest.mock import patch
+
+import fakeredis
+import redis
+from django.test import SimpleTestCase, override_settings
+
+from main.delayed import DelayedQueue, schedule_task
+from main.tasks import send_tg_notification
+
+
+class DelayedQueueTests(SimpleTestCase):
+    """
+    Тесты очереди отложенных задач в Redis.
+    """
+
+    def setUp(self):
+        self.queue = DelayedQueue(fakeredis.FakeRedis())
+
+    def test_only_due_jobs_are_claimed_once(self):
+        self.queue.schedule('main.tasks.send_tg_notification', ('run', 1), countdown=0, job_id='run:1')
+        self.queue.schedule('main.tasks.send_tg_notification', ('read', 2), countdown=600)
+
+        jobs = self.queue.claim_due()
+
+        self.assertEqual([(job['job_id'], job['args']) for job in jobs], [('run:1', ['run', 1])])
+        self.assertEqual(self.queue.claim_due(), [])
+
+        self.queue.ack(jobs)
+
+        self.assertEqual(self.queue.client.zcard(self.queue.queue_key), 1)
+        self.assertEqual(self.queue.client.hlen(self.queue.payload_key), 1)
+
+    def test_rescheduling_same_job_moves_it(self):
+        self.queue.schedule('main.tasks.send_tg_notification', ('run', 1), countdown=0, job_id='snooze:1')
+        self.queue.schedule('main.tasks.send_tg_notification', ('run', 1), countdown=600, job_id='snooze:1')
+
+        self.assertEqual(self.queue.claim_due(), [])
+        self.assertTrue(self.queue.cancel('snooze:1'))
+        self.assertFalse(self.queue.cancel('snooze:1'))
+
+    @override_settings(DELAYED_QUEUE_VISIBILITY_TIMEOUT=60)
+    def test_claimed_job_is_redelivered_after_lease(self):
+        self.queue.schedule('main.tasks.send_tg_notification', ('run', 1), job_id='run:1')
+        now = time.time()
+
+        self.assertEqual(len(self.queue.claim_due(now)), 1)
+        self.assertEqual(self.queue.claim_due(now + 30), [])
+        self.assertEqual([job['job_id'] for job in self.queue.claim_due(now + 61)], ['run:1'])
+
+    def test_job_rescheduled_during_lease_is_kept(self):
+        self.queue.schedule('main.tasks.send_tg_notification', ('run', 1), job_id='snooze:1')
+        jobs = self.queue.claim_due()
+        self.queue.schedule('main.tasks.send_tg_notification', ('run', 1), countdown=600, job_id='snooze:1')
+
+        self.queue.ack(jobs)
+        self.queue.release(jobs)
+
+        self.assertEqual(self.queue.claim_due(), [])
+        self.assertEqual(len(self.queue.claim_due(time.time() + 601)), 1)
+
+    @patch('main.delayed.current_app.send_task')
+    def test_drain_sends_due_jobs_in_batches(self, send_task):
+        for number in range(5):
+            self.queue.schedule('main.tasks.send_tg_notification', ('run', number), options={'retries': 1})
+
+        self.assertEqual(self.queue.drain(limit=2), 5)
+        self.assertEqual(send_task.call_count, 5)
+        send_task.assert_called_with('main.tasks.send_tg_notification', args=['run', 4], kwargs={}, retries=1)
+        self.assertEqual(self.queue.client.zcard(self.queue.queue_key), 0)
+        self.assertEqual(self.queue.client.hlen(self.queue.payload_key), 0)
+
+    @patch('main.delayed.current_app.send_task', side_effect=[None, ConnectionError])
+    def test_unsent_jobs_are_returned_to_queue(self, send_task):
+        for number in range(3):
+            self.queue.schedule('main.tasks.send_tg_notification', ('run', number), job_id=f'run:{number}')
+
+        with self.assertRaises(ConnectionError):
+            self.queue.drain()
+
+        self.assertEqual(sorted(job['job_id'] for job in self.queue.claim_due()), ['run:1', 'run:2'])
+
+    @patch.object(send_tg_notification, 'apply_async')
+    @patch('main.delayed.get_delayed_queue')
+    def test_schedule_falls_back_to_broker_without_redis(self, get_queue, apply_async):
+        get_queue.return_value.schedule.side_effect = redis.ConnectionError
+
+        schedule_task(send_tg_notification, ('run', 1), countdown=60)
+
+        apply_async.assert_called_once_with(('run', 1), None, countdown=60)
@@ -0,0 +1,134 @@
+from datetime import datetime, time, timedelta
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django_celery_beat.models import PeriodicTask
+
+from main.models import Habit, ReminderDelivery
+from main.scheduling import REMINDER_ADVANCE, compute_next_due_at
+from main.tasks import build_notification_message, dispatch_due_reminders
+from users.models import CustomUser
+
+
+@override_settings(REMINDER_MODE="dispatcher")
+class DispatchDueRemindersTests(TestCase):
+    """
+    Тесты диспетчера напоминаний, выбирающего привычки по полю next_due_at.
+    """
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email='user@example.com', tg_id=12345678, password='password')
+        self.now = timezone.make_aware(datetime(2026, 3, 2, 7, 45, 10))
+        self.habit = Habit.objects.create(
+            owner=self.user,
+            place='Home',
+            time=time(8, 0),
+            action='drink_water',
+            frequency=2,
+            reward='gold star',
+            time_to_complete=60,
+        )
+
+    def set_next_due_at(self, habit, value):
+        Habit.objects.filter(pk=habit.pk).update(next_due_at=value)
+
+    def test_next_due_at_is_set_on_save(self):
+        """
+        Проверяет, что при сохранении привычки вычисляется ближайший момент напоминания.
+        """
+
+        self.assertGreater(self.habit.next_due_at, timezone.now())
+        self.assertEqual(timezone.localtime(self.habit.next_due_at).time(), time(7, 45))
+
+    def test_next_due_at_is_kept_when_schedule_is_unchanged(self):
+        """
+        Проверяет, что изменение полей, не влияющих на расписание, не сдвигает напоминание привычки.
+        """
+
+        due_at = timezone.now() + timedelta(days=1, hours=3)
+        self.set_next_due_at(self.habit, due_at)
+        habit = Habit.objects.get(pk=self.habit.pk)
+
+        habit.place = 'Office'
+        habit.save()
+        habit.refresh_from_db()
+        self.assertEqual(habit.next_due_at, due_at)
+
+        habit.time = time(9, 0)
+        habit.save()
+        habit.refresh_from_db()
+        self.assertNotEqual(habit.next_due_at, due_at)
+        self.assertEqual(timezone.localtime(habit.next_due_at).time(), time(8, 45))
+
+    def test_compute_next_due_at_rolls_over_to_next_day(self):
+        """
+        Проверяет, что прошедшее сегодня напоминание переносится на следующий день.
+        """
+
+        due_at = compute_next_due_at(time(7, 0), self.now)
+
+        expected = timezone.make_aware(datetime(2026, 3, 3, 7, 0)) - REMINDER_ADVANCE
+        self.assertEqual(due_at, expected)
+
+    def test_no_periodic_task_in_dispatcher_mode(self):
+        """
+        Проверяет, что в режиме диспетчера для привычки не создается отдельная периодическая задача.
+        """
+
+        self.assertFalse(PeriodicTask.objects.filter(task="main.tasks.send_tg_notification").exists())
+
+    @patch('main.tasks.send_tg_notifications_batch.delay')
+    def test_dispatch_sends_due_habit_and_advances_it(self, mock_delay):
+        """
+        Проверяет отправку напоминания о наступившей привычке и перенос next_due_at на период привычки.
+        """
+
+        due_at = timezone.make_aware(datetime(2026, 3, 2, 7, 45))
+        self.set_next_due_at(self.habit, due_at)
+
+        with patch('main.tasks.timezone.now', return_value=self.now):
+            dispatched = dispatch_due_reminders()
+
+        self.assertEqual(dispatched, 1)
+        delivery = ReminderDelivery.objects.get(habit=self.habit)
+        mock_delay.assert_called_once_with(
+            [[12345678, build_notification_message('drink_water', 'gold star'), delivery.pk]]
+        )
+        self.assertEqual(delivery.scheduled_for, due_at)
+        self.habit.refresh_from_db()
+        self.assertEqual(self.habit.next_due_at, due_at + timedelta(days=2))
+
+    @patch('main.tasks.send_tg_notifications_batch.delay')
+    def test_dispatch_skips_future_habits(self, mock_delay):
+        """
+        Проверяет, что привычки с напоминанием в следующих минутах не затрагиваются.
+        """
+
+        due_at = timezone.make_aware(datetime(2026, 3, 2, 7, 46))
+        self.set_next_due_at(self.habit, due_at)
+
+        with patch('main.tasks.timezone.now', return_value=self.now):
+            dispatched = dispatch_due_reminders()
+
+        self.assertEqual(dispatched, 0)
+        mock_delay.assert_not_called()
+        self.habit.refresh_from_db()
+        self.assertEqual(self.habit.next_due_at, due_at)
+
+    @patch('main.tasks.send_tg_notifications_batch.delay')
+    def test_dispatch_reschedules_stale_habit_without_sending(self, mock_delay):
+        """
+        Проверяет, что давно просроченное напоминание не отправляется, а переносится в будущее.
+        """
+
+        due_at = timezone.make_aware(datetime(2026, 2, 25, 7, 45))
+        self.set_next_due_at(self.habit, due_at)
+
+        with patch('main.tasks.timezone.now', return_value=self.now):
+            dispatched = dispatch_due_reminders()
+
+        self.assertEqual(dispatched, 0)
+        mock_delay.assert_not_called()
+        self.habit.refresh_from_db()
+        self.assertEqual(self.habit.next_due_at, timezone.make_aware(datetime(2026, 3, 3, 7, 45)))
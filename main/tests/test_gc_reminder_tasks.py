@@ -0,0 +1,49 @@
+import json
+from datetime import time
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django_celery_beat.models import IntervalSchedule, PeriodicTask
+
+from main.models import Habit, HabitReminder
+from main.reminders import bulk_sync
+from users.models import CustomUser
+
+
+class GcReminderTasksTests(TestCase):
+    """
+    Тесты команды gc_reminder_tasks.
+    """
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email='user@example.com', tg_id=12345678, password='password')
+        schedule = IntervalSchedule.objects.create(every=1, period=IntervalSchedule.DAYS)
+        self.orphan = PeriodicTask.objects.create(
+            name='notification_drink_water_for_user_user@example.com',
+            task='main.tasks.send_tg_notification',
+            interval=schedule,
+            kwargs=json.dumps({'action': 'drink_water', 'chat_id': 12345678}),
+        )
+
+        with bulk_sync():
+            self.habit = Habit.objects.create(
+                owner=self.user, place='Home', time=time(8, 0), action='drink_water', time_to_complete=60
+            )
+
+    def test_dry_run_changes_nothing(self):
+        out = StringIO()
+
+        call_command('gc_reminder_tasks', '--dry-run', stdout=out)
+
+        self.assertIn('Осиротевших задач: 1', out.getvalue())
+        self.assertIn('Привычек без задачи: 1', out.getvalue())
+        self.assertTrue(PeriodicTask.objects.filter(pk=self.orphan.pk).exists())
+        self.assertFalse(HabitReminder.objects.exists())
+
+    def test_orphans_are_deleted_and_missing_created(self):
+        call_command('gc_reminder_tasks', stdout=StringIO())
+
+        self.assertFalse(PeriodicTask.objects.filter(pk=self.orphan.pk).exists())
+        self.assertEqual(PeriodicTask.objects.get(habit_reminder__habit=self.habit).name,
+                         f'habit_reminder_{self.habit.pk}')
@@ -0,0 +1,111 @@
+from datetime import time
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django_celery_beat.models import PeriodicTask
+from rest_framework.test import APIClient
+
+from main.models import Habit
+from users.models import CustomUser
+
+
+class HabitBulkTests(TestCase):
+    """
+    Тесты массового создания, обновления и удаления привычек.
+    """
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email='user@example.com', tg_id=12345678, password='password')
+        self.other = CustomUser.objects.create_user(email='other@example.com', tg_id=23456789, password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('main:habit-bulk')
+
+    def habit_payload(self, action):
+        return {
+            'place': 'Home',
+            'time': '08:00',
+            'action': action,
+            'frequency': 1,
+            'time_to_complete': 60,
+        }
+
+    def create_habits(self, count, prefix='action'):
+        return self.client.post(
+            self.url, [self.habit_payload(f'{prefix} {i}') for i in range(count)], format='json'
+        )
+
+    def test_bulk_create_creates_habits_and_reminders(self):
+        response = self.create_habits(3)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(Habit.objects.filter(owner=self.user).count(), 3)
+        self.assertEqual(PeriodicTask.objects.filter(task='main.tasks.send_tg_notification').count(), 3)
+        self.assertTrue(all(habit.next_due_at for habit in Habit.objects.all()))
+
+    def test_bulk_create_query_count_does_not_grow_with_size(self):
+        self.create_habits(1, prefix='warm up')
+
+        with CaptureQueriesContext(connection) as small:
+            self.create_habits(2, prefix='small')
+
+        with CaptureQueriesContext(connection) as large:
+            self.create_habits(20, prefix='large')
+
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_bulk_create_is_atomic_on_validation_error(self):
+        payload = [self.habit_payload('valid'), {'action': 'invalid'}]
+
+        response = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Habit.objects.exists())
+
+    def test_bulk_update_updates_habits_and_reminders(self):
+        self.create_habits(2)
+        habits = list(Habit.objects.order_by('id'))
+
+        response = self.client.patch(
+            self.url,
+            [{'id': habits[0].id, 'frequency': 3}, {'id': habits[1].id, 'place': 'Gym'}],
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, 200)
+        habits[0].refresh_from_db()
+        habits[1].refresh_from_db()
+        self.assertEqual(habits[0].frequency, 3)
+        self.assertEqual(habits[1].place, 'Gym')
+        task = PeriodicTask.objects.get(habit_reminder__habit=habits[0])
+        self.assertEqual(task.interval.every, 3)
+
+    def test_bulk_update_rejects_foreign_habits(self):
+        habit = Habit.objects.create(
+            owner=self.other, place='Home', time=time(8, 0), action='foreign', time_to_complete=60
+        )
+
+        response = self.client.patch(self.url, [{'id': habit.id, 'place': 'Gym'}], format='json')
+
+        self.assertEqual(response.status_code, 400)
+        habit.refresh_from_db()
+        self.assertEqual(habit.place, 'Home')
+
+    def test_bulk_delete_removes_habits_and_reminders(self):
+        self.create_habits(3)
+        ids = list(Habit.objects.values_list('id', flat=True))[:2]
+
+        response = self.client.delete(self.url, {'ids': ids}, format='json')
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(Habit.objects.count(), 1)
+        self.assertEqual(PeriodicTask.objects.filter(task='main.tasks.send_tg_notification').count(), 1)
+
+    def test_bulk_size_is_limited(self):
+        with self.settings(HABIT_BULK_MAX_ITEMS=2):
+            response = self.create_habits(3)
+
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,179 @@
+from datetime import time, timedelta
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from main.changes import encode_token
+from main.models import Habit, HabitTombstone
+from main.tasks import prune_habit_tombstones
+from users.models import CustomUser
+
+
+@override_settings(HABIT_CHANGES_SAFETY_WINDOW=timedelta(0))
+class HabitChangesTests(TestCase):
+    """
+    Тесты инкрементальной синхронизации привычек (habits/changes/).
+    """
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email='user@example.com', tg_id=12345678, password='password')
+        self.other = CustomUser.objects.create_user(email='other@example.com', tg_id=87654321, password='password')
+        self.habit = self.create_habit(self.user, 'drink_water')
+        self.public = self.create_habit(self.other, 'run', is_public=True)
+        self.private = self.create_habit(self.other, 'sleep')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('main:habit-changes')
+
+    def create_habit(self, owner, action, **kwargs):
+        return Habit.objects.create(
+            owner=owner, place='Home', time=time(8, 0), action=action, time_to_complete=60, **kwargs
+        )
+
+    def sync(self, token=None, client=None, **params):
+        if token:
+            params['since'] = token
+
+        response = (client or self.client).get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+
+        return response.json()
+
+    def test_full_sync_returns_visible_habits(self):
+        data = self.sync()
+
+        self.assertEqual([habit['id'] for habit in data['changed']], [self.habit.pk, self.public.pk])
+        self.assertEqual(data['deleted'], [])
+        self.assertFalse(data['has_more'])
+
+    def test_incremental_sync_returns_only_changes(self):
+        token = self.sync()['next']
+        self.habit.action = 'read'
+        self.habit.save()
+
+        data = self.sync(token, fields='id,action')
+
+        self.assertEqual(data['changed'], [{'id': self.habit.pk, 'action': 'read'}])
+        self.assertEqual(self.sync(data['next'])['changed'], [])
+
+    def test_deleted_habits(self):
+        token = self.sync()['next']
+        habit_id, public_id = self.habit.pk, self.public.pk
+        self.habit.delete()
+        self.public.delete()
+        self.private.delete()
+
+        data = self.sync(token)
+
+        self.assertEqual(data['changed'], [])
+        self.assertEqual(data['deleted'], [habit_id, public_id])
+
+    def test_deleting_related_habit_marks_linked_habits_changed(self):
+        pleasant = self.create_habit(self.user, 'read', is_pleasant_habit=True)
+        Habit.objects.filter(pk=self.habit.pk).update(related_habit=pleasant)
+        token = self.sync()['next']
+        pleasant_id = pleasant.pk
+
+        pleasant.delete()
+        data = self.sync(token, fields='id,related_habit')
+
+        self.assertEqual(data['changed'], [{'id': self.habit.pk, 'related_habit': None}])
+        self.assertEqual(data['deleted'], [pleasant_id])
+
+    def test_bulk_delete_marks_linked_habits_changed(self):
+        pleasant = self.create_habit(self.user, 'read', is_pleasant_habit=True)
+        Habit.objects.filter(pk=self.habit.pk).update(related_habit=pleasant)
+        token = self.sync()['next']
+
+        self.client.delete(reverse('main:habit-bulk'), {'ids': [pleasant.pk]}, format='json')
+
+        self.assertEqual(self.sync(token, fields='id,related_habit')['changed'],
+                         [{'id': self.habit.pk, 'related_habit': None}])
+
+    def test_deleting_related_habit_invalidates_public_feed(self):
+        pleasant = self.create_habit(self.user, 'read', is_pleasant_habit=True)
+        Habit.objects.filter(pk=self.habit.pk).update(related_habit=pleasant, is_public=True)
+
+        with patch('main.changes.bump_public_feed_version') as bump, self.captureOnCommitCallbacks(execute=True):
+            pleasant.delete()
+
+        bump.assert_called_once()
+
+    def test_bulk_delete_records_tombstones(self):
+        token = self.sync()['next']
+        habit_id = self.habit.pk
+
+        response = self.client.delete(reverse('main:habit-bulk'), {'ids': [habit_id]}, format='json')
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.sync(token)['deleted'], [habit_id])
+
+    def test_unpublished_habit_is_deleted_for_other_users_only(self):
+        owner_client = APIClient()
+        owner_client.force_authenticate(user=self.other)
+        token = self.sync()['next']
+        owner_token = self.sync(client=owner_client)['next']
+
+        self.public.is_public = False
+        self.public.save()
+
+        data = self.sync(token)
+        owner_data = self.sync(owner_token, client=owner_client)
+
+        self.assertEqual(data['deleted'], [self.public.pk])
+        self.assertEqual(data['changed'], [])
+        self.assertEqual(owner_data['deleted'], [])
+        self.assertEqual([habit['id'] for habit in owner_data['changed']], [self.public.pk])
+
+    def test_republished_habit_drops_tombstone(self):
+        token = self.sync()['next']
+        self.public.is_public = False
+        self.public.save()
+        self.public.is_public = True
+        self.public.save()
+
+        data = self.sync(token)
+
+        self.assertEqual(data['deleted'], [])
+        self.assertEqual([habit['id'] for habit in data['changed']], [self.public.pk])
+
+    @override_settings(HABIT_CHANGES_PAGE_SIZE=1)
+    def test_changes_are_paginated(self):
+        ids = []
+        data = self.sync()
+        ids.extend(habit['id'] for habit in data['changed'])
+
+        while data['has_more']:
+            data = self.sync(data['next'])
+            ids.extend(habit['id'] for habit in data['changed'])
+
+        self.assertEqual(ids, [self.habit.pk, self.public.pk])
+
+    @override_settings(HABIT_CHANGES_SAFETY_WINDOW=timedelta(minutes=1))
+    def test_recent_changes_are_repeated_within_safety_window(self):
+        token = self.sync()['next']
+
+        self.assertEqual(len(self.sync(token)['changed']), 2)
+
+    def test_invalid_token(self):
+        response = self.client.get(self.url, {'since': 'invalid'})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_expired_token(self):
+        moment = timezone.now() - timedelta(days=365)
+        response = self.client.get(self.url, {'since': encode_token((moment, 0), (moment, 0))})
+
+        self.assertEqual(response.status_code, 410)
+
+    def test_prune_habit_tombstones(self):
+        self.habit.delete()
+        HabitTombstone.objects.update(deleted_at=timezone.now() - timedelta(days=365))
+        public_id = self.public.pk
+        self.public.delete()
+
+        self.assertEqual(prune_habit_tombstones(), 1)
+        self.assertEqual(list(HabitTombstone.objects.values_list('habit_id', flat=True)), [public_id])
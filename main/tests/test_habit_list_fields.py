@@ -0,0 +1,94 @@
+import json
+from datetime import time
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from main.models import Habit
+from main.renderers import ORJSONRenderer
+from main.serializers import HabitSerializer, HabitValuesSerializer
+from users.models import CustomUser
+
+
+class HabitListFieldsTests(TestCase):
+    """
+    Тесты облегченной сериализации списка привычек и параметра fields.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='user@example.com', tg_id=12345678, password='password')
+        pleasant = Habit.objects.create(
+            owner=cls.user, place='Home', time=time(7, 30), action='bath', time_to_complete=60,
+            is_pleasant_habit=True, is_public=True,
+        )
+        Habit.objects.create(
+            owner=cls.user, place='Park', time=time(8, 0), action='run', time_to_complete=90, related_habit=pleasant
+        )
+        Habit.objects.create(
+            owner=cls.user, place='Office', time=time(12, 15, 30), action='walk', time_to_complete=30, reward='tea'
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('main:habit-list-create')
+
+    def test_compact_list_matches_model_serializer(self):
+        response = self.client.get(self.url)
+        expected = HabitSerializer(Habit.objects.order_by('id'), many=True).data
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], json.loads(JSONRenderer().render(expected)))
+        self.assertEqual(list(response.json()['results'][0]), list(expected[0]))
+
+    def test_values_serializer_fields_follow_model_serializer(self):
+        self.assertEqual(HabitValuesSerializer.FIELDS, tuple(HabitSerializer().fields))
+        self.assertNotIn('next_due_at', HabitValuesSerializer.FIELDS)
+
+    def test_sparse_fieldset(self):
+        response = self.client.get(self.url, {'fields': 'action,time', 'page_size': 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [
+            {'action': 'bath', 'time': '07:30:00'},
+            {'action': 'run', 'time': '08:00:00'},
+        ])
+
+        response = self.client.get(response.json()['next'])
+
+        self.assertEqual(response.json()['results'], [{'action': 'walk', 'time': '12:15:30'}])
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(self.url, {'fields': 'action,password'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('fields', response.json())
+
+    def test_public_feed_supports_fields(self):
+        response = self.client.get(reverse('main:habit-public-list'), {'fields': 'id,is_public'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [{'id': Habit.objects.get(action='bath').pk, 'is_public': True}])
+
+
+class ORJSONRendererTests(TestCase):
+    """
+    Тесты JSON-рендерера на основе orjson.
+    """
+
+    def test_output_matches_json_renderer(self):
+        data = {'results': [{'id': 1, 'action': 'Пить воду', 'reward': None}], 'detail': gettext_lazy('Not found.')}
+
+        self.assertEqual(
+            json.loads(ORJSONRenderer().render(data)),
+            json.loads(JSONRenderer().render(data)),
+        )
+
+    def test_indent_falls_back_to_json_renderer(self):
+        content = ORJSONRenderer().render({'id': 1}, 'application/json; indent=2')
+
+        self.assertIn(b'\n', content)
@@ -0,0 +1,113 @@
+import re
+from datetime import time
+
+from django.db import connection
+from django.db.models import Count, Max
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from main.models import Habit
+from main.paginators import HabitCursorPagination
+from main.views import HabitListCreate
+from users.models import CustomUser
+
+
+class HabitListQueryPlanTests(TestCase):
+    """
+    Тесты плана запроса списка привычек на заполненной таблице.
+
+    Проверяет, что выборка "свои или публичные привычки" выполняется по индексам habit_owner_id_idx и
+    habit_public_id_idx, а не полным сканированием таблицы.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = CustomUser.objects.bulk_create(
+            CustomUser(email=f"user{i}@example.com", tg_id=i) for i in range(1, 101)
+        )
+        Habit.objects.bulk_create(
+            Habit(
+                owner=cls.users[i % 100],
+                place="Home",
+                time=time(8, 0),
+                action=f"action {i}",
+                time_to_complete=60,
+                is_public=i % 100 == 0,
+            )
+            for i in range(10000)
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE main_habit")
+
+    def get_view(self, user, url="/api/habits/"):
+        request = Request(APIRequestFactory().get(url))
+        request.user = user
+        view = HabitListCreate()
+        view.request = request
+
+        return view
+
+    def get_queryset(self, user):
+        return self.get_view(user).get_queryset()
+
+    def get_page_queryset(self, user):
+        view = self.get_view(user, f"/api/habits/?page_size={HabitCursorPagination.max_page_size}")
+
+        return HabitCursorPagination().get_page_queryset(view.get_queryset().values("id", "action"), view.request, view)
+
+    def test_query_plan_uses_owner_and_public_indexes(self):
+        plan = self.get_queryset(self.users[1]).explain()
+
+        self.assertIn("habit_owner_id_idx", plan)
+        self.assertIn("habit_public_id_idx", plan)
+        # Полное сканирование допустимо только для присоединяемой связанной привычки (псевдоним t3), но не для
+        # основной выборки.
+        self.assertIsNone(re.search(r"Seq Scan on main_habit(?! t\d)", plan))
+
+    def test_queryset_is_ordered_and_complete(self):
+        user = self.users[1]
+        habits = list(self.get_queryset(user))
+
+        self.assertEqual([habit.id for habit in habits], sorted(habit.id for habit in habits))
+        self.assertEqual(len(habits), Habit.objects.filter(owner=user).count() + 100)
+        self.assertTrue(all(habit.owner == user or habit.is_public for habit in habits))
+
+    def test_page_query_plan_uses_owner_and_public_indexes(self):
+        plan = self.get_page_queryset(self.users[1]).explain()
+
+        self.assertIn("habit_owner_id_idx", plan)
+        self.assertIn("habit_public_id_idx", plan)
+        self.assertNotIn("Seq Scan", plan)
+
+    def test_page_query_does_not_count(self):
+        view = self.get_view(self.users[1])
+        queryset = view.get_queryset().values("id", "action")
+
+        with CaptureQueriesContext(connection) as queries:
+            page = HabitCursorPagination().paginate_queryset(queryset, view.request, view)
+
+        self.assertEqual(len(page), HabitCursorPagination.page_size)
+        self.assertEqual(len(queries), 1)
+        self.assertFalse(any("COUNT(" in query["sql"] for query in queries.captured_queries))
+
+    def explain_aggregate(self, queryset, **aggregates):
+        with CaptureQueriesContext(connection) as queries:
+            queryset.aggregate(**aggregates)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN {queries[0]['sql']}")
+
+            return "\n".join(row[0] for row in cursor.fetchall())
+
+    def test_etag_aggregates_use_indexes(self):
+        own_plan = self.explain_aggregate(
+            Habit.objects.filter(owner=self.users[1]), last_modified=Max("updated_at"), count=Count("id")
+        )
+        public_plan = self.explain_aggregate(Habit.objects.filter(is_public=True), last_modified=Max("updated_at"))
+
+        self.assertIn("habit_owner_id_idx", own_plan)
+        self.assertIn("habit_updated_idx", public_plan)
+        self.assertNotIn("Seq Scan", own_plan + public_plan)
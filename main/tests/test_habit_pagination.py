@@ -0,0 +1,89 @@
+from datetime import time
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from main.models import Habit
+from users.models import CustomUser
+
+
+class HabitPaginationTests(TestCase):
+    """
+    Тесты курсорной и постраничной пагинации списка привычек.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='user@example.com', tg_id=12345678, password='password')
+        Habit.objects.bulk_create(
+            Habit(owner=cls.user, place='Home', time=time(8, 0), action=f'action {i}', time_to_complete=60)
+            for i in range(12)
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('main:habit-list-create')
+
+    def test_cursor_pagination_is_default_and_skips_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('count', response.data)
+        self.assertEqual(len(response.data['results']), 5)
+        # Агрегаты ETag проверяются отдельно (test_habit_list_query), здесь - только запрос страницы.
+        page_queries = [query for query in queries.captured_queries if 'LIMIT' in query['sql']]
+        self.assertEqual(len(page_queries), 1)
+        self.assertFalse(any('COUNT(' in query['sql'] for query in page_queries))
+
+    def test_cursor_pagination_walks_all_habits_in_order(self):
+        ids = []
+        url = f'{self.url}?page_size=4'
+
+        while url:
+            response = self.client.get(url)
+            ids.extend(habit['id'] for habit in response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual(ids, list(Habit.objects.order_by('id').values_list('id', flat=True)))
+
+    def test_cursor_pagination_walks_back_with_previous_links(self):
+        url = f'{self.url}?page_size=4'
+
+        while url:
+            response = self.client.get(url)
+            url = response.data['next']
+
+        ids = [habit['id'] for habit in response.data['results']]
+        url = response.data['previous']
+
+        while url:
+            response = self.client.get(url)
+            ids[:0] = [habit['id'] for habit in response.data['results']]
+            url = response.data['previous']
+
+        self.assertEqual(ids, list(Habit.objects.order_by('id').values_list('id', flat=True)))
+
+    def test_page_size_is_bounded(self):
+        Habit.objects.bulk_create(
+            Habit(owner=self.user, place='Home', time=time(8, 0), action=f'extra {i}', time_to_complete=60)
+            for i in range(100)
+        )
+
+        response = self.client.get(f'{self.url}?page_size=1000')
+
+        self.assertEqual(len(response.data['results']), 100)
+
+    def test_page_number_pagination_is_available(self):
+        response = self.client.get(f'{self.url}?page=2')
+
+        self.assertEqual(response.data['count'], 12)
+        self.assertEqual(len(response.data['results']), 5)
+
+        response = self.client.get(f'{self.url}?pagination=page')
+
+        self.assertEqual(response.data['count'], 12)
@@ -0,0 +1,108 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from main.completions import complete_habit
+from main.models import AggregationCursor, Habit, HabitActivityStat
+from main.stats import STATS_CURSOR, refresh_activity_stats
+from main.tasks import refresh_habit_stats
+from users.models import CustomUser
+
+
+@override_settings(HABIT_STATS_REFRESH_LAG=timedelta(0))
+class HabitStatsTests(TestCase):
+    """
+    Тесты статистики выполнения привычек и инкрементального обновления ее агрегатов.
+    """
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email='user@example.com', tg_id=12345678, password='password', timezone='Europe/Berlin'
+        )
+        self.useful = Habit.objects.create(
+            owner=self.user, place='Home', time=time(8, 0), action='drink_water', time_to_complete=60
+        )
+        self.pleasant = Habit.objects.create(
+            owner=self.user, place='Home', time=time(21, 0), action='read', time_to_complete=60,
+            is_pleasant_habit=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('main:habit-stats')
+
+    def complete(self, habit, *args):
+        # Понедельник, 5 октября 2026 года; время задается в UTC (Europe/Berlin = UTC+2).
+        complete_habit(habit, now=datetime(2026, 10, 5, *args, tzinfo=dt_timezone.utc))
+
+    def test_stats_are_built_from_aggregates(self):
+        self.complete(self.useful, 6, 0)
+        self.complete(self.useful, 6, 30)
+        self.complete(self.pleasant, 19, 0)
+
+        self.assertEqual(refresh_habit_stats(), 3)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+
+        data = response.json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['heatmap'][0][8], 2)
+        self.assertEqual(data['heatmap'][0][21], 1)
+        self.assertEqual(sum(map(sum, data['heatmap'])), 3)
+        self.assertEqual((data['pleasant_completions'], data['useful_completions']), (1, 2))
+        self.assertEqual(data['pleasant_ratio'], 0.333)
+        self.assertEqual(data['best_hour'], 8)
+        self.assertEqual(
+            [(habit['habit'], habit['total_completions'], habit['completion_rate']) for habit in data['habits']],
+            [(self.useful.pk, 2, 1), (self.pleasant.pk, 1, 1)],
+        )
+
+    def test_refresh_is_incremental(self):
+        self.complete(self.useful, 6, 0)
+        refresh_activity_stats()
+        self.complete(self.useful, 6, 10)
+        self.complete(self.useful, 7, 10)
+
+        self.assertEqual(refresh_activity_stats(batch_size=1), 2)
+        self.assertEqual(refresh_activity_stats(), 0)
+        self.assertEqual(
+            sorted(HabitActivityStat.objects.values_list('hour', 'completions')),
+            [(8, 2), (9, 1)],
+        )
+
+    def test_timezone_change_does_not_move_recorded_completions(self):
+        self.complete(self.useful, 6, 0)
+        self.user.timezone = 'Asia/Tokyo'
+        self.user.save()
+
+        refresh_activity_stats()
+
+        self.assertEqual(
+            list(HabitActivityStat.objects.values_list('weekday', 'hour', 'completions')), [(1, 8, 1)]
+        )
+
+    @override_settings(HABIT_STATS_REFRESH_LAG=timedelta(minutes=1))
+    def test_recent_completions_wait_for_next_refresh(self):
+        complete_habit(self.useful)
+
+        self.assertEqual(refresh_activity_stats(), 0)
+        self.assertEqual(refresh_activity_stats(now=timezone.now() + timedelta(minutes=2)), 1)
+        self.assertEqual(AggregationCursor.objects.get(name=STATS_CURSOR).position, self.useful.completions.get().id)
+
+    def test_completion_rate(self):
+        Habit.objects.filter(pk=self.useful.pk).update(created_at=timezone.now() - timedelta(days=3))
+        complete_habit(self.useful)
+
+        habit = self.client.get(self.url).json()['habits'][0]
+
+        self.assertEqual((habit['expected_completions'], habit['completion_rate']), (4, 0.25))
+
+    def test_empty_stats(self):
+        data = self.client.get(self.url).json()
+
+        self.assertIsNone(data['best_hour'])
+        self.assertIsNone(data['pleasant_ratio'])
+        self.assertEqual(data['heatmap'], [[0] * 24 for _ in range(7)])
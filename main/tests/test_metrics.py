@@ -0,0 +1,138 @@
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from datetime import time as habit_time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY, CollectorRegistry
+from rest_framework.test import APIClient
+
+from main.metrics import MultiDirectoryCollector, record_task_duration, record_task_start, reset_multiprocess_dir
+from main.models import Habit
+from users.models import CustomUser
+
+
+class MetricsMiddlewareTests(TestCase):
+    """
+    Тесты метрик HTTP-запросов и эндпоинта /metrics.
+    """
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email='user@example.com', tg_id=12345678, password='password')
+        Habit.objects.create(
+            owner=self.user, place='Home', time=habit_time(8, 0), action='drink_water', time_to_complete=60
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def get_sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_request_latency_and_queries_are_recorded(self):
+        labels = {'view': 'main:habit-list-create', 'method': 'GET'}
+        count_before = self.get_sample('http_request_db_queries_count', **labels)
+        queries_before = self.get_sample('http_request_db_queries_sum', **labels)
+
+        response = self.client.get(reverse('main:habit-list-create'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_sample('http_request_db_queries_count', **labels), count_before + 1)
+        self.assertGreater(self.get_sample('http_request_db_queries_sum', **labels), queries_before)
+        self.assertGreater(
+            self.get_sample('http_request_duration_seconds_count', status='200', **labels), 0
+        )
+
+    @override_settings(METRICS_TOKEN='metrics-token')
+    def test_metrics_endpoint_exposes_histograms(self):
+        self.client.get(reverse('main:habit-list-create'))
+
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer metrics-token')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'http_request_duration_seconds_bucket', response.content)
+        self.assertIn(b'view="main:habit-list-create"', response.content)
+
+    @override_settings(METRICS_TOKEN='metrics-token')
+    def test_metrics_endpoint_requires_token(self):
+        for headers in ({}, {'HTTP_AUTHORIZATION': 'Bearer wrong'}, {'HTTP_AUTHORIZATION': 'metrics-token'}):
+            self.assertEqual(self.client.get(reverse('metrics'), **headers).status_code, 403)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_metrics_endpoint_is_disabled_without_token(self):
+        self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer ').status_code, 403)
+
+
+class MultiprocessMetricsTests(SimpleTestCase):
+    """
+    Тесты сбора метрик нескольких процессов и очистки файлов метрик предыдущего запуска.
+    """
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def touch(self, *parts):
+        path = os.path.join(self.root, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, 'wb').close()
+        return path
+
+    def test_collector_merges_files_of_all_containers(self):
+        web = self.touch('web', 'histogram_7.db')
+        worker = self.touch('celery_notifications', 'histogram_7.db')
+
+        with patch('main.metrics.multiprocess.MultiProcessCollector.merge', return_value=[]) as merge:
+            list(MultiDirectoryCollector(self.root, CollectorRegistry()).collect())
+
+        self.assertCountEqual(merge.call_args.args[0], [web, worker])
+
+    def test_reset_removes_previous_run_files(self):
+        path = os.path.join(self.root, 'web')
+        stale = self.touch('web', 'histogram_7.db')
+        other = self.touch('celery_analytics', 'histogram_7.db')
+
+        with patch.dict(os.environ, {'PROMETHEUS_MULTIPROC_DIR': path}):
+            reset_multiprocess_dir()
+
+        self.assertFalse(os.path.exists(stale))
+        self.assertTrue(os.path.exists(other))
+
+
+class CeleryTaskMetricsTests(TestCase):
+    """
+    Тесты метрик выполнения задач Celery и времени ожидания в очереди.
+    """
+
+    def get_sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_queue_lag_and_duration_are_recorded(self):
+        task = SimpleNamespace(
+            name='main.tasks.send_tg_notification',
+            request=SimpleNamespace(published_at=time.time() - 3, eta=None),
+        )
+        lag_before = self.get_sample('celery_task_queue_lag_seconds_sum', task=task.name)
+
+        record_task_start(task_id='1', task=task)
+        record_task_duration(task_id='1', task=task, state='SUCCESS')
+
+        self.assertGreaterEqual(self.get_sample('celery_task_queue_lag_seconds_sum', task=task.name) - lag_before, 3)
+        self.assertGreater(self.get_sample('celery_task_duration_seconds_count', task=task.name, state='SUCCESS'), 0)
+
+    def test_queue_lag_counts_from_eta(self):
+        eta = datetime.now(timezone.utc) - timedelta(seconds=1)
+        task = SimpleNamespace(
+            name='main.tasks.sync_habit_reminder',
+            request=SimpleNamespace(published_at=eta.timestamp() - 60, eta=eta.isoformat()),
+        )
+        lag_before = self.get_sample('celery_task_queue_lag_seconds_sum', task=task.name)
+
+        record_task_start(task_id='2', task=task)
+        record_task_duration(task_id='2', task=task, state='SUCCESS')
+
+        self.assertLess(self.get_sample('celery_task_queue_lag_seconds_sum', task=task.name) - lag_before, 30)
@@ -0,0 +1,95 @@
+from datetime import time
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from main.cache import get_public_feed_version
+from main.models import Habit
+from users.models import CustomUser
+
+
+class PublicFeedTests(TestCase):
+    """
+    Тесты кэшируемой ленты публичных привычек и ее инвалидации сигналами.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(email='user@example.com', tg_id=12345678, password='password')
+        self.public_habit = Habit.objects.create(
+            owner=self.user, place='Park', time=time(7, 0), action='Running', time_to_complete=60, is_public=True
+        )
+        self.private_habit = Habit.objects.create(
+            owner=self.user, place='Home', time=time(9, 0), action='Reading', time_to_complete=60
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('main:habit-public-list')
+
+    def test_feed_contains_only_public_habits(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual([habit['id'] for habit in response.data['results']], [self.public_habit.id])
+
+    def test_repeated_request_is_served_from_cache(self):
+        self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_private_habit_change_keeps_cache(self):
+        version = get_public_feed_version()
+
+        self.private_habit.place = 'Office'
+        self.private_habit.save()
+
+        self.assertEqual(get_public_feed_version(), version)
+
+    def test_public_habit_change_invalidates_cache(self):
+        self.client.get(self.url)
+
+        self.public_habit.action = 'Jogging'
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.public_habit.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['results'][0]['action'], 'Jogging')
+
+    def test_habit_made_private_invalidates_cache(self):
+        self.client.get(self.url)
+
+        habit = Habit.objects.get(pk=self.public_habit.pk)
+        habit.is_public = False
+
+        with self.captureOnCommitCallbacks(execute=True):
+            habit.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['results'], [])
+
+    def test_public_habit_deletion_invalidates_cache(self):
+        self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Habit.objects.get(pk=self.public_habit.pk).delete()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['results'], [])
+
+    def test_cache_version_is_bumped_after_commit(self):
+        version = get_public_feed_version()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.public_habit.action = 'Jogging'
+            self.public_habit.save()
+            self.assertEqual(get_public_feed_version(), version)
+
+        for callback in callbacks:
+            callback()
+
+        self.assertGreater(get_public_feed_version(), version)
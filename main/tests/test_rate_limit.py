@@ -0,0 +1,114 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+import fakeredis
+from celery.exceptions import Retry
+from django.test import override_settings
+
+from main.benchmarks import FakeTelegramServer
+from main.ratelimit import TelegramRateLimiter
+from main.services import TelegramRateLimitError, send_telegram_message, send_telegram_messages
+from main.tasks import send_tg_notification
+
+
+class TelegramRateLimiterTests(TestCase):
+    """
+    Тесты ограничителя частоты отправки сообщений в Telegram на основе token bucket в Redis.
+    """
+
+    def setUp(self):
+        self.limiter = TelegramRateLimiter(fakeredis.FakeRedis())
+
+    @override_settings(TELEGRAM_CHAT_RATE=1, TELEGRAM_CHAT_BURST=1)
+    def test_chat_bucket_allows_one_message_per_second(self):
+        self.assertEqual(self.limiter.acquire(1), 0)
+
+        wait = self.limiter.acquire(1)
+
+        self.assertGreater(wait, 0)
+        self.assertLessEqual(wait, 1)
+        self.assertEqual(self.limiter.acquire(2), 0)
+
+    @override_settings(TELEGRAM_GLOBAL_RATE=3, TELEGRAM_GLOBAL_BURST=3)
+    def test_global_bucket_limits_all_chats(self):
+        for chat_id in range(3):
+            self.assertEqual(self.limiter.acquire(chat_id), 0)
+
+        self.assertGreater(self.limiter.acquire(100), 0)
+
+    @override_settings(TELEGRAM_GLOBAL_RATE=3, TELEGRAM_GLOBAL_BURST=3)
+    def test_denied_request_does_not_consume_tokens(self):
+        self.assertEqual(self.limiter.acquire(1), 0)
+        self.assertGreater(self.limiter.acquire(1), 0)
+
+        self.assertEqual(self.limiter.acquire(2), 0)
+        self.assertEqual(self.limiter.acquire(3), 0)
+
+    @override_settings(TELEGRAM_CHAT_RATE=1, TELEGRAM_CHAT_BURST=1)
+    def test_wait_for_slot_returns_wait_above_limit(self):
+        self.limiter.acquire(1)
+
+        self.assertGreater(self.limiter.wait_for_slot(1, max_wait=0), 0)
+
+    @override_settings(TELEGRAM_RATE_LIMIT_ENABLED=False)
+    def test_disabled_limiter_always_allows(self):
+        for _ in range(5):
+            self.assertEqual(self.limiter.acquire(1), 0)
+
+
+class FakeTelegramServerTests(TestCase):
+    """
+    Тесты обработки ответов Telegram API на локальном фейковом сервере.
+    """
+
+    def setUp(self):
+        self.server = FakeTelegramServer().__enter__()
+        self.addCleanup(self.server.__exit__, None, None, None)
+        settings_override = override_settings(TELEGRAM_URL=self.server.url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.limiter = TelegramRateLimiter(fakeredis.FakeRedis())
+
+    def test_message_is_delivered(self):
+        send_telegram_message(42, "Hello")
+
+        self.assertEqual(self.server.requests, [{"chat_id": "42", "text": "Hello"}])
+
+    def test_429_raises_rate_limit_error(self):
+        self.server.rate_limit_next(7)
+
+        with self.assertRaises(TelegramRateLimitError) as context:
+            send_telegram_message(42, "Hello")
+
+        self.assertEqual(context.exception.retry_after, 7)
+
+    def test_task_retries_after_telegram_retry_after(self):
+        self.server.rate_limit_next(5)
+
+        with patch("main.tasks.get_rate_limiter", return_value=self.limiter), \
+                patch.object(send_tg_notification, "retry", side_effect=Retry()) as mock_retry:
+            with self.assertRaises(Retry):
+                send_tg_notification("drink_water", 42)
+
+        self.assertEqual(mock_retry.call_args.kwargs["countdown"], 5)
+
+    @override_settings(TELEGRAM_CHAT_RATE=0.1, TELEGRAM_CHAT_BURST=1, TELEGRAM_RATE_LIMIT_MAX_SLEEP=0)
+    def test_task_retries_when_limiter_denies(self):
+        self.limiter.acquire(42)
+
+        with patch("main.tasks.get_rate_limiter", return_value=self.limiter), \
+                patch.object(send_tg_notification, "retry", side_effect=Retry()) as mock_retry:
+            with self.assertRaises(Retry):
+                send_tg_notification("drink_water", 42)
+
+        self.assertGreater(mock_retry.call_args.kwargs["countdown"], 0)
+        self.assertEqual(self.server.requests, [])
+
+    @override_settings(TELEGRAM_CHAT_RATE=0.1, TELEGRAM_CHAT_BURST=1, TELEGRAM_RATE_LIMIT_MAX_SLEEP=0)
+    def test_batch_reports_rate_limited_messages(self):
+        with patch("main.services.get_rate_limiter", return_value=self.limiter):
+            results = send_telegram_messages([(1, "first"), (1, "second")])
+
+        self.assertEqual(sum(result["ok"] for result in results), 1)
+        self.assertEqual(len([result for result in results if "retry_after" in result]), 1)
+        self.assertEqual(len(self.server.requests), 1)
@@ -0,0 +1,122 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from main.deliveries import claim_deliveries, claim_reminder, create_deliveries
+from main.models import Habit, ReminderDelivery
+from main.scheduling import get_last_due_at
+from main.tasks import prune_reminder_deliveries, send_tg_notification, send_tg_notifications_batch
+from users.models import CustomUser
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+class ReminderDeliveryTests(TestCase):
+    """
+    Тесты журнала доставки напоминаний: каждое напоминание отправляется не более одного раза.
+    """
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email='user@example.com', tg_id=12345678, password='password', timezone='Europe/Berlin'
+        )
+        self.habit = Habit.objects.create(
+            owner=self.user, place='Home', time=time(8, 0), action='drink_water', time_to_complete=60
+        )
+        self.habit.next_due_at = utc(2026, 3, 2, 6, 45)
+
+    def test_last_due_at(self):
+        fired = get_last_due_at(time(8, 0), utc(2026, 3, 2, 6, 45, 3), 'Europe/Berlin')
+        before = get_last_due_at(time(8, 0), utc(2026, 3, 2, 6, 44), 'Europe/Berlin')
+
+        self.assertEqual((fired, before), (utc(2026, 3, 2, 6, 45), utc(2026, 3, 1, 6, 45)))
+
+    def test_repeated_dispatch_reuses_delivery(self):
+        first = create_deliveries([self.habit])[0].pk
+        second = create_deliveries([self.habit])[0].pk
+
+        self.assertEqual(first, second)
+        self.assertEqual(claim_deliveries([first]), {first})
+        self.assertEqual(claim_deliveries([first]), set())
+
+    @patch('main.tasks.send_telegram_messages')
+    def test_batch_sends_each_delivery_once(self, send_messages):
+        delivery = create_deliveries([self.habit])[0]
+        send_messages.return_value = [{'chat_id': 12345678, 'ok': True, 'error': None}]
+
+        send_tg_notifications_batch([[12345678, 'hello', delivery.pk]])
+        send_tg_notifications_batch([[12345678, 'hello', delivery.pk]])
+
+        self.assertEqual([call.args for call in send_messages.call_args_list], [([[12345678, 'hello']],), ([],)])
+        delivery.refresh_from_db()
+        self.assertIsNotNone(delivery.sent_at)
+        self.assertGreaterEqual(delivery.latency, timedelta(0))
+
+    @patch('main.tasks.send_telegram_messages')
+    def test_postponed_delivery_is_released_for_retry(self, send_messages):
+        delivery = create_deliveries([self.habit])[0]
+        send_messages.return_value = [{'chat_id': 12345678, 'ok': False, 'error': 'rate limited', 'retry_after': 1}]
+
+        with patch.object(send_tg_notifications_batch, 'max_retries', 0), \
+                self.assertLogs('main.tasks', level='WARNING') as logs:
+            send_tg_notifications_batch([[12345678, 'hello', delivery.pk]])
+
+        delivery.refresh_from_db()
+        self.assertIsNone(delivery.claimed_at)
+        self.assertIn(f'не отправлено 1 уведомлений (delivery_id: [{delivery.pk}])', logs.output[0])
+
+    @patch('main.tasks.get_rate_limiter')
+    @patch('main.tasks.send_telegram_message')
+    def test_periodic_reminder_is_sent_once(self, send_message, get_rate_limiter):
+        get_rate_limiter.return_value.wait_for_slot.return_value = 0
+
+        send_tg_notification('drink_water', 12345678, habit_id=self.habit.pk)
+        send_tg_notification('drink_water', 12345678, habit_id=self.habit.pk)
+
+        send_message.assert_called_once()
+        self.assertEqual(ReminderDelivery.objects.filter(habit=self.habit, sent_at__isnull=False).count(), 1)
+
+    @patch('main.tasks.get_rate_limiter')
+    @patch('main.tasks.send_telegram_message')
+    def test_rejected_reminder_is_not_marked_sent(self, send_message, get_rate_limiter):
+        get_rate_limiter.return_value.wait_for_slot.return_value = 0
+        send_message.return_value.ok = False
+        send_message.return_value.status_code = 403
+
+        with self.assertLogs('main.tasks', level='WARNING'):
+            send_tg_notification('drink_water', 12345678, habit_id=self.habit.pk)
+
+        delivery = ReminderDelivery.objects.get(habit=self.habit)
+        self.assertIsNotNone(delivery.claimed_at)
+        self.assertIsNone(delivery.sent_at)
+
+    @override_settings(REMINDER_CLOCK_SKEW=timedelta(minutes=1))
+    def test_claim_reminder_tolerates_worker_clock_behind_beat(self):
+        yesterday = claim_reminder(self.habit.pk, now=utc(2026, 3, 2, 6, 40))
+        today = claim_reminder(self.habit.pk, now=utc(2026, 3, 2, 6, 44, 30))
+
+        self.assertIsNotNone(today)
+        self.assertEqual(
+            list(ReminderDelivery.objects.filter(pk__in=[yesterday, today]).values_list('scheduled_for', flat=True)
+                 .order_by('scheduled_for')),
+            [utc(2026, 3, 1, 6, 45), utc(2026, 3, 2, 6, 45)],
+        )
+        self.assertIsNone(claim_reminder(self.habit.pk, now=utc(2026, 3, 2, 6, 45, 10)))
+
+    def test_claim_reminder_of_deleted_habit(self):
+        habit_id = self.habit.pk
+        self.habit.delete()
+
+        self.assertIsNone(claim_reminder(habit_id))
+
+    def test_prune_reminder_deliveries(self):
+        create_deliveries([self.habit])
+        self.habit.next_due_at = timezone.now()
+        create_deliveries([self.habit])
+
+        self.assertEqual(prune_reminder_deliveries(), 1)
+        self.assertEqual(ReminderDelivery.objects.count(), 1)
@@ -0,0 +1,91 @@
+from datetime import datetime, time, timezone as dt_timezone
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django_celery_beat.models import PeriodicTask
+
+from main import scheduling
+from main.models import Habit
+from main.scheduling import advance_next_due_at, compute_next_due_at, compute_next_due_ats
+from users.models import CustomUser
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+class TimezoneSchedulingTests(TestCase):
+    """
+    Тесты расчета моментов напоминаний в часовом поясе пользователя, в том числе при переходе на летнее и зимнее
+    время (Europe/Berlin: 29.03.2026 и 25.10.2026).
+    """
+
+    def test_next_due_at_after_spring_forward(self):
+        due_at = compute_next_due_at(time(8, 0), utc(2026, 3, 28, 12, 0), 'Europe/Berlin')
+
+        self.assertEqual(due_at, utc(2026, 3, 29, 5, 45))
+
+    def test_advance_keeps_local_time_across_transitions(self):
+        spring = advance_next_due_at(utc(2026, 3, 28, 6, 45), 1, utc(2026, 3, 28, 6, 46), time(8, 0), 'Europe/Berlin')
+        autumn = advance_next_due_at(utc(2026, 10, 24, 5, 45), 1, utc(2026, 10, 24, 5, 46), time(8, 0), 'Europe/Berlin')
+
+        self.assertEqual(spring, utc(2026, 3, 29, 5, 45))
+        self.assertEqual(autumn, utc(2026, 10, 25, 6, 45))
+
+    def test_advance_skips_missed_periods(self):
+        due_at = advance_next_due_at(utc(2026, 3, 20, 6, 45), 3, utc(2026, 3, 30, 0, 0), time(8, 0), 'Europe/Berlin')
+
+        self.assertEqual(due_at, utc(2026, 4, 1, 5, 45))
+
+    def test_nonexistent_local_time_is_shifted_forward(self):
+        due_at = compute_next_due_at(time(2, 30), utc(2026, 3, 28, 12, 0), 'Europe/Berlin')
+
+        self.assertEqual(due_at, utc(2026, 3, 29, 1, 15))
+
+    def test_bulk_computation_is_done_once_per_schedule(self):
+        now = utc(2026, 3, 28, 12, 0)
+        schedules = [(time(8, 0), 'Europe/Berlin'), (time(8, 0), 'Asia/Tokyo'), (time(8, 0), 'Europe/Berlin')] * 100
+
+        with patch.object(scheduling, 'compute_next_due_at', wraps=compute_next_due_at) as compute:
+            due_ats = compute_next_due_ats(schedules, now)
+
+        self.assertEqual(compute.call_count, 2)
+        self.assertEqual(due_ats[:3], [utc(2026, 3, 29, 5, 45), utc(2026, 3, 28, 22, 45), utc(2026, 3, 29, 5, 45)])
+
+
+class UserTimezoneChangeTests(TestCase):
+    """
+    Тесты пересчета напоминаний при изменении часового пояса пользователя.
+    """
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email='user@example.com', tg_id=12345678, password='password', timezone='Europe/Berlin'
+        )
+        Habit.objects.bulk_create(
+            Habit(owner=self.user, place='Home', time=time(8, 0), action=f'action {i}', time_to_complete=60)
+            for i in range(50)
+        )
+        self.user = CustomUser.objects.get(pk=self.user.pk)
+
+    @override_settings(REMINDER_MODE='dispatcher')
+    def test_timezone_change_reschedules_habits_in_one_batch(self):
+        self.user.timezone = 'Asia/Tokyo'
+
+        # Сохранение пользователя, выборка привычек и один bulk_update.
+        with self.assertNumQueries(3):
+            self.user.save()
+
+        for habit in Habit.objects.all():
+            self.assertEqual(habit.next_due_at.astimezone(scheduling.get_zone('Asia/Tokyo')).time(), time(7, 45))
+
+    def test_daily_reminders_use_crontab_in_user_timezone(self):
+        self.user.timezone = 'America/New_York'
+        self.user.save()
+
+        task = PeriodicTask.objects.filter(habit_reminder__habit__owner=self.user).select_related('crontab').first()
+
+        self.assertEqual(PeriodicTask.objects.filter(habit_reminder__habit__owner=self.user).count(), 50)
+        self.assertIsNone(task.interval_id)
+        self.assertEqual((task.crontab.hour, task.crontab.minute), ('7', '45'))
+        self.assertEqual(str(task.crontab.timezone), 'America/New_York')
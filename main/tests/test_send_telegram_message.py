@@ -10,7 +10,7 @@ class TestGramMessage(unittest.TestCase):
     Тест отправки сообщений Telegram с помощью функции send_telegram_message.
     """
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_gram_message(self, mock_get):
         mock_get.return_value.status_code = 200
 
@@ -0,0 +1,62 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from config import settings
+from main.services import get_telegram_session, send_telegram_messages
+from main.tasks import send_tg_notifications_batch
+
+
+def make_response(status_code):
+    response = MagicMock()
+    response.status_code = status_code
+    response.ok = status_code < 400
+    return response
+
+
+class TestSendTelegramMessages(unittest.TestCase):
+    """
+    Тесты пакетной отправки сообщений Telegram через общий пул соединений.
+    """
+
+    def test_session_is_shared(self):
+        self.assertIs(get_telegram_session(), get_telegram_session())
+
+    @patch('requests.Session.get')
+    def test_reports_result_per_message(self, mock_get):
+        responses = {
+            1: make_response(200),
+            2: make_response(400),
+        }
+
+        def fake_get(url, params):
+            if params["chat_id"] == 3:
+                raise requests.ConnectionError("connection reset")
+            return responses[params["chat_id"]]
+
+        mock_get.side_effect = fake_get
+
+        results = send_telegram_messages([(1, "first"), (2, "second"), (3, "third")])
+
+        self.assertEqual(results, [
+            {"chat_id": 1, "ok": True, "error": None},
+            {"chat_id": 2, "ok": False, "error": "HTTP 400"},
+            {"chat_id": 3, "ok": False, "error": "connection reset", "unavailable": True},
+        ])
+        mock_get.assert_any_call(
+            f"{settings.TELEGRAM_URL}{settings.TELEGRAM_TOKEN}/sendMessage",
+            params={"chat_id": 1, "text": "first"}
+        )
+
+    @patch('main.tasks.send_telegram_messages')
+    def test_batch_task_delegates_to_service(self, mock_send_messages):
+        mock_send_messages.return_value = [{"chat_id": 1, "ok": True, "error": None}]
+
+        results = send_tg_notifications_batch([[1, "hello"]])
+
+        mock_send_messages.assert_called_once_with([[1, "hello"]])
+        self.assertEqual(results, [{"chat_id": 1, "ok": True, "error": None}])
+
+    def test_empty_batch(self):
+        self.assertEqual(send_telegram_messages([]), [])
@@ -1,7 +1,13 @@
+from django.core.cache import cache
+from django.db import IntegrityError
 from django.test import TestCase
 from datetime import time
-from django_celery_beat.models import PeriodicTask
-from main.models import Habit
+from unittest.mock import patch
+from django_celery_beat.models import IntervalSchedule, PeriodicTask
+from config import celery_app
+from main.models import Habit, HabitReminder
+from main.reminders import bulk_sync, sync_periodic_tasks
+from main.tasks import enqueue_reminder_sync, get_reminder_sync_key
 from users.models import CustomUser
 
 
@@ -24,6 +30,27 @@ class HabitSignalTests(TestCase):
 
         test_delete_periodic_task_on_habit_deletion():
             Проверяет, что удаление привычки приводит к удалению соответствующей периодической задачи.
+
+        test_repeated_updates_are_coalesced():
+            Проверяет, что несколько изменений привычки приводят к одной задаче синхронизации расписания.
+
+        test_failed_publish_does_not_block_sync():
+            Проверяет, что после ошибки отправки задачи в брокер следующее изменение снова ставит синхронизацию.
+
+        test_no_sync_without_commit():
+            Проверяет, что до фиксации транзакции синхронизация расписания не запускается.
+
+        test_same_action_habits_get_separate_tasks():
+            Проверяет, что привычки с одинаковым действием одного пользователя получают отдельные задачи.
+
+        test_action_change_keeps_single_task():
+            Проверяет, что изменение действия привычки обновляет ее задачу, не оставляя "осиротевших" задач.
+
+        test_failed_sync_leaves_no_orphan_task():
+            Проверяет, что ошибка при создании связи откатывает созданную периодическую задачу.
+
+        test_sync_adopts_orphan_task_with_same_name():
+            Проверяет, что задача без связи с именем задачи привычки используется повторно.
     """
 
     def setUp(self):
@@ -31,9 +58,13 @@ class HabitSignalTests(TestCase):
         Инициализация тестового окружения.
 
         Создает тестового пользователя и словарь с данными привычки, которые будут использоваться в различных тестовых
-        методах.
+        методах. Задачи Celery выполняются синхронно.
         """
 
+        cache.clear()
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, "task_always_eager", False)
+
         self.user = CustomUser.objects.create_user(email='user@example.com', tg_id=12345678, password='password')
         self.habit_data = {
             'owner': self.user,
@@ -49,10 +80,10 @@ class HabitSignalTests(TestCase):
         Тестирует создание периодической задачи при создании привычки.
         """
 
-        habit = Habit.objects.create(**self.habit_data)
+        with self.captureOnCommitCallbacks(execute=True):
+            habit = Habit.objects.create(**self.habit_data)
 
-        task_name = f"notification_{habit.action}_for_user_{habit.owner}"
-        task_exists = PeriodicTask.objects.filter(name=task_name).exists()
+        task_exists = PeriodicTask.objects.filter(habit_reminder__habit=habit).exists()
         self.assertTrue(task_exists)
 
     def test_update_periodic_task_on_habit_update(self):
@@ -60,13 +91,14 @@ class HabitSignalTests(TestCase):
         Тестирует обновление периодической задачи при обновлении привычки.
         """
 
-        habit = Habit.objects.create(**self.habit_data)
+        with self.captureOnCommitCallbacks(execute=True):
+            habit = Habit.objects.create(**self.habit_data)
 
-        habit.frequency = 2
-        habit.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            habit.frequency = 2
+            habit.save()
 
-        task_name = f"notification_{habit.action}_for_user_{habit.owner}"
-        task = PeriodicTask.objects.get(name=task_name)
+        task = PeriodicTask.objects.get(habit_reminder__habit=habit)
         self.assertEqual(task.interval.every, habit.frequency)
 
     def test_delete_periodic_task_on_habit_deletion(self):
@@ -74,10 +106,127 @@ class HabitSignalTests(TestCase):
         Тестирует удаление периодической задачи при удалении привычки.
         """
 
-        habit = Habit.objects.create(**self.habit_data)
+        with self.captureOnCommitCallbacks(execute=True):
+            habit = Habit.objects.create(**self.habit_data)
+
+        task_id = habit.reminder.periodic_task_id
 
-        habit.delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            habit.delete()
 
-        task_name = f"notification_{habit.action}_for_user_{habit.owner}"
-        task_exists = PeriodicTask.objects.filter(name=task_name).exists()
+        task_exists = PeriodicTask.objects.filter(pk=task_id).exists()
         self.assertFalse(task_exists)
+
+    def test_repeated_updates_are_coalesced(self):
+        """
+        Тестирует объединение нескольких изменений привычки в одну синхронизацию расписания.
+        """
+
+        celery_app.conf.task_always_eager = False
+
+        with patch("main.tasks.sync_habit_reminder.apply_async") as mock_apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                habit = Habit.objects.create(**self.habit_data)
+
+            for frequency in (2, 3, 4):
+                with self.captureOnCommitCallbacks(execute=True):
+                    habit.frequency = frequency
+                    habit.save()
+
+        mock_apply_async.assert_called_once()
+        self.assertEqual(mock_apply_async.call_args.args[0], (habit.pk,))
+
+    def test_failed_publish_does_not_block_sync(self):
+        """
+        Тестирует, что признак ожидания синхронизации снимается, если задачу не удалось отправить в брокер.
+        """
+
+        celery_app.conf.task_always_eager = False
+        habit = Habit.objects.create(**self.habit_data)
+
+        with patch("main.tasks.sync_habit_reminder.apply_async", side_effect=ConnectionError) as mock_apply_async:
+            with self.assertRaises(ConnectionError):
+                enqueue_reminder_sync(habit.pk)
+
+        self.assertIsNone(cache.get(get_reminder_sync_key(habit.pk)))
+
+        with patch("main.tasks.sync_habit_reminder.apply_async") as mock_apply_async:
+            enqueue_reminder_sync(habit.pk)
+
+        mock_apply_async.assert_called_once()
+
+    def test_no_sync_without_commit(self):
+        """
+        Тестирует, что синхронизация расписания не выполняется до фиксации транзакции.
+        """
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            habit = Habit.objects.create(**self.habit_data)
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertFalse(HabitReminder.objects.filter(habit=habit).exists())
+
+    def test_same_action_habits_get_separate_tasks(self):
+        """
+        Тестирует создание отдельных задач для привычек с одинаковым действием.
+        """
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first = Habit.objects.create(**self.habit_data)
+            second = Habit.objects.create(**self.habit_data)
+
+        self.assertNotEqual(first.reminder.periodic_task_id, second.reminder.periodic_task_id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+
+        self.assertTrue(PeriodicTask.objects.filter(habit_reminder__habit=second).exists())
+
+    def test_action_change_keeps_single_task(self):
+        """
+        Тестирует, что изменение действия привычки не оставляет старую задачу.
+        """
+
+        with self.captureOnCommitCallbacks(execute=True):
+            habit = Habit.objects.create(**self.habit_data)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            habit.action = 'read_book'
+            habit.save()
+
+        tasks = PeriodicTask.objects.filter(task="main.tasks.send_tg_notification")
+        self.assertEqual(tasks.count(), 1)
+        self.assertIn('read_book', tasks.get().kwargs)
+
+    def test_failed_sync_leaves_no_orphan_task(self):
+        """
+        Тестирует, что при ошибке создания связи HabitReminder периодическая задача не остается в базе данных.
+        """
+
+        with bulk_sync():
+            habit = Habit.objects.create(**self.habit_data)
+
+        with patch("main.reminders.HabitReminder.objects.bulk_create", side_effect=IntegrityError):
+            with self.assertRaises(IntegrityError):
+                sync_periodic_tasks([habit])
+
+        self.assertFalse(PeriodicTask.objects.filter(task="main.tasks.send_tg_notification").exists())
+
+    def test_sync_adopts_orphan_task_with_same_name(self):
+        """
+        Тестирует повторное использование задачи без связи с тем же именем вместо ошибки уникальности имени.
+        """
+
+        with bulk_sync():
+            habit = Habit.objects.create(**self.habit_data)
+
+        orphan = PeriodicTask.objects.create(
+            name=f"habit_reminder_{habit.pk}",
+            task="main.tasks.send_tg_notification",
+            interval=IntervalSchedule.objects.create(every=3, period=IntervalSchedule.DAYS),
+        )
+
+        sync_periodic_tasks([habit])
+
+        self.assertEqual(habit.reminder.periodic_task_id, orphan.pk)
+        self.assertEqual(PeriodicTask.objects.filter(task="main.tasks.send_tg_notification").count(), 1)
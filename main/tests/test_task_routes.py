@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from config import celery_app
+
+
+class TaskRoutingTests(SimpleTestCase):
+    """
+    Тесты распределения задач Celery по очередям.
+    """
+
+    def get_queue(self, task_name):
+        return celery_app.amqp.router.route({}, task_name)['queue'].name
+
+    def test_notifications_are_isolated_from_background_tasks(self):
+        self.assertEqual(self.get_queue('main.tasks.send_tg_notification'), 'notifications')
+        self.assertEqual(self.get_queue('main.tasks.send_tg_notifications_batch'), 'notifications')
+        self.assertEqual(self.get_queue('main.tasks.prune_habit_tombstones'), 'maintenance')
+        self.assertEqual(self.get_queue('main.tasks.refresh_habit_stats'), 'analytics')
+
+    def test_every_project_task_has_route(self):
+        celery_app.loader.import_default_modules()
+        tasks = {name for name in celery_app.tasks if name.startswith('main.')}
+
+        self.assertEqual(tasks - settings.CELERY_TASK_ROUTES.keys(), set())
@@ -0,0 +1,137 @@
+from datetime import time
+from unittest.mock import patch
+
+import fakeredis
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from main.delayed import DelayedQueue
+from main.models import Habit, HabitCompletion
+from main.tasks import build_notification_message, process_telegram_update
+from main.telegram import handle_update, parse_command
+from users.models import CustomUser
+
+
+def make_update(text, update_id=1, sender=12345678):
+    return {
+        'update_id': update_id,
+        'message': {'message_id': 1, 'from': {'id': sender}, 'chat': {'id': sender}, 'text': text},
+    }
+
+
+@override_settings(TELEGRAM_WEBHOOK_SECRET='secret')
+class TelegramWebhookTests(TestCase):
+    """
+    Тесты вебхука входящих обновлений Telegram.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('main:telegram-webhook')
+        patcher = patch('main.views.process_telegram_update.delay')
+        self.delay = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, data, secret='secret'):
+        return self.client.post(self.url, data, format='json', HTTP_X_TELEGRAM_BOT_API_SECRET_TOKEN=secret)
+
+    def test_update_is_enqueued_once(self):
+        update = make_update('/list')
+
+        self.assertEqual(self.post(update).status_code, 200)
+        self.assertEqual(self.post(update).status_code, 200)
+        self.delay.assert_called_once_with(update)
+
+    def test_wrong_secret_is_rejected(self):
+        self.assertEqual(self.post(make_update('/list'), secret='wrong').status_code, 403)
+        self.delay.assert_not_called()
+
+    @override_settings(TELEGRAM_WEBHOOK_SECRET='')
+    def test_webhook_is_disabled_without_secret(self):
+        self.assertEqual(self.post(make_update('/list'), secret='').status_code, 403)
+
+    def test_update_without_id_is_rejected(self):
+        self.assertEqual(self.post({'message': {}}).status_code, 400)
+
+    def test_failed_enqueue_allows_redelivery(self):
+        self.delay.side_effect = [ConnectionError, None]
+
+        with self.assertRaises(ConnectionError):
+            self.post(make_update('/list'))
+
+        self.assertEqual(self.post(make_update('/list')).status_code, 200)
+        self.assertEqual(self.delay.call_count, 2)
+
+
+class TelegramCommandTests(TestCase):
+    """
+    Тесты обработки команд бота.
+    """
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email='user@example.com', tg_id=12345678, password='password')
+        self.other = CustomUser.objects.create_user(email='other@example.com', tg_id=87654321, password='password')
+        self.habit = Habit.objects.create(
+            owner=self.user, place='Home', time=time(8, 0), action='drink_water', time_to_complete=60, reward='tea'
+        )
+        self.foreign = Habit.objects.create(
+            owner=self.other, place='Park', time=time(9, 0), action='run', time_to_complete=90
+        )
+
+    def test_parse_command(self):
+        self.assertEqual(parse_command('/Done@habits_bot 15'), ('done', ['15']))
+        self.assertEqual(parse_command('hello'), (None, []))
+
+    def test_list(self):
+        self.assertEqual(handle_update(make_update('/list')), (12345678, f'{self.habit.pk}. 08:00 drink_water'))
+
+    def test_done(self):
+        chat_id, reply = handle_update(make_update(f'/done {self.habit.pk}'))
+
+        self.assertIn('Серия: 1', reply)
+        self.assertEqual(HabitCompletion.objects.get().source, HabitCompletion.SOURCE_TELEGRAM)
+
+    def test_done_foreign_habit(self):
+        handle_update(make_update(f'/done {self.foreign.pk}'))
+
+        self.assertFalse(HabitCompletion.objects.exists())
+
+    @patch('main.telegram.schedule_task')
+    def test_snooze(self, schedule_task):
+        handle_update(make_update(f'/snooze {self.habit.pk} 30'))
+
+        self.assertEqual(schedule_task.call_args.args[1:], (('drink_water', 12345678, 'tea'),))
+        self.assertEqual(
+            schedule_task.call_args.kwargs,
+            {'kwargs': {'snoozed': True}, 'countdown': 1800, 'job_id': f'snooze:{self.habit.pk}'},
+        )
+
+    def test_done_cancels_snoozed_reminder(self):
+        queue = DelayedQueue(fakeredis.FakeRedis())
+
+        with patch('main.delayed.get_delayed_queue', return_value=queue):
+            handle_update(make_update(f'/snooze {self.habit.pk} 30'))
+            self.assertEqual(queue.client.zcard(queue.queue_key), 1)
+
+            handle_update(make_update(f'/done {self.habit.pk}'))
+
+        self.assertEqual(queue.client.zcard(queue.queue_key), 0)
+        self.assertEqual(queue.client.hlen(queue.payload_key), 0)
+
+    def test_snoozed_reminder_text(self):
+        self.assertEqual(build_notification_message('drink_water', snoozed=True), 'Пора выполнить задачу drink_water.')
+        self.assertNotIn('15 минут', build_notification_message('drink_water', 'tea', snoozed=True))
+
+    def test_unknown_sender_and_plain_text(self):
+        self.assertIn('не привязан', handle_update(make_update('/list', sender=1))[1])
+        self.assertIsNone(handle_update(make_update('hello')))
+
+    @patch('main.tasks.send_tg_notifications_batch.delay')
+    def test_task_enqueues_reply(self, delay):
+        process_telegram_update(make_update('/help'))
+
+        delay.assert_called_once()
+        self.assertEqual(delay.call_args.args[0][0][0], 12345678)
@@ -1,12 +1,29 @@
 from django.urls import path
 
 from main.apps import MainConfig
-from main.views import HabitListCreate, HabitRetrieveUpdateDestroy
+from main.views import (
+    HabitBulk,
+    HabitChanges,
+    HabitComplete,
+    HabitListCreate,
+    HabitRetrieveUpdateDestroy,
+    HabitStats,
+    HabitStreakList,
+    PublicHabitList,
+    TelegramWebhook,
+)
 
 app_name = MainConfig.name
 
 urlpatterns = [
     path("habits/", HabitListCreate.as_view(), name="habit-list-create"),
+    path("habits/public/", PublicHabitList.as_view(), name="habit-public-list"),
+    path("habits/bulk/", HabitBulk.as_view(), name="habit-bulk"),
+    path("habits/changes/", HabitChanges.as_view(), name="habit-changes"),
+    path("habits/stats/", HabitStats.as_view(), name="habit-stats"),
+    path("habits/streaks/", HabitStreakList.as_view(), name="habit-streaks"),
+    path("habits/<int:pk>/complete/", HabitComplete.as_view(), name="habit-complete"),
+    path("telegram/webhook/", TelegramWebhook.as_view(), name="telegram-webhook"),
     path(
         "habits/<int:pk>/",
         HabitRetrieveUpdateDestroy.as_view(),
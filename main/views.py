@@ -1,49 +1,231 @@
-from rest_framework import generics
-from rest_framework.permissions import IsAuthenticated
+from adrf import generics as async_generics, views as async_views
+from adrf.mixins import get_data
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from rest_framework import generics, status
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
 
-from main.models import Habit
-from main.paginators import HabitPagination
+from main.cache import aget_public_feed_version, get_public_feed_cache_key
+from main.changes import get_changes, record_deleted_habits
+from main.completions import complete_habit
+from main.conditional import get_not_modified_response, make_etag, set_validators
+from main.metrics import render_metrics
+from main.models import Habit, HabitReminder, HabitStreak
+from main.paginators import HabitCursorPagination, get_habit_paginator
 from main.permissions import IsOwnerOrReadOnly
-from main.serializers import HabitSerializer
+from main.reminders import bulk_sync, delete_periodic_tasks
+from main.serializers import (
+    HabitBulkDeleteSerializer,
+    HabitBulkSerializer,
+    HabitSerializer,
+    HabitStreakSerializer,
+    HabitValuesSerializer,
+)
+from main.scheduling import get_zone
+from main.stats import get_user_stats
+from main.tasks import process_telegram_update
+from main.telegram import get_update_dedup_key
 
 
-class HabitListCreate(generics.ListCreateAPIView):
+class HabitValuesListMixin:
     """
-    Представление для отображения списка привычек и создания новой привычки.
+    Примесь для представлений списка привычек, отдающая страницу через облегченный HabitValuesSerializer.
+
+    Строки выбираются через QuerySet.values() только с запрошенными полями (параметр fields, например
+    ?fields=id,action,time), без создания экземпляров модели и полей DRF.
+    """
+
+    def compact_list(self, request):
+        serializer = HabitValuesSerializer.from_request(request)
+        queryset = self.get_queryset().values(*serializer.get_queryset_fields(("id",)))
+        page = self.paginate_queryset(queryset)
+
+        if page is None:
+            return Response(serializer.to_representation(queryset))
+
+        return self.get_paginated_response(serializer.to_representation(page))
+
+    async def acompact_list(self, request):
+        serializer = HabitValuesSerializer.from_request(request)
+        queryset = self.get_queryset().values(*serializer.get_queryset_fields(("id",)))
+        page = await self.apaginate_queryset(queryset)
+
+        if page is None:
+            return Response(await sync_to_async(serializer.to_representation)([row async for row in queryset]))
+
+        return self.get_paginated_response(await sync_to_async(serializer.to_representation)(page))
+
+
+class HabitListCreate(HabitValuesListMixin, async_generics.ListCreateAPIView):
+    """
+    Асинхронное представление для отображения списка привычек и создания новой привычки.
 
     Доступ предоставляет:
-    - Для GET-запросов: отображает список привычек текущего пользователя и публичные привычки.
+    - Для GET-запросов: отображает список привычек текущего пользователя и публичные привычки. Параметр fields
+      ограничивает набор полей в ответе. Поддерживаются условные запросы: при совпадении If-None-Match с ETag
+      возвращается 304 без выборки и сериализации страницы.
     - Для POST-запросов: позволяет текущему пользователю создать новую привычку.
 
     Атрибуты:
     - serializer_class: сериализатор, используемый для представления и валидации данных о привычках.
-    - pagination_class: класс пагинации для разделения списка привычек на страницы.
+    - pagination_class: класс пагинации для разделения списка привычек на страницы. По умолчанию используется
+      курсорная пагинация, постраничная доступна с параметром page или pagination=page.
     - permission_classes: указание, что пользователь должен быть аутентифицирован (авторизован).
 
     Методы:
-    - get_queryset: возвращает привычки, принадлежащие пользователю, или публичные привычки.
-    - perform_create: автоматически устанавливает текущего пользователя владельцем создаваемой привычки.
+    - get_queryset: возвращает привычки, принадлежащие пользователю, или публичные привычки, упорядоченные по id.
+      Условие обслуживается индексами habit_owner_id_idx и habit_public_id_idx.
+    - alist: вычисляет ETag списка и возвращает 304 или страницу привычек.
+    - perform_acreate: автоматически устанавливает текущего пользователя владельцем создаваемой привычки.
+
+    При запуске через ASGI обработчики выполняются в цикле событий: список выбирается асинхронными запросами ORM
+    (aaggregate, асинхронная итерация по QuerySet.values()), и через sync_to_async выполняется только сериализация,
+    поэтому процесс сервера не занят на время ожидания Postgres.
     """
 
     serializer_class = HabitSerializer
-    pagination_class = HabitPagination
+    pagination_class = HabitCursorPagination
     permission_classes = [IsAuthenticated]
 
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            if self.request is None:
+                self._paginator = self.pagination_class()
+            else:
+                self._paginator = get_habit_paginator(self.request, asynchronous=True)
+
+        return self._paginator
+
     def get_queryset(self):
-        return Habit.objects.filter(owner=self.request.user) | Habit.objects.filter(
-            is_public=True
+        return (
+            Habit.objects.filter(Q(owner=self.request.user) | Q(is_public=True))
+            .select_related("owner", "related_habit")
+            .order_by("id")
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        """
+        Отдает страницу списка привычек с учетом условных заголовков запроса.
+
+        Описание:
+            ETag вычисляется без выборки страницы: по количеству и max(updated_at) привычек пользователя (только
+            индекс habit_owner_id_idx, включающий updated_at), max(updated_at) публичных привычек (обратный
+            просмотр индекса habit_updated_idx до первой публичной привычки) и версии ленты публичных привычек,
+            которая увеличивается и при их удалении. В ETag также входят параметры запроса и формат ответа.
+            Last-Modified отдается для информации, но не используется для ответа 304, так как удаление привычки не
+            меняет max(updated_at). Состояние вычисляется до выборки страницы, поэтому при параллельном изменении
+            ETag может оказаться только старее тела ответа, что приводит лишь к лишней передаче данных при
+            следующем запросе.
+
+            Запросы к базе данных и кэшу выполняются асинхронно в цикле событий, в поток через sync_to_async
+            передается только сериализация выбранных строк.
+        """
+
+        own = await Habit.objects.filter(owner=request.user).aaggregate(
+            last_modified=Max("updated_at"), count=Count("id")
+        )
+        public = await Habit.objects.filter(is_public=True).aaggregate(last_modified=Max("updated_at"))
+        etag = make_etag(
+            "habits",
+            request.user.pk,
+            own["count"],
+            own["last_modified"],
+            public["last_modified"],
+            await aget_public_feed_version(),
+            request.get_full_path(),
+            request.accepted_media_type,
         )
+        response = get_not_modified_response(request, etag)
 
-    def perform_create(self, serializer):
-        serializer.save(owner=self.request.user)
+        if response is None:
+            last_modified = max(filter(None, (own["last_modified"], public["last_modified"])), default=None)
+            response = set_validators(await self.acompact_list(request), etag, last_modified)
 
+        return response
 
-class HabitRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
+    async def perform_acreate(self, serializer):
+        await sync_to_async(serializer.save)(owner=self.request.user)
+
+
+class PublicHabitList(HabitValuesListMixin, generics.ListAPIView):
+    """
+    Представление ленты публичных привычек.
+
+    Доступ предоставляет:
+    - Для GET-запросов: отображает публичные привычки всех пользователей с курсорной пагинацией. Параметр fields
+      ограничивает набор полей в ответе.
+
+    Сериализованные страницы ленты кэшируются (PUBLIC_FEED_CACHE_TIMEOUT). Ключ кэша содержит версию ленты, которая
+    увеличивается сигналами main.signals только при изменении или удалении публичной привычки, поэтому повторные
+    запросы ленты не обращаются к базе данных.
+
+    Атрибуты:
+    - queryset: публичные привычки, упорядоченные по id.
+    - serializer_class: сериализатор, используемый для представления данных о привычках.
+    - pagination_class: курсорная пагинация.
+    - permission_classes: указание, что пользователь должен быть аутентифицирован (авторизован).
+    """
+
+    queryset = Habit.objects.filter(is_public=True).order_by("id")
+    serializer_class = HabitSerializer
+    pagination_class = HabitCursorPagination
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request, *args, **kwargs):
+        key = get_public_feed_cache_key(request.query_params)
+        data = cache.get(key)
+
+        if data is not None:
+            return Response(data)
+
+        response = self.compact_list(request)
+        cache.set(key, response.data, timeout=settings.PUBLIC_FEED_CACHE_TIMEOUT)
+
+        return response
+
+
+class HabitChanges(generics.GenericAPIView):
     """
-    Представление для получения, обновления и удаления конкретной привычки.
+    Представление для инкрементальной синхронизации списка привычек.
 
     Доступ предоставляет:
-    - Для GET-запросов: отображает информацию о выбранной привычке.
+    - Для GET-запросов: возвращает привычки текущего пользователя и публичные привычки, созданные или измененные
+      после токена since, и идентификаторы привычек, удаленных (или снятых с публикации) после него, а также токен
+      next для следующего запроса. Без since выдаются все привычки. Если has_more = true, запрос повторяется с
+      токеном next. Параметр fields ограничивает набор полей привычек.
+
+    Привычки выбираются по индексам habit_owner_id_idx и habit_public_id_idx, записи об удалении - по индексу
+    (owner, deleted_at, id) и его частичному аналогу для публичных привычек. Токен старше
+    HABIT_TOMBSTONE_RETENTION отклоняется с кодом 410, после чего клиент выполняет полную синхронизацию.
+
+    Атрибуты:
+    - permission_classes: указание, что пользователь должен быть аутентифицирован (авторизован).
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        serializer = HabitValuesSerializer.from_request(request)
+
+        return Response(get_changes(request.user, request.query_params.get("since"), serializer))
+
+
+class HabitRetrieveUpdateDestroy(async_generics.RetrieveUpdateDestroyAPIView):
+    """
+    Асинхронное представление для получения, обновления и удаления конкретной привычки.
+
+    Доступ предоставляет:
+    - Для GET-запросов: отображает информацию о выбранной привычке. ETag и Last-Modified вычисляются по полю
+      updated_at; при совпадении If-None-Match или If-Modified-Since возвращается 304 без сериализации.
     - Для PUT/PATCH-запросов: позволяет обновить данные привычки только её владельцу.
     - Для DELETE-запросов: позволяет удалить привычку только её владельцу.
 
@@ -52,8 +234,248 @@ class HabitRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
     - serializer_class: сериализатор, используемый для представления и валидации данных о привычках.
     - permission_classes: указание, что пользователь должен быть аутентифицирован (авторизован) и что изменения может
                           делать только владелец привычки.
+
+    Привычка выбирается и удаляется через асинхронный ORM (aget, adelete), сохранение изменений выполняется через
+    sync_to_async.
     """
 
-    queryset = Habit.objects.all()
+    queryset = Habit.objects.select_related("owner")
     serializer_class = HabitSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        etag = make_etag("habit", instance.pk, instance.updated_at.isoformat(), request.accepted_media_type)
+        response = get_not_modified_response(request, etag, instance.updated_at)
+
+        if response is not None:
+            return response
+
+        data = await get_data(self.get_serializer(instance))
+
+        return set_validators(Response(data), etag, instance.updated_at)
+
+    async def perform_aupdate(self, serializer):
+        await sync_to_async(serializer.save)()
+
+
+class HabitUserTodayMixin:
+    """
+    Примесь, передающая сериализатору текущую дату в часовом поясе пользователя.
+    """
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["today"] = timezone.now().astimezone(get_zone(self.request.user.timezone)).date()
+
+        return context
+
+
+class HabitComplete(HabitUserTodayMixin, generics.GenericAPIView):
+    """
+    Представление для отметки о выполнении привычки.
+
+    Доступ предоставляет:
+    - Для POST-запросов: добавляет запись в журнал выполнений привычки текущего пользователя и возвращает ее
+      обновленные счетчики (серия, лучшая серия, количество выполнений).
+
+    Атрибуты:
+    - serializer_class: сериализатор счетчиков выполнения.
+    - permission_classes: указание, что пользователь должен быть аутентифицирован (авторизован). Отметить можно
+      только свою привычку, для чужих возвращается 404.
+    """
+
+    serializer_class = HabitStreakSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return Habit.objects.filter(owner=self.request.user).select_related("owner")
+
+    def post(self, request, *args, **kwargs):
+        streak = complete_habit(self.get_object())
+
+        return Response(self.get_serializer(streak).data, status=status.HTTP_201_CREATED)
+
+
+class HabitStreakList(HabitUserTodayMixin, generics.ListAPIView):
+    """
+    Представление счетчиков выполнения привычек текущего пользователя.
+
+    Доступ предоставляет:
+    - Для GET-запросов: отображает серии и количество выполнений всех привычек пользователя. Счетчики хранятся в
+      таблице HabitStreak и обновляются при каждой отметке, поэтому ответ не зависит от объема истории.
+
+    Атрибуты:
+    - serializer_class: сериализатор счетчиков выполнения.
+    - permission_classes: указание, что пользователь должен быть аутентифицирован (авторизован).
+    """
+
+    serializer_class = HabitStreakSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = None
+
+    def get_queryset(self):
+        return HabitStreak.objects.filter(habit__owner=self.request.user).select_related("habit").order_by("habit_id")
+
+
+class HabitStats(generics.GenericAPIView):
+    """
+    Представление статистики выполнения привычек текущего пользователя.
+
+    Доступ предоставляет:
+    - Для GET-запросов: отображает долю выполнения каждой привычки, тепловую карту выполнений по дням недели и
+      часам, соотношение приятных и полезных привычек и самый продуктивный час. Данные собираются из агрегатов,
+      которые пополняет фоновая задача refresh_habit_stats, а не из журнала выполнений.
+
+    Атрибуты:
+    - permission_classes: указание, что пользователь должен быть аутентифицирован (авторизован).
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        return Response(get_user_stats(request.user))
+
+
+class HabitBulk(generics.GenericAPIView):
+    """
+    Представление для массового создания, обновления и удаления привычек текущего пользователя.
+
+    Доступ предоставляет:
+    - Для POST-запросов: создает привычки из списка объектов.
+    - Для PATCH-запросов: частично обновляет привычки из списка объектов, каждый из которых содержит id.
+    - Для DELETE-запросов: удаляет привычки по списку {"ids": [...]}.
+
+    Все изменения выполняются в одной транзакции через bulk_create / bulk_update, а напоминания синхронизируются
+    одним пакетом. Размер списка ограничен настройкой HABIT_BULK_MAX_ITEMS.
+
+    Атрибуты:
+    - serializer_class: сериализатор, используемый для валидации и представления данных о привычках.
+    - permission_classes: указание, что пользователь должен быть аутентифицирован (авторизован).
+    """
+
+    serializer_class = HabitBulkSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return Habit.objects.filter(owner=self.request.user).select_related("owner")
+
+    def get_items(self, data):
+        if not isinstance(data, list) or not data:
+            raise ValidationError("Ожидается непустой список привычек.")
+
+        if len(data) > settings.HABIT_BULK_MAX_ITEMS:
+            raise ValidationError(f"За один запрос можно передать не более {settings.HABIT_BULK_MAX_ITEMS} привычек.")
+
+        return data
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=self.get_items(request.data), many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(owner=request.user)
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def patch(self, request, *args, **kwargs):
+        items = self.get_items(request.data)
+        ids = [item.get("id") if isinstance(item, dict) else None for item in items]
+
+        if not all(isinstance(pk, int) for pk in ids) or len(set(ids)) != len(ids):
+            raise ValidationError("Каждая привычка должна содержать уникальный id.")
+
+        with transaction.atomic():
+            habits = self.get_queryset().select_for_update(of=("self",)).in_bulk(ids)
+            missing = [pk for pk in ids if pk not in habits]
+
+            if missing:
+                raise ValidationError({"id": f"Привычки не найдены: {missing}"})
+
+            serializer = self.get_serializer([habits[pk] for pk in ids], data=items, many=True, partial=True)
+            serializer.is_valid(raise_exception=True)
+            serializer.save(owner=request.user)
+
+        return Response(serializer.data)
+
+    def delete(self, request, *args, **kwargs):
+        serializer = HabitBulkDeleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic(), bulk_sync():
+            habits = self.get_queryset().filter(id__in=serializer.validated_data["ids"])
+            task_ids = list(
+                HabitReminder.objects.filter(habit__in=habits).values_list("periodic_task_id", flat=True)
+            )
+            record_deleted_habits(habits)
+            habits.delete()
+            delete_periodic_tasks(task_ids)
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class TelegramWebhook(async_views.APIView):
+    """
+    Вебхук для входящих обновлений Telegram (команды бота /list, /done, /snooze).
+
+    Доступ предоставляет:
+    - Для POST-запросов: принимает обновление от Telegram, проверив секрет в заголовке
+      X-Telegram-Bot-Api-Secret-Token, и ставит его обработку в очередь Celery. Обновление с уже полученным
+      update_id (повторная доставка после таймаута) подтверждается без повторной обработки.
+
+    Атрибуты:
+    - authentication_classes: Telegram не передает токен пользователя, подлинность запроса подтверждает секрет.
+    - permission_classes: доступ без аутентификации.
+
+    Описание:
+        Представление асинхронное и не выполняет команды само: запрос к кэшу и публикация задачи занимают
+        миллисекунды, поэтому всплеск ответов на утренние напоминания не занимает воркеры веб-сервера.
+        Ответ 200 возвращается и для необрабатываемых обновлений, иначе Telegram будет повторять их доставку.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    async def post(self, request, *args, **kwargs):
+        secret = settings.TELEGRAM_WEBHOOK_SECRET
+        token = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+
+        if not secret or not constant_time_compare(token, secret):
+            raise PermissionDenied("Неверный секрет вебхука.")
+
+        update = request.data
+        update_id = update.get("update_id") if isinstance(update, dict) else None
+
+        if not isinstance(update_id, int):
+            raise ValidationError({"update_id": ["Обязательное целочисленное поле."]})
+
+        key = get_update_dedup_key(update_id)
+
+        if await cache.aadd(key, 1, timeout=settings.TELEGRAM_UPDATE_DEDUP_TIMEOUT):
+            try:
+                await sync_to_async(process_telegram_update.delay)(dict(update))
+            except Exception:
+                # Без отметки о получении Telegram доставит обновление повторно.
+                await cache.adelete(key)
+                raise
+
+        return Response(status=status.HTTP_200_OK)
+
+
+def metrics(request):
+    """
+    Отдает метрики приложения в текстовом формате Prometheus.
+
+    Описание:
+        Эндпоинт предназначен для сбора метрик Prometheus: запрос должен содержать заголовок
+        "Authorization: Bearer <METRICS_TOKEN>", пока токен не задан, эндпоинт отключен. Порт веб-сервера
+        опубликован, поэтому закрытия эндпоинта в nginx.conf недостаточно.
+    """
+
+    token = settings.METRICS_TOKEN
+    scheme, _, credentials = request.headers.get("Authorization", "").partition(" ")
+
+    if not token or scheme.lower() != "bearer" or not constant_time_compare(credentials, token):
+        return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+
+    content, content_type = render_metrics()
+
+    return HttpResponse(content, content_type=content_type)
@@ -0,0 +1,167 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from users.models import CustomUser
+
+# Поля перечислены в порядке полей модели, как того требует Model.from_db.
+CACHED_USER_FIELDS = tuple(
+    field.attname
+    for field in CustomUser._meta.concrete_fields
+    if field.attname in {"id", "email", "tg_id", "is_active", "timezone"}
+)
+
+
+class LocalTTLCache:
+    """
+    Потокобезопасный LRU-кэш процесса с ограниченным временем жизни записей.
+
+    Аргументы:
+        maxsize : int
+            Максимальное количество записей; при переполнении вытесняются давно не использованные.
+        timeout : float
+            Время жизни записи в секундах.
+    """
+
+    def __init__(self, maxsize, timeout):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.data.get(key)
+
+            if item is None:
+                return None
+
+            expires_at, value = item
+
+            if expires_at <= time.monotonic():
+                del self.data[key]
+                return None
+
+            self.data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.data[key] = (time.monotonic() + self.timeout, value)
+            self.data.move_to_end(key)
+
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.data.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+
+local_user_cache = LocalTTLCache(settings.AUTH_USER_LOCAL_CACHE_SIZE, settings.AUTH_USER_LOCAL_CACHE_TIMEOUT)
+
+
+def get_user_cache_key(user_id):
+    """
+    Возвращает ключ кэша с данными пользователя для аутентификации.
+    """
+
+    return f"auth:user:{user_id}"
+
+
+def get_user_cache_timeout():
+    """
+    Возвращает время хранения данных пользователя в общем кэше (не дольше времени жизни access-токена).
+    """
+
+    return min(settings.AUTH_USER_CACHE_TIMEOUT, int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()))
+
+
+def invalidate_cached_user(user_id):
+    """
+    Удаляет данные пользователя из локального и общего кэша.
+
+    Аргументы:
+        user_id : int
+            Идентификатор пользователя.
+    """
+
+    key = get_user_cache_key(user_id)
+    local_user_cache.delete(key)
+    cache.delete(key)
+
+
+def build_user(record):
+    """
+    Восстанавливает пользователя из кэшированной записи без обращения к базе данных.
+
+    Аргументы:
+        record : list
+            Значения полей CACHED_USER_FIELDS.
+
+    Возвращает:
+        CustomUser: Пользователь, у которого загружены только поля CACHED_USER_FIELDS. Остальные поля отложены и
+        загружаются из базы данных при первом обращении; save() сохраняет только загруженные поля.
+    """
+
+    return CustomUser.from_db("default", CACHED_USER_FIELDS, record)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    Аутентификация по JWT с кэшированием пользователя.
+
+    Описание:
+        Минимальная запись пользователя (id, email, tg_id, is_active, timezone) хранится в LRU-кэше процесса
+        (AUTH_USER_LOCAL_CACHE_TIMEOUT) и в общем кэше Django - Redis в рабочем окружении
+        (AUTH_USER_CACHE_TIMEOUT, не дольше ACCESS_TOKEN_LIFETIME). Запрос к таблице пользователей выполняется только
+        при отсутствии записи в обоих кэшах. Записи удаляются при сохранении или удалении пользователя (см.
+        users.signals); в других процессах запись локального кэша может устареть не более чем на
+        AUTH_USER_LOCAL_CACHE_TIMEOUT. При включенной проверке отзыва токена (CHECK_REVOKE_TOKEN) нужен хеш пароля,
+        поэтому пользователь загружается из базы данных без кэширования.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN or api_settings.USER_ID_FIELD != "id":
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        key = get_user_cache_key(user_id)
+        record = local_user_cache.get(key)
+
+        if record is None:
+            record = cache.get(key)
+
+            # Запись, сохраненная с другим набором полей (до обновления CACHED_USER_FIELDS), считается отсутствующей.
+            if record is None or len(record) != len(CACHED_USER_FIELDS):
+                record = CustomUser.objects.filter(pk=user_id).values_list(*CACHED_USER_FIELDS).first()
+
+                if record is None:
+                    raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+                record = list(record)
+                cache.set(key, record, timeout=get_user_cache_timeout())
+
+            local_user_cache.set(key, record)
+
+        user = build_user(record)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
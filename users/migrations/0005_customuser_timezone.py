@@ -0,0 +1,19 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:40
+
+import users.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_alter_customuser_tg_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='timezone',
+            field=models.CharField(default=users.models.get_default_timezone_name, max_length=64, validators=[users.models.validate_timezone], verbose_name='часовой пояс'),
+        ),
+    ]
@@ -1,9 +1,43 @@
+import zoneinfo
+from functools import lru_cache
+
 from django.apps import apps
+from django.conf import settings
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser
+from django.core.exceptions import ValidationError
 from django.db import models
 
 
+@lru_cache(maxsize=1)
+def get_available_timezones():
+    """
+    Возвращает множество имен часовых поясов IANA, доступных в системе.
+    """
+
+    return frozenset(zoneinfo.available_timezones())
+
+
+def validate_timezone(value):
+    """
+    Проверяет, что значение является именем часового пояса IANA.
+
+    Исключения:
+        ValidationError: Если часовой пояс неизвестен.
+    """
+
+    if value not in get_available_timezones():
+        raise ValidationError(f"Неизвестный часовой пояс: {value}.")
+
+
+def get_default_timezone_name():
+    """
+    Возвращает часовой пояс пользователя по умолчанию - часовой пояс сервера (TIME_ZONE).
+    """
+
+    return settings.TIME_ZONE
+
+
 class UserManager(BaseUserManager):
     """
     Менеджер пользователей для пользовательской модели User с использованием email вместо имени пользователя.
@@ -111,6 +145,8 @@ class CustomUser(AbstractUser):
             Поле для хранения аватара пользователя. Может быть пустым.
         tg_id : BigIntegerField
             Поле для хранения ID пользователя в Telegram.
+        timezone : CharField
+            Часовой пояс пользователя (имя IANA), в котором задано время выполнения его привычек.
 
     Метапараметры:
         verbose_name : str
@@ -139,6 +175,12 @@ class CustomUser(AbstractUser):
         upload_to="avatars/", blank=True, null=True, verbose_name="аватар"
     )
     tg_id = models.BigIntegerField(verbose_name="телеграм ID", unique=True)
+    timezone = models.CharField(
+        max_length=64,
+        default=get_default_timezone_name,
+        validators=[validate_timezone],
+        verbose_name="часовой пояс",
+    )
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ['tg_id']
@@ -148,6 +190,17 @@ class CustomUser(AbstractUser):
     def __str__(self):
         return self.email
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Создает экземпляр пользователя из строки базы данных, запоминая исходный часовой пояс.
+        """
+
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_timezone = instance.__dict__.get("timezone")
+
+        return instance
+
     class Meta:
         verbose_name = "пользователь"
         verbose_name_plural = "пользователи"
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from users.models import CustomUser
+from users.models import CustomUser, get_default_timezone_name
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
@@ -10,7 +10,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = CustomUser
-        fields = ["email", "password", "tg_id", "phone", "city", "avatar"]
+        fields = ["email", "password", "tg_id", "phone", "city", "avatar", "timezone"]
         extra_kwargs = {"password": {"write_only": True}}
 
     def create(self, validated_data):
@@ -20,6 +20,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
             phone=validated_data["phone"],
             city=validated_data["city"],
             tg_id=validated_data["tg_id"],
+            timezone=validated_data.get("timezone", get_default_timezone_name()),
         )
 
         return user
@@ -0,0 +1,34 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.authentication import invalidate_cached_user
+from users.models import CustomUser
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_authentication_cache(sender, instance, **kwargs):
+    """
+    Удаляет кэшированные данные пользователя, используемые при аутентификации по JWT.
+
+    Аргументы:
+        sender : модель
+            Модель, пославшая сигнал (в данном случае CustomUser).
+        instance : CustomUser
+            Сохраненный или удаленный пользователь.
+        **kwargs : dict
+            Дополнительные аргументы.
+
+    Описание:
+        Запись удаляется сразу и повторно после фиксации транзакции, чтобы в кэш не попали данные, прочитанные
+        параллельным запросом до фиксации изменений. Изменения через QuerySet.update() сигналы не отправляют, поэтому
+        после них кэш нужно очищать вызовом invalidate_cached_user.
+
+    Возвращает:
+        None
+    """
+
+    user_id = instance.pk
+    invalidate_cached_user(user_id)
+    transaction.on_commit(lambda: invalidate_cached_user(user_id))
@@ -1,5 +1,12 @@
+from django.core.cache import cache
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.authentication import CachedJWTAuthentication, local_user_cache
 
 User = get_user_model()
 
@@ -56,3 +63,82 @@ class UserManagerTests(TestCase):
 
         with self.assertRaises(ValueError):
             User.objects.create_superuser(email=email, tg_id=tg_id, password=password, is_superuser=False)
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    """
+    Тесты аутентификации по JWT с кэшированием пользователя.
+    """
+
+    def setUp(self):
+        cache.clear()
+        local_user_cache.clear()
+        self.user = User.objects.create_user(email="user@example.com", password="password", tg_id=12345678)
+        self.authentication = CachedJWTAuthentication()
+        self.token = self.authentication.get_validated_token(str(AccessToken.for_user(self.user)))
+
+    def test_cached_user_skips_query(self):
+        self.authentication.get_user(self.token)
+
+        with self.assertNumQueries(0):
+            user = self.authentication.get_user(self.token)
+
+        self.assertEqual(user, self.user)
+        self.assertEqual(user.email, self.user.email)
+        self.assertEqual(user.tg_id, self.user.tg_id)
+
+    def test_shared_cache_is_used_when_local_cache_is_empty(self):
+        self.authentication.get_user(self.token)
+        local_user_cache.clear()
+
+        with self.assertNumQueries(0):
+            self.authentication.get_user(self.token)
+
+    def test_save_invalidates_cache(self):
+        self.authentication.get_user(self.token)
+
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.get_user(self.token)
+
+    def test_unknown_user_is_rejected(self):
+        token = self.authentication.get_validated_token(str(AccessToken.for_user(self.user)))
+        self.user.delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.get_user(token)
+
+    def test_saving_cached_user_keeps_other_fields(self):
+        user = self.authentication.get_user(self.token)
+        user.tg_id = 87654321
+        user.save()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.tg_id, 87654321)
+        self.assertTrue(self.user.check_password("password"))
+
+
+class UserTimezoneTests(TestCase):
+    """
+    Тесты часового пояса пользователя при регистрации.
+    """
+
+    def register(self, **extra):
+        data = {'email': 'user@example.com', 'password': 'password', 'tg_id': 12345678, 'phone': '', 'city': ''}
+        return APIClient().post(reverse('users:create_user'), {**data, **extra}, format='json')
+
+    def test_default_timezone(self):
+        self.assertEqual(self.register().status_code, 201)
+        self.assertEqual(User.objects.get().timezone, 'Europe/Moscow')
+
+    def test_custom_timezone(self):
+        self.assertEqual(self.register(timezone='Asia/Tokyo').status_code, 201)
+        self.assertEqual(User.objects.get().timezone, 'Asia/Tokyo')
+
+    def test_unknown_timezone_is_rejected(self):
+        response = self.register(timezone='Mars/Olympus')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('timezone', response.json())